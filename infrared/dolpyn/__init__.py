@@ -0,0 +1,6 @@
+"""
+dolpyn/infrared/dolpyn -- Flipper Zero infrared tools
+
+The modules are run as "dolpyn-ir SUBCOMMAND" when installed, or through
+the scripts of the same name in infrared/ from a checkout.
+"""
@@ -0,0 +1,231 @@
+"""
+dolpyn/infrared/ir_archive -- read and write .ir libraries in zip/tar files
+
+IRDB releases are large archives with many small files. Instead of
+extracting those first, iter_sources() yields (relative_path, load)
+pairs for a file, a directory or an archive alike; load() returns the
+member contents as text. The loaders are picklable: zip members are
+read (and decompressed) by whichever worker process calls load(), each
+worker opening the zip file once. Tar files can only be read from
+front to back, so their members are read while iterating.
+
+Example:
+
+    for relpath, load in iter_sources('irdb.zip'):
+        for signal, source_lines in IrFile.parse(StringIO(load())):
+            ...
+
+    with open_output('converted.tar.gz') as output:
+        with output.open('tv/samsung.ir') as fp:
+            fp.write(IrFile.HEADER)
+"""
+import io
+import os
+import posixpath
+from functools import lru_cache, partial
+
+ZIP_SUFFIXES = ('.zip',)
+TAR_SUFFIXES = (
+    '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def is_archive(path):
+    return path.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+
+def iter_sources(path, suffixes=('.ir',)):
+    """
+    Yield (relative_path, load) for path and/or the files in it
+
+    Directories and archives are searched for files ending in one of the
+    suffixes. A plain file is yielded as is, with an empty relative_path.
+    Archive members with an absolute path or a path outside the archive
+    (like '../x.ir') raise a ValueError.
+    """
+    if path.lower().endswith(ZIP_SUFFIXES):
+        import zipfile
+
+        with zipfile.ZipFile(path) as archive:
+            names = sorted(
+                info.filename for info in archive.infolist()
+                if not info.is_dir() and _matches(info.filename, suffixes))
+        for name in names:
+            yield safe_relpath(name, path), partial(
+                read_zip_member, path, name)
+
+    elif path.lower().endswith(TAR_SUFFIXES):
+        import tarfile
+
+        # Stream mode: no seeking, so compressed tars are read only once.
+        with tarfile.open(path, 'r|*') as archive:
+            for info in archive:
+                if info.isfile() and _matches(info.name, suffixes):
+                    text = _decode(archive.extractfile(info).read())
+                    yield safe_relpath(info.name, path), partial(
+                        _identity, text)
+
+    elif os.path.isdir(path):
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if _matches(filename, suffixes):
+                    full_path = os.path.join(dirpath, filename)
+                    yield (
+                        os.path.relpath(full_path, path),
+                        partial(read_file, full_path))
+
+    else:
+        yield '', partial(read_file, path)
+
+
+def safe_relpath(relpath, where='-'):
+    """
+    Return relpath normalized, with '/' separators
+
+    Raises ValueError if relpath is absolute or not below its base
+    directory, so that it cannot be used to read or write anywhere else.
+    """
+    normalized = posixpath.normpath(relpath.replace('\\', '/'))
+    if (normalized.startswith('/') or normalized in ('.', '..') or
+            normalized.startswith('../')):
+        raise ValueError(f'{where}: unsafe path {relpath!r}')
+    return normalized
+
+
+def read_file(path):
+    with open(path) as fp:
+        return fp.read()
+
+
+def read_zip_member(path, name):
+    return _decode(_open_zip(path).read(name))
+
+
+@lru_cache(maxsize=8)
+def _open_zip(path):
+    import zipfile
+
+    # Kept open for the lifetime of the (worker) process.
+    return zipfile.ZipFile(path)
+
+
+def _decode(data):
+    return data.decode('utf-8')
+
+
+def _identity(value):
+    return value
+
+
+def _matches(name, suffixes):
+    return name.lower().endswith(suffixes)
+
+
+def open_output(path):
+    """
+    Return a DirectoryOutput or an ArchiveOutput, depending on path
+    """
+    if is_archive(path):
+        return ArchiveOutput(path)
+    return DirectoryOutput(path)
+
+
+class DirectoryOutput:
+    """
+    Write output files below a directory
+
+    Same interface as ArchiveOutput, so converters need not care where
+    their output goes.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self, relpath):
+        filename = os.path.join(
+            self.path, *safe_relpath(relpath, self.path).split('/'))
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        return open(filename, 'w')
+
+    def close(self):
+        pass
+
+
+class ArchiveOutput:
+    """
+    Write output files as members of a new zip or tar(.gz/.bz2/.xz) file
+
+    Members are collected in memory until their file is closed, because
+    zip files allow only one member to be written at a time and tar
+    needs the size up front. Multiple members may be open at once.
+    """
+    def __init__(self, path):
+        lower = path.lower()
+        self._is_zip = lower.endswith(ZIP_SUFFIXES)
+        if self._is_zip:
+            import zipfile
+
+            self._archive = zipfile.ZipFile(
+                path, 'w', compression=zipfile.ZIP_DEFLATED)
+        else:
+            import tarfile
+
+            compression = next(
+                (mode for suffixes, mode in (
+                    (('.tar.gz', '.tgz'), 'gz'),
+                    (('.tar.bz2', '.tbz2'), 'bz2'),
+                    (('.tar.xz', '.txz'), 'xz'))
+                 if lower.endswith(suffixes)), '')
+            self._archive = tarfile.open(path, f'w:{compression}')
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self, relpath):
+        return _ArchiveMember(self, safe_relpath(relpath, self.path))
+
+    def add(self, relpath, text):
+        data = text.encode('utf-8')
+        if self._is_zip:
+            self._archive.writestr(relpath, data)
+        else:
+            import tarfile
+
+            info = tarfile.TarInfo(relpath)
+            info.size = len(data)
+            info.mode = 0o644
+            self._archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self._archive.close()
+
+
+class _ArchiveMember(io.StringIO):
+    def __init__(self, output, relpath):
+        super().__init__()
+        self._output = output
+        self._relpath = relpath
+
+    def close(self):
+        if not self.closed:
+            self._output.add(self._relpath, self.getvalue())
+        super().close()
+
+
+if __name__ == '__main__':
+    import sys
+
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_archive')
+        assert False, 'should not get here'
+    sys.exit(f'{sys.argv[0]}: library module; run with TEST=1 for its tests')
@@ -0,0 +1,132 @@
+"""
+dolpyn/infrared/ir_batch -- encode many RC5/RC5marantz signals at once
+
+Calling as_raw() for every signal is slow when generating large code
+sets. The functions here take arrays of addresses, commands (and
+extensions) and produce all raw durations in one go, using NumPy.
+
+The result is a padded (N, width) matrix with the durations, and a
+lengths array. Row i equals Rc5MarantzIrSignal(...)._make_durations()
+for the i-th (address, command, extension); the padding is 0.
+
+Example:
+
+    durations, lengths = encode_rc5marantz([16, 16], [111, 111], [16, 32])
+    flat, offsets = to_flat(durations, lengths)
+"""
+
+import numpy as np
+
+from dolpyn.ir_signals import Rc5IrSignal, Rc5MarantzIrSignal
+
+HALF_BIT_DURATION = Rc5IrSignal.HALF_BIT_DURATION
+REPEAT_DURATION = Rc5IrSignal.REPEAT_DURATION
+
+
+def rc5_numerics(addresses, commands):
+    "Vectorized Rc5IrSignal.to_numeric()"
+    addresses = np.asarray(addresses, dtype=np.int64)
+    commands = np.asarray(commands, dtype=np.int64)
+    assert ((0x00 <= addresses) & (addresses < 0x20)).all(), addresses
+    assert ((0x00 <= commands) & (commands < 0x80)).all(), commands
+    return (
+        # SCFAAAAACCCCCC
+        0b10000000000000 |  # start
+        np.where(commands < 0x40, 0b1000000000000, 0) |
+        addresses << 6 |
+        commands & 0x3F)
+
+
+def rc5marantz_numerics(addresses, commands, extensions):
+    "Vectorized Rc5MarantzIrSignal.to_numeric()"
+    extensions = np.asarray(extensions, dtype=np.int64)
+    assert ((0x00 <= extensions) & (extensions < 0x40)).all(), extensions
+    # SCFAAAAACCCCCC => SCFAAAAACCCCCCEEEEEE
+    return rc5_numerics(addresses, commands) << 6 | extensions
+
+
+def encode_rc5(addresses, commands):
+    """
+    Return (durations, lengths) for all (address, command) pairs
+    """
+    return _encode(rc5_numerics(addresses, commands), Rc5IrSignal)
+
+
+def encode_rc5marantz(addresses, commands, extensions):
+    """
+    Return (durations, lengths) for all (address, command, extension)s
+    """
+    return _encode(
+        rc5marantz_numerics(addresses, commands, extensions),
+        Rc5MarantzIrSignal)
+
+
+def to_flat(durations, lengths):
+    """
+    Turn the padded matrix into a flat array plus offsets
+
+    The durations of signal i are flat[offsets[i]:offsets[i + 1]].
+    """
+    mask = np.arange(durations.shape[1]) < lengths[:, np.newaxis]
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return durations[mask], offsets
+
+
+def _encode(numerics, signal_class):
+    # The frame layout comes from the signal class, like in
+    # Rc5IrSignal._half_bit_runs(); this is a vectorized version of it.
+    bits = signal_class.FRAME_BITS
+    gap_after_bit = signal_class.GAP_AFTER_BIT
+    numerics = np.atleast_1d(numerics)
+    count = len(numerics)
+    rows = np.arange(count)
+
+    # Manchester encode: 1 => OFF-ON, 0 => ON-OFF.
+    shifts = np.arange(bits - 1, -1, -1)
+    bit_matrix = (numerics[:, np.newaxis] >> shifts & 1).astype(np.int8)
+    half_bits = np.empty((count, 2 * bits), dtype=np.int8)
+    half_bits[:, 0::2] = 1 - bit_matrix
+    half_bits[:, 1::2] = bit_matrix
+
+    # For RC5marantz we add half bits of silence after the head.
+    if gap_after_bit is not None:
+        at = 2 * gap_after_bit
+        half_bits = np.concatenate([
+            half_bits[:, :at],
+            np.zeros((count, signal_class.GAP_HALF_BITS), dtype=np.int8),
+            half_bits[:, at:]], axis=1)
+
+    # The start bit is a 1, so the first (OFF) half bit is dropped: data
+    # must start with an ON signal.
+    half_bits = half_bits[:, 1:]
+
+    # Number the runs of equal half bits and count their lengths.
+    run_ids = np.zeros(half_bits.shape, dtype=np.int64)
+    np.cumsum(half_bits[:, 1:] != half_bits[:, :-1], axis=1,
+              out=run_ids[:, 1:])
+    runs = run_ids[:, -1] + 1
+    width = int(runs.max()) + 1
+    counts = np.bincount(
+        (rows[:, np.newaxis] * width + run_ids).ravel(),
+        minlength=count * width).reshape(count, width)
+    durations = (counts * HALF_BIT_DURATION).astype(np.int32)
+
+    # Data must end with an ON signal; the trailing OFF run (if any) is
+    # replaced by the OFF time that fills up the repeat duration.
+    ends_off = half_bits[:, -1] == 0
+    lengths = runs - ends_off
+    durations[rows[ends_off], lengths[ends_off]] = 0
+    durations[rows, lengths] = REPEAT_DURATION - durations.sum(axis=1)
+    return durations, lengths + 1
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_batch')
+        assert False, 'should not get here'
+    sys.exit(f'{sys.argv[0]}: library module; run with TEST=1 for its tests')
@@ -0,0 +1,313 @@
+"""
+dolpyn/infrared/ir_capture -- turn sampled captures into RawIrSignals
+
+This is the reverse of ir_wave: it reads WAV files or logic-analyzer
+sample dumps (memory-mapped, processed chunk by chunk) and finds the
+infrared signals in them:
+
+- samples above the threshold are ON (or below, with invert=True for
+  active-low receivers);
+- ON pulses closer together than envelope_gap_us belong to the same mark
+  (that is the carrier); the carrier frequency and duty cycle are
+  estimated from the pulses;
+- marks closer together than signal_gap_us belong to the same signal.
+
+Captures of demodulating receivers (one pulse per mark) work as well;
+those get the default frequency and duty cycle. Needs NumPy.
+
+Usage:
+
+    ./dolpyn_ir_capture.py capture.wav > captured.ir
+    ./dolpyn_ir_capture.py --logic 1000000 --bit 2 --invert dump.bin
+
+Add --decode to store RC5/RC5marantz signals in their compact form.
+"""
+import os
+import sys
+
+import numpy as np
+
+from dolpyn.ir_signals import IrFile, RawIrSignal, Rc5IrSignal, compact_signal
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_ENVELOPE_GAP_US = 100    # shorter OFF times are carrier gaps
+DEFAULT_SIGNAL_GAP_US = 20000    # longer OFF times separate signals
+DEFAULT_FREQUENCY = 36000        # for captures without carrier
+DEFAULT_DUTY_CYCLE = 0.25
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# The SubFormat GUID of WAVE_FORMAT_EXTENSIBLE is the format code
+# followed by these 14 bytes (KSDATAFORMAT_SUBTYPE_*).
+WAVE_SUBFORMAT_SUFFIX = bytes.fromhex('000000001000800000aa00389b71')
+WAV_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): 'u1',
+    (WAVE_FORMAT_PCM, 16): '<i2',
+    (WAVE_FORMAT_PCM, 32): '<i4',
+    (WAVE_FORMAT_IEEE_FLOAT, 32): '<f4',
+    (WAVE_FORMAT_IEEE_FLOAT, 64): '<f8',
+}
+
+
+def open_wav(filename):
+    """
+    Return (samples, sample_rate) for the first channel of a WAV file
+
+    The samples are a read-only memory map; nothing is read yet. PCM (8,
+    16 and 32 bits) and IEEE float (32 and 64 bits) are supported, also
+    as WAVE_FORMAT_EXTENSIBLE; anything else raises a ValueError.
+    """
+    with open(filename, 'rb') as fp:
+        riff, _, wave_id = fp.read(4), fp.read(4), fp.read(4)
+        assert riff == b'RIFF' and wave_id == b'WAVE', (riff, wave_id)
+        fmt = None
+        while True:
+            header = fp.read(8)
+            assert len(header) == 8, 'no data chunk found'
+            chunk_id, chunk_size = header[0:4], int.from_bytes(
+                header[4:8], 'little')
+            if chunk_id == b'fmt ':
+                fmt = fp.read(chunk_size)
+                fp.seek(chunk_size & 1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                data_offset = fp.tell()
+                break
+            else:
+                fp.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+    assert fmt is not None, 'no fmt chunk found'
+    audio_format = int.from_bytes(fmt[0:2], 'little')
+    channels = int.from_bytes(fmt[2:4], 'little')
+    sample_rate = int.from_bytes(fmt[4:8], 'little')
+    bits = int.from_bytes(fmt[14:16], 'little')
+    if audio_format == WAVE_FORMAT_EXTENSIBLE:
+        subformat = fmt[24:40]
+        if len(subformat) != 16 or subformat[2:] != WAVE_SUBFORMAT_SUFFIX:
+            raise ValueError(
+                f'{filename}: unsupported WAV subformat {subformat.hex()}')
+        audio_format = int.from_bytes(subformat[0:2], 'little')
+    try:
+        dtype = np.dtype(WAV_DTYPES[audio_format, bits])
+    except KeyError:
+        raise ValueError(
+            f'{filename}: unsupported WAV format {audio_format:#x} '
+            f'with {bits}-bit samples') from None
+
+    frames = chunk_size // (channels * dtype.itemsize)
+    samples = np.memmap(
+        filename, dtype=dtype, mode='r', offset=data_offset,
+        shape=(frames, channels))
+    return samples[:, 0], sample_rate
+
+
+def open_logic(filename):
+    """
+    Return the samples of a raw logic-analyzer dump (one byte per sample)
+
+    The samples are a read-only memory map; pass mask=(1 << channel) to
+    demodulate() to select a channel.
+    """
+    return np.memmap(filename, dtype=np.uint8, mode='r')
+
+
+def default_threshold(dtype):
+    "Return the halfway point between silence and full scale"
+    dtype = np.dtype(dtype)
+    if dtype == np.uint8:
+        return 192  # 8-bit WAV is unsigned, with silence at 128
+    elif dtype.kind in 'iu':
+        return np.iinfo(dtype).max // 2
+    return 0.5
+
+
+def find_marks(samples, threshold, invert=False, mask=None,
+               envelope_gap=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield (start, last_rise, end, pulses, high) for every mark
+
+    All values are in samples: start is the first rising edge, last_rise
+    the last rising edge and end the last falling edge of the mark;
+    pulses is the number of ON pulses and high the total ON time. Pulses
+    that are at most envelope_gap samples apart belong to the same mark.
+    """
+    previous_level = False
+    pending_rise = None     # rise without fall (yet)
+    mark = None             # [start, last_rise, end, pulses, high]
+
+    for offset in range(0, len(samples), chunk_size):
+        chunk = np.asarray(samples[offset:offset + chunk_size])
+        if mask is not None:
+            chunk = chunk & mask
+        level = (chunk <= threshold) if invert else (chunk > threshold)
+
+        # Find the edges; rises[i] pairs with falls[i].
+        changes = np.flatnonzero(np.diff(level, prepend=previous_level))
+        changed_to = level[changes]
+        changes += offset
+        rises, falls = changes[changed_to], changes[~changed_to]
+        previous_level = bool(level[-1])
+        if pending_rise is not None:
+            rises = np.concatenate([[pending_rise], rises])
+        if len(rises) > len(falls):
+            pending_rise, rises = rises[-1], rises[:-1]
+        else:
+            pending_rise = None
+        if not len(rises):
+            continue
+
+        # Group the pulses into marks.
+        new_mark = np.empty(len(rises), dtype=bool)
+        new_mark[0] = True
+        np.greater(rises[1:] - falls[:-1], envelope_gap, out=new_mark[1:])
+        firsts = np.flatnonzero(new_mark)
+        lasts = np.append(firsts[1:], len(rises)) - 1
+        highs = np.add.reduceat(falls - rises, firsts)
+
+        for first, last, high in zip(
+                firsts.tolist(), lasts.tolist(), highs.tolist()):
+            start = int(rises[first])
+            if mark is not None and start - mark[2] <= envelope_gap:
+                mark[1:] = [
+                    int(rises[last]), int(falls[last]),
+                    mark[3] + last - first + 1, mark[4] + high]
+                continue
+            if mark is not None:
+                yield tuple(mark)
+            mark = [
+                start, int(rises[last]), int(falls[last]),
+                last - first + 1, high]
+
+    if mark is not None:
+        yield tuple(mark)
+
+
+def demodulate(samples, sample_rate, threshold=None, invert=False,
+               mask=None, envelope_gap_us=DEFAULT_ENVELOPE_GAP_US,
+               signal_gap_us=DEFAULT_SIGNAL_GAP_US,
+               repeat_duration=Rc5IrSignal.REPEAT_DURATION,
+               chunk_size=DEFAULT_CHUNK_SIZE, name_format='capture {:04d}'):
+    """
+    Yield a RawIrSignal for every signal in the samples
+
+    The OFF time after the last mark is the observed time until the next
+    signal, but at most what is needed to fill up repeat_duration (or
+    signal_gap_us, if that is longer). That way single RC5 presses decode
+    with Rc5MarantzIrSignal.from_raw().
+    """
+    if threshold is None:
+        threshold = 0 if mask is not None else default_threshold(
+            samples.dtype)
+    us_per_sample = 1000000 / sample_rate
+    marks = find_marks(
+        samples, threshold, invert, mask,
+        int(envelope_gap_us / us_per_sample), chunk_size)
+
+    signal_marks = []
+    count = 0
+    for mark in marks:
+        if (signal_marks and
+                (mark[0] - signal_marks[-1][2]) * us_per_sample >
+                signal_gap_us):
+            count += 1
+            yield _marks_to_signal(
+                signal_marks, mark[0], sample_rate, repeat_duration,
+                signal_gap_us, name_format.format(count))
+            signal_marks = []
+        signal_marks.append(mark)
+
+    if signal_marks:
+        count += 1
+        yield _marks_to_signal(
+            signal_marks, None, sample_rate, repeat_duration,
+            signal_gap_us, name_format.format(count))
+
+
+def _marks_to_signal(marks, next_start, sample_rate, repeat_duration,
+                     signal_gap_us, name):
+    us_per_sample = 1000000 / sample_rate
+
+    # Carrier estimate: average period between rises inside the marks.
+    intervals = sum(pulses - 1 for _, _, _, pulses, _ in marks)
+    if intervals:
+        period = sum(
+            last_rise - start for start, last_rise, _, _, _ in marks
+        ) / intervals
+        frequency = round(sample_rate / period)
+        duty_cycle = sum(high for _, _, _, _, high in marks) / (
+            sum(pulses for _, _, _, pulses, _ in marks) * period)
+    if not intervals or not 10000 <= frequency <= 56000:
+        period = None
+        frequency, duty_cycle = DEFAULT_FREQUENCY, DEFAULT_DUTY_CYCLE
+
+    edges = []
+    for start, last_rise, end, pulses, high in marks:
+        if period is not None and pulses > 1:
+            end = last_rise + period  # the last carrier period is whole
+        edges.extend((start, end))
+    data = [
+        round((b - a) * us_per_sample) for a, b in zip(edges, edges[1:])]
+
+    trailing = max(repeat_duration - sum(data), signal_gap_us)
+    if next_start is not None:
+        trailing = min(trailing, round(
+            (next_start - edges[-1]) * us_per_sample))
+    data.append(trailing)
+
+    return RawIrSignal(
+        name, frequency, min(round(duty_cycle, 2), 1.0), data,
+        comment=f'{name} at {marks[0][0] * us_per_sample / 1e6:.3f}s')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Find infrared signals in sampled captures.')
+    parser.add_argument('capture', metavar='CAPTURE')
+    parser.add_argument(
+        '--logic', type=int, metavar='RATE',
+        help='the capture is a raw logic-analyzer dump at RATE samples/s')
+    parser.add_argument(
+        '--bit', type=int, default=0,
+        help='logic-analyzer channel (bit) to use (default: 0)')
+    parser.add_argument(
+        '--threshold', type=float,
+        help='sample value above which the signal is ON')
+    parser.add_argument(
+        '--invert', action='store_true',
+        help='the signal is ON below the threshold (receiver output)')
+    parser.add_argument(
+        '--signal-gap', type=int, default=DEFAULT_SIGNAL_GAP_US,
+        metavar='US', help=(
+            'OFF time that separates signals '
+            f'(default: {DEFAULT_SIGNAL_GAP_US})'))
+    parser.add_argument(
+        '--decode', action='store_true',
+        help='store RC5/RC5marantz signals in their compact form')
+    args = parser.parse_args()
+
+    if args.logic:
+        samples, sample_rate, mask = (
+            open_logic(args.capture), args.logic, 1 << args.bit)
+    else:
+        try:
+            (samples, sample_rate), mask = open_wav(args.capture), None
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    sys.stdout.write(IrFile.HEADER)
+    for signal in demodulate(
+            samples, sample_rate, args.threshold, args.invert, mask,
+            signal_gap_us=args.signal_gap):
+        if args.decode:
+            signal = compact_signal(signal)
+        sys.stdout.write(f'{signal}\n')
+
+
+if __name__ == '__main__':
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_capture')
+        assert False, 'should not get here'
+    main()
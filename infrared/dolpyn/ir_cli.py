@@ -0,0 +1,73 @@
+"""
+dolpyn/infrared/ir_cli -- the dolpyn-ir command and its subcommands
+
+Every subcommand is one of the modules in this package; only the
+module of the chosen subcommand is imported, so that tools invoked from
+shell loops start quickly. Keep the imports at the top of this file to a
+minimum.
+
+Usage:
+
+    dolpyn-ir raw2parsed remote_control.ir
+    dolpyn-ir from-sheet -o out/ sheets/*.xlsx
+    dolpyn-ir export -f pronto -o exported/ remote.ir
+    dolpyn-ir SUBCOMMAND --help
+"""
+import sys
+
+# subcommand: (module, description)
+COMMANDS = {
+    'raw2parsed': (
+        'dolpyn.rc5marantz_raw2parsed', 'parse raw RC5/RC5marantz signals'),
+    'from-sheet': (
+        'dolpyn.rc5marantz_from_xls',
+        'create signal.ir files from the IR sheet'),
+    'bruteforce': (
+        'dolpyn.rc5marantz_bruteforce', 'generate all codes in a range'),
+    'compact': ('dolpyn.ir_compact', 'shrink signal.ir files'),
+    'diff': (
+        'dolpyn.ir_diff', 'compare signal.ir files by what they transmit'),
+    'export': (
+        'dolpyn.ir_export', 'export to LIRC, Pronto hex or Broadlink'),
+    'import': (
+        'dolpyn.ir_import', 'import from LIRC, Pronto hex or Broadlink'),
+    'macro': ('dolpyn.ir_macro', 'compile button presses into one signal'),
+    'tables': ('dolpyn.ir_tables', 'build the shared decode table'),
+    'service': (
+        'dolpyn.ir_service', 'run or load-test the conversion service'),
+    'watch': ('dolpyn.ir_watch', 'reconvert signal.ir files as they change'),
+    'wave': ('dolpyn.ir_wave', 'render signals as a waveform (NumPy)'),
+    'capture': ('dolpyn.ir_capture', 'find signals in a capture (NumPy)'),
+    'quality': ('dolpyn.ir_quality', 'profile capture timing (NumPy)'),
+}
+
+
+def usage(file):
+    print('Usage: dolpyn-ir SUBCOMMAND [ARGS...]\n\nSubcommands:', file=file)
+    for command, (module, description) in COMMANDS.items():
+        print(f'  {command:12s}  {description}', file=file)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        usage(sys.stdout if argv else sys.stderr)
+        sys.exit(0 if argv else 2)
+
+    command = argv[0]
+    if command not in COMMANDS:
+        print(f'dolpyn-ir: unknown subcommand {command!r}', file=sys.stderr)
+        usage(sys.stderr)
+        sys.exit(2)
+
+    from importlib import import_module
+
+    module = import_module(COMMANDS[command][0])
+    # The subcommands parse sys.argv themselves; argparse takes the
+    # program name for its messages from sys.argv[0].
+    sys.argv = [f'dolpyn-ir {command}'] + argv[1:]
+    module.main()
+
+
+if __name__ == '__main__':
+    main()
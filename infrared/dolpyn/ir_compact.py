@@ -0,0 +1,77 @@
+"""
+Shrink signal.ir files so the Flipper Zero loads them faster
+
+Every signal is rewritten to the smallest representation the Flipper
+accepts: parsed RC5 where possible, canonical raw data for RC5marantz
+(which the Flipper does not parse) and the original raw data otherwise.
+Comments and duplicate signals (same name, same signal) are dropped.
+
+Usage:
+
+    ./ir_compact.py remote_control.ir > compact.ir
+    ./ir_compact.py --in-place remote1.ir remote2.ir ...
+
+The number of bytes saved is reported per file on stderr.
+"""
+import argparse
+import sys
+
+from dolpyn.ir_signals import IrFile, RawIrSignal, compact_signal, signal_key
+
+
+def compact_ir_file(fp):
+    """
+    Yield the compacted file contents as strings, starting with the header
+    """
+    yield IrFile.HEADER
+
+    seen = set()
+    for signal, source_lines in IrFile.parse(fp):
+        if signal is None or isinstance(signal, Exception):
+            if isinstance(signal, Exception):
+                # Keep what we do not understand, it might be important.
+                yield ''.join(source_lines)
+            continue
+
+        signal = compact_signal(signal)
+        key = (signal.name, signal_key(signal))
+        if isinstance(signal, RawIrSignal):
+            key += (tuple(signal.data),)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        yield str(signal) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Shrink signal.ir files for faster loading.')
+    parser.add_argument(
+        '-i', '--in-place', action='store_true',
+        help='overwrite the files instead of writing to stdout')
+    parser.add_argument('files', nargs='+', metavar='FILE')
+    args = parser.parse_args()
+    if len(args.files) > 1 and not args.in_place:
+        parser.error('multiple files require --in-place')
+
+    for filename in args.files:
+        with open(filename) as fp:
+            before = len(fp.read().encode())
+            fp.seek(0)
+            output = ''.join(compact_ir_file(fp))
+
+        after = len(output.encode())
+        if args.in_place:
+            with open(filename, 'w') as fp:
+                fp.write(output)
+        else:
+            sys.stdout.write(output)
+
+        print(
+            f'{filename}: {before} -> {after} bytes '
+            f'({before - after} saved)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Compare two signal.ir files (or two trees of them) by what they transmit
+
+A plain diff(1) shows every raw signal that was re-captured (888 vs 889
+jitter) or moved around. This script decodes both sides through the
+signal classes and compares them by (name, protocol, address, command,
+extension). Raw signals that cannot be decoded are compared duration by
+duration, with a relative tolerance. Parsed signals in protocols that
+the signal classes do not know (NEC, Samsung32, SIRC, ...) are compared
+by their key/value pairs. Broken records are reported as warnings.
+
+Usage:
+
+    ./ir_diff.py old.ir new.ir
+    ./ir_diff.py old_library/ new_library/
+    ./ir_diff.py irdb-old.zip irdb-new.tar.gz
+
+Output:
+
+    - path: name [...]              (removed)
+    + path: name [...]              (added)
+    ~ path: name [...] -> [...]     (changed)
+    = path: name [...] (raw -> parsed)  (re-encoded only)
+
+The exit code is 1 if there are differences, like diff(1).
+"""
+import sys
+from io import StringIO
+from warnings import warn
+
+from dolpyn.ir_archive import iter_sources
+from dolpyn.ir_signals import (
+    IrFile, IrParseError, RawIrSignal, decode_signal, signal_key)
+
+DEFAULT_TOLERANCE = 0.1  # 10% relative difference is still the same
+
+
+class VerbatimSignal:
+    """
+    A parsed signal in a protocol that the signal classes do not know
+
+    It is compared by its key/value pairs (except the name), with the
+    whitespace and case of the values normalized.
+    """
+    def __init__(self, kvs):
+        self.name = kvs['name']
+        self.protocol = kvs['protocol']
+        self.values = tuple(sorted(
+            (key, ' '.join(value.upper().split()))
+            for key, value in kvs.items() if key not in ('name', 'type')))
+
+
+def index_ir_file(fp, relpath, index, filename=None):
+    """
+    Add all signals in fp to index, keyed by (relpath, name, nth)
+
+    The nth counter distinguishes multiple signals with the same name in
+    the same file. The values are (decoded, original) signal tuples.
+    Broken records are skipped with a warning that names filename (by
+    default relpath) and the line.
+    """
+    filename = filename or relpath or '-'
+    seen = {}
+    for lineno, record, source in IrFile.scan(fp, filename):
+        if record is None:
+            continue
+        try:
+            if isinstance(record, IrParseError):
+                raise record
+            signal = _record_to_signal(record, filename, lineno)
+        except IrParseError as exc:
+            warn(f'skipping {exc}')
+            continue
+        decoded = decode_signal(signal)
+        nth = seen.get(decoded.name, 0)
+        seen[decoded.name] = nth + 1
+        index[(relpath, decoded.name, nth)] = (decoded, signal)
+    return index
+
+
+def _record_to_signal(record, filename, lineno):
+    # Like IrFile.parse(), but keeps parsed signals of other protocols.
+    try:
+        return IrFile._record_to_signal(record, filename, lineno)
+    except IrParseError:
+        comment, kvs = IrFile._record_to_kvs(record, filename, lineno)
+        if (kvs.get('type') != 'parsed' or 'name' not in kvs or
+                kvs.get('protocol') in (None, 'RC5', 'RC5marantz')):
+            raise
+        return VerbatimSignal(kvs)
+
+
+def index_path(path):
+    index = {}
+    for relpath, load in iter_sources(path):
+        index_ir_file(StringIO(load()), relpath, index, relpath or path)
+    return index
+
+
+def raw_data_matches(old, new, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return True if the raw signals are the same within a relative tolerance
+    """
+    if len(old.data) != len(new.data):
+        return False
+    pairs = [(old.frequency, new.frequency)]
+    pairs.extend(zip(old.data, new.data))
+    return all(
+        abs(a - b) <= tolerance * max(a, b)
+        for a, b in pairs)
+
+
+def diff_indexes(old_index, new_index, tolerance=DEFAULT_TOLERANCE):
+    """
+    Yield (tag, key, old_entry, new_entry) for all differences
+
+    Tag is one of '-' (removed), '+' (added), '~' (changed) or '='
+    (re-encoded only: same decoded signal, different representation).
+    Both indexes are dicts, so this is linear in the number of signals.
+    """
+    for key, old_entry in old_index.items():
+        new_entry = new_index.get(key)
+        if new_entry is None:
+            yield '-', key, old_entry, None
+            continue
+
+        old_decoded, old_signal = old_entry
+        new_decoded, new_signal = new_entry
+        if _signal_key(old_decoded) != _signal_key(new_decoded):
+            yield '~', key, old_entry, new_entry
+        elif (isinstance(old_decoded, RawIrSignal) and
+                not raw_data_matches(old_decoded, new_decoded, tolerance)):
+            yield '~', key, old_entry, new_entry
+        elif _body(old_signal) != _body(new_signal):
+            yield '=', key, old_entry, new_entry
+
+    for key, new_entry in new_index.items():
+        if key not in old_index:
+            yield '+', key, None, new_entry
+
+
+def format_difference(tag, key, old_entry, new_entry):
+    relpath, name, nth = key
+    where = f'{relpath}: {name}' if relpath else name
+    if nth:
+        where = f'{where} (#{nth + 1})'
+
+    if tag == '-':
+        return f'- {where} {_describe(old_entry[0])}'
+    elif tag == '+':
+        return f'+ {where} {_describe(new_entry[0])}'
+    elif tag == '~':
+        return (
+            f'~ {where} {_describe(old_entry[0])} -> '
+            f'{_describe(new_entry[0])}')
+    assert tag == '=', tag
+    return (
+        f'= {where} {_describe(new_entry[0])} '
+        f'({_kind(old_entry[1])} -> {_kind(new_entry[1])})')
+
+
+def _signal_key(signal):
+    if isinstance(signal, VerbatimSignal):
+        return signal.values
+    return signal_key(signal)
+
+
+def _body(signal):
+    # The string representation minus the comment line
+    if isinstance(signal, VerbatimSignal):
+        return signal.values
+    return str(signal).split('\n', 1)[1]
+
+
+def _describe(signal):
+    if isinstance(signal, VerbatimSignal):
+        return '[{} {}]'.format(signal.protocol, ', '.join(
+            f'{key} {value}' for key, value in signal.values
+            if key != 'protocol'))
+    protocol, address, command, extension = signal_key(signal)
+    if protocol == 'raw':
+        return f'[raw {signal.frequency}Hz {len(signal.data)} durations]'
+    elif extension is None:
+        return f'[{protocol} {address} {command}]'
+    return f'[{protocol} {address} {command} {extension}]'
+
+
+def _kind(signal):
+    return 'raw' if isinstance(signal, RawIrSignal) else 'parsed'
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(f'Usage: {sys.argv[0]} OLD NEW', file=sys.stderr)
+        sys.exit(2)
+
+    old_index = index_path(sys.argv[1])
+    new_index = index_path(sys.argv[2])
+
+    different = False
+    for difference in diff_indexes(old_index, new_index):
+        print(format_difference(*difference))
+        different = True
+    sys.exit(1 if different else 0)
+
+
+if __name__ == '__main__':
+    main()
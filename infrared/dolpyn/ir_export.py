@@ -0,0 +1,101 @@
+"""
+Export signal.ir files to LIRC, Pronto hex and/or Broadlink (JSON)
+
+Every file is parsed and decoded once; each signal is written to all
+requested formats in the same pass. The output is streamed: nothing but
+the cached per-signal timings is kept in memory.
+
+Usage:
+
+    ./ir_export.py -f lirc,pronto,broadlink -o exported/ remote.ir
+    ./ir_export.py -f pronto -o exported/ Flipper-IRDB/
+    ./ir_export.py -f lirc -o exported.zip Flipper-IRDB.tar.gz
+
+Output files are named after the input files, e.g. remote.lircd.conf,
+remote.pronto.txt and remote.broadlink.json. Both the input and the
+output may be a zip or tar archive; nothing is extracted to disk.
+Records that cannot be exported (broken ones, and parsed signals in
+protocols other than RC5 and RC5marantz) are skipped with a warning.
+"""
+import argparse
+import os
+import sys
+from contextlib import ExitStack
+from io import StringIO
+from warnings import warn
+
+from dolpyn.ir_archive import iter_sources, open_output
+from dolpyn.ir_formats import WRITERS, signal_timings
+from dolpyn.ir_signals import IrFile
+
+
+def export_ir_file(fp, writers, filename='-'):
+    """
+    Write all signals in fp to all writers; return the number of signals
+
+    Records that do not parse are skipped with a file:line warning.
+    """
+    count = 0
+    for signal, source_lines in IrFile.parse(fp, filename):
+        if signal is None:
+            continue
+        elif isinstance(signal, Exception):
+            warn(f'skipping {signal}')
+            continue
+        timings = signal_timings(signal)
+        for writer in writers:
+            writer.write(signal.name, timings)
+        count += 1
+    for writer in writers:
+        writer.close()
+    return count
+
+
+def export_path(path, output, formats):
+    """
+    Export the .ir file (or all .ir files in path) to output
+
+    The output is a DirectoryOutput or ArchiveOutput (see open_output()).
+    Yields (relative_path, signal_count) per exported file.
+    """
+    for relpath, load in iter_sources(path):
+        relpath = relpath or os.path.basename(path)
+        stem = os.path.splitext(relpath)[0]
+        remote_name = os.path.basename(stem)
+
+        with ExitStack() as stack:
+            writers = []
+            for format_ in formats:
+                writer_class = WRITERS[format_]
+                out = stack.enter_context(
+                    output.open(stem + writer_class.extension))
+                writers.append(writer_class(out, remote_name))
+            yield relpath, export_ir_file(
+                StringIO(load()), writers, relpath)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export signal.ir files to other IR formats.')
+    parser.add_argument(
+        '-f', '--formats', default=','.join(WRITERS),
+        help=f'comma separated formats (default: {",".join(WRITERS)})')
+    parser.add_argument(
+        '-o', '--output', metavar='DIR', required=True,
+        help='output directory or .zip/.tar(.gz) file')
+    parser.add_argument('paths', nargs='+', metavar='PATH')
+    args = parser.parse_args()
+
+    formats = args.formats.split(',')
+    unknown = set(formats) - set(WRITERS)
+    if unknown:
+        parser.error(f'unknown formats: {", ".join(sorted(unknown))}')
+
+    with open_output(args.output) as output:
+        for path in args.paths:
+            for relpath, count in export_path(path, output, formats):
+                print(f'{relpath}: {count} signals', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,447 @@
+"""
+dolpyn/infrared/ir_formats -- convert signals to/from LIRC, Pronto, Broadlink
+
+All formats are produced from the same intermediate representation: the
+Timings (carrier frequency, duty cycle and ON/OFF durations) of a signal.
+Those are cached per decoded signal, so converting a library into
+several formats computes them only once.
+
+Example:
+
+    timings = signal_timings(Rc5IrSignal('Power', 16, 12))
+    to_pronto(timings)      # '0000 0073 000B 0000 0020 0020 ...'
+    to_broadlink(timings)   # b'\\x26\\x00\\x18\\x00\\x1b\\x1b...'
+
+The other way around, the iter_*() readers yield signals from files in
+those formats.
+"""
+import json
+import re
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from functools import lru_cache
+from warnings import warn
+
+from dolpyn.ir_signals import (
+    RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal, decode_signal)
+
+PRONTO_CLOCK = 0.241246     # Pronto carrier unit in us
+BROADLINK_TICK = 32.84      # Broadlink duration unit in us (2^-15 s)
+TRAILING_GAP = 40000        # OFF time added to signals that end with ON
+
+
+class Timings(namedtuple('Timings', 'frequency duty_cycle durations')):
+    """
+    The carrier frequency, duty cycle and ON/OFF durations of a signal
+
+    There is always an even number of durations: the last one is OFF.
+    """
+
+
+def signal_timings(signal):
+    """
+    Return the (cached) Timings for a signal
+
+    Raw signals that decode as RC5/RC5marantz use the clean durations of
+    the decoded signal.
+    """
+    signal = decode_signal(signal)
+    if isinstance(signal, RawIrSignal):
+        return _raw_timings(
+            signal.frequency, signal.duty_cycle, tuple(signal.data))
+    return _parsed_timings(
+        signal.protocol, signal.address, signal.command,
+        getattr(signal, 'extension', None))
+
+
+@lru_cache(maxsize=8192)
+def _parsed_timings(protocol, address, command, extension):
+    if protocol == 'RC5marantz':
+        signal = Rc5MarantzIrSignal('', address, command, extension)
+    else:
+        assert protocol == 'RC5', protocol
+        signal = Rc5IrSignal('', address, command)
+    raw = signal.as_raw()
+    return _raw_timings(raw.frequency, raw.duty_cycle, tuple(raw.data))
+
+
+@lru_cache(maxsize=8192)
+def _raw_timings(frequency, duty_cycle, durations):
+    if len(durations) % 2:
+        durations += (TRAILING_GAP,)
+    return Timings(frequency, duty_cycle, durations)
+
+
+def to_pronto(timings):
+    """
+    Return the Pronto hex (learned, 0000 format) for the timings
+
+    The whole signal is put in the once sequence.
+    """
+    frequency_word = round(1000000 / (timings.frequency * PRONTO_CLOCK))
+    frequency = 1000000 / (frequency_word * PRONTO_CLOCK)
+    words = [0x0000, frequency_word, len(timings.durations) // 2, 0x0000]
+    words.extend(
+        max(1, round(duration * frequency / 1000000))
+        for duration in timings.durations)
+    return ' '.join(f'{word:04X}' for word in words)
+
+
+def to_broadlink(timings):
+    """
+    Return the Broadlink IR packet for the timings
+
+    This is the format the python-broadlink library (and Home Assistant)
+    uses: 0x26 (IR), repeat count, 16-bit length and then the durations
+    in BROADLINK_TICK units; large values are 0x00 + 16-bit big endian.
+    """
+    packet = bytearray([0x26, 0x00, 0x00, 0x00])
+    for duration in timings.durations:
+        ticks = int(duration // BROADLINK_TICK)
+        assert ticks < 0x10000, duration
+        if ticks > 0xFF:
+            packet.extend((0x00, ticks >> 8))
+        packet.append(ticks & 0xFF)
+    length = len(packet) - 4
+    packet[2:4] = length.to_bytes(2, 'little')
+    return bytes(packet)
+
+
+class LircWriter:
+    """
+    Write a LIRC remote with raw_codes, one signal at a time
+
+    LIRC has one frequency and duty cycle per remote. A new remote (the
+    name with a _2, _3, ... suffix) is started whenever a signal needs
+    different ones than the signal before it.
+
+    The gap is shared by the signals of a remote as well: it is the
+    trailing OFF of the first signal, but at most TRAILING_GAP. Signals
+    with a longer trailing OFF keep it: the rest is written as a final
+    space, to which LIRC adds the gap. (A shorter trailing OFF gets the
+    longer gap.)
+    """
+    extension = '.lircd.conf'
+
+    def __init__(self, fp, remote_name):
+        self.fp = fp
+        self.remote_name = remote_name.replace(' ', '_')
+        self._remote = None
+        self._remotes = 0
+        self._gap = None
+
+    def write(self, name, timings):
+        remote = (timings.frequency, round(timings.duty_cycle * 100))
+        if remote != self._remote:
+            self.close()
+            self._remote = remote
+            self._gap = min(timings.durations[-1], TRAILING_GAP)
+            self._remotes += 1
+            remote_name = self.remote_name
+            if self._remotes > 1:
+                remote_name = f'{remote_name}_{self._remotes}'
+            self.fp.write(
+                f'begin remote\n'
+                f'  name  {remote_name}\n'
+                f'  flags RAW_CODES\n'
+                f'  eps            30\n'
+                f'  aeps          100\n'
+                f'  frequency    {remote[0]}\n'
+                f'  duty_cycle   {remote[1]}\n'
+                f'  gap          {self._gap}\n'
+                f'\n'
+                f'  begin raw_codes\n')
+
+        durations = list(timings.durations[:-1])
+        if timings.durations[-1] > self._gap:
+            durations.append(timings.durations[-1] - self._gap)
+        self.fp.write(f'\n    name {"_".join(name.split())}\n')
+        for idx in range(0, len(durations), 8):
+            line = ' '.join(
+                f'{duration:7d}' for duration in durations[idx:idx + 8])
+            self.fp.write(f'    {line}\n')
+
+    def close(self):
+        if self._remote is not None:
+            self.fp.write('\n  end raw_codes\nend remote\n')
+            self._remote = None
+
+
+class ProntoWriter:
+    "Write one 'name: pronto hex' line per signal"
+    extension = '.pronto.txt'
+
+    def __init__(self, fp, remote_name):
+        self.fp = fp
+
+    def write(self, name, timings):
+        self.fp.write(f'{name}: {to_pronto(timings)}\n')
+
+    def close(self):
+        pass
+
+
+class BroadlinkWriter:
+    "Write a JSON object with base64 Broadlink packets (Home Assistant)"
+    extension = '.broadlink.json'
+
+    def __init__(self, fp, remote_name):
+        self.fp = fp
+        self._separator = '{\n'
+
+    def write(self, name, timings):
+        packet = b64encode(to_broadlink(timings)).decode()
+        self.fp.write(
+            f'{self._separator}  {json.dumps(name)}: {json.dumps(packet)}')
+        self._separator = ',\n'
+
+    def close(self):
+        if self._separator == '{\n':
+            self.fp.write('{}\n')  # no signals at all
+        else:
+            self.fp.write('\n}\n')
+
+
+WRITERS = {
+    'lirc': LircWriter,
+    'pronto': ProntoWriter,
+    'broadlink': BroadlinkWriter,
+}
+
+
+def pronto_to_signal(name, pronto):
+    """
+    Return the signal for Pronto hex
+
+    Learned codes (0000) become RawIrSignals, using the once sequence (or
+    the repeat sequence if there is no once sequence). RC5 codes (5000)
+    become Rc5IrSignals.
+    """
+    words = [int(word, 16) for word in pronto.split()]
+    assert len(words) >= 4, pronto
+    kind, frequency_word, once, repeat = words[0:4]
+    assert len(words) == 4 + 2 * (once + repeat), pronto
+
+    if kind == 0x5000:
+        assert once + repeat == 1, pronto  # one (address, command) pair
+        address, command = words[4:6]
+        return Rc5IrSignal(name, address, command)
+
+    assert kind == 0x0000, pronto
+    frequency = 1000000 / (frequency_word * PRONTO_CLOCK)
+    cycles = words[4:4 + 2 * once] if once else words[4:]
+    return RawIrSignal(
+        name, round(frequency), 0.33,
+        [round(i * 1000000 / frequency) for i in cycles])
+
+
+def broadlink_to_signal(name, packet, frequency=38000):
+    """
+    Return a RawIrSignal for a Broadlink IR packet
+
+    Broadlink packets do not store the carrier frequency.
+    """
+    assert packet[0] == 0x26, packet[0:1]
+    length = int.from_bytes(packet[2:4], 'little')
+    data = packet[4:4 + length]
+    durations = []
+    idx = 0
+    while idx < len(data):
+        if data[idx] == 0x00:
+            ticks = int.from_bytes(data[idx + 1:idx + 3], 'big')
+            idx += 3
+        else:
+            ticks = data[idx]
+            idx += 1
+        # to_broadlink() rounds down, so take the middle of the tick.
+        durations.append(round((ticks + 0.5) * BROADLINK_TICK))
+    return RawIrSignal(name, frequency, 0.33, durations)
+
+
+def iter_pronto(fp):
+    """
+    Yield signals from 'name: pronto hex' lines (or bare pronto hex lines)
+    """
+    count = 0
+    for line in fp:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        count += 1
+        match = _PRONTO_LINE.match(line)
+        assert match, line
+        yield pronto_to_signal(
+            match.group(1) or f'pronto {count}', match.group(2))
+
+
+_PRONTO_LINE = re.compile(
+    r'^(?:(.*?)\s*[:\t]\s*)?((?:[0-9A-Fa-f]{4}\s+)*[0-9A-Fa-f]{4})$')
+
+
+def iter_broadlink(fp, frequency=38000):
+    """
+    Yield signals from Broadlink JSON (as used by Home Assistant/SmartIR)
+
+    Nested objects are flattened; the names are joined with spaces. The
+    packets may be base64 or hex encoded.
+    """
+    def walk(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                yield from walk(prefix + [str(key)], item)
+        elif isinstance(value, str) and value:
+            try:
+                packet = bytes.fromhex(value)
+            except ValueError:
+                packet = b64decode(value)
+            yield broadlink_to_signal(' '.join(prefix), packet, frequency)
+
+    yield from walk([], json.load(fp))
+
+
+def iter_lirc(fp):
+    """
+    Yield signals from a LIRC configuration file
+
+    Supported are raw_codes, RC5 remotes (these become Rc5IrSignals) and
+    plain space encoded remotes (header, one/zero, ptrail, gap).
+    Other remotes are skipped with a warning. Malformed lines raise a
+    ValueError with the line number.
+    """
+    remote = None
+    section = None
+    raw_name, raw_data = None, []
+    lineno = 0
+    try:
+        for lineno, line in enumerate(fp, 1):
+            words = line.split('#', 1)[0].split()
+            if not words:
+                continue
+            keyword = words[0].lower()
+
+            if keyword in ('begin', 'end') and len(words) != 2:
+                raise ValueError(f'expected "{keyword} <section>"')
+            elif keyword == 'begin' and words[1] == 'remote':
+                remote = {}
+            elif keyword == 'begin':
+                section = words[1].lower()
+            elif keyword == 'end' and words[1] == 'remote':
+                remote = None
+            elif keyword == 'end':
+                if section == 'raw_codes' and raw_name is not None:
+                    yield _lirc_raw_signal(remote, raw_name, raw_data)
+                    raw_name, raw_data = None, []
+                section = None
+            elif remote is None:
+                continue
+            elif section == 'raw_codes':
+                if keyword == 'name':
+                    if raw_name is not None:
+                        yield _lirc_raw_signal(remote, raw_name, raw_data)
+                    raw_name, raw_data = ' '.join(words[1:]), []
+                elif raw_name is None:
+                    raise ValueError('raw code without a name')
+                else:
+                    raw_data.extend(int(word) for word in words)
+            elif section == 'codes':
+                if len(words) < 2:
+                    raise ValueError(f'no code for {words[0]!r}')
+                signal = _lirc_code_signal(remote, words[0], int(words[1], 0))
+                if signal is not None:
+                    yield signal
+            elif len(words) < 2:
+                raise ValueError(f'no value for {words[0]!r}')
+            else:
+                remote[keyword] = words[1:]
+    except KeyError as exc:
+        raise ValueError(f'line {lineno}: remote has no {exc}') from None
+    except ValueError as exc:
+        raise ValueError(f'line {lineno}: {exc}') from None
+
+
+def _lirc_raw_signal(remote, name, data):
+    frequency = int(remote.get('frequency', ['38000'])[0])
+    duty_cycle = int(remote.get('duty_cycle', ['50'])[0]) / 100
+    return RawIrSignal(
+        name, frequency, duty_cycle, _lirc_with_gap(remote, data))
+
+
+def _lirc_code_signal(remote, name, code):
+    def number(key, default=0):
+        return int(remote.get(key, [str(default)])[0], 0)
+
+    flags = set('|'.join(remote.get('flags', [])).upper().split('|'))
+    bits = number('bits')
+    pre_bits, post_bits = number('pre_data_bits'), number('post_data_bits')
+    value = (
+        (number('pre_data') << bits | code) << post_bits |
+        number('post_data'))
+    total_bits = pre_bits + bits + post_bits
+
+    if 'RC5' in flags:
+        if total_bits == 13:
+            value |= 0x2000  # the start bit is in plead
+        if total_bits not in (13, 14):
+            warn(f'skipping RC5 {name!r} with {total_bits} bits')
+            return None
+        return Rc5IrSignal.from_numeric(name, value)
+
+    if flags & {'RC6', 'RCMM', 'SHIFT_ENC', 'GRUNDIG', 'BO', 'XMP'}:
+        warn(f'skipping {name!r}, unsupported flags {"|".join(flags)}')
+        return None
+
+    durations = [int(i) for i in remote.get('header', [])]
+    one = [int(i) for i in remote['one']]
+    zero = [int(i) for i in remote['zero']]
+    for shift in range(total_bits - 1, -1, -1):
+        durations.extend(one if value >> shift & 1 else zero)
+    if 'ptrail' in remote:
+        durations.append(int(remote['ptrail'][0]))
+    durations = _lirc_with_gap(remote, _merge_equal_levels(durations))
+    return RawIrSignal(
+        name, number('frequency', 38000), number('duty_cycle', 50) / 100,
+        durations)
+
+
+def _lirc_with_gap(remote, durations):
+    # Add the gap of the remote as the OFF time after the last ON, or to
+    # the trailing OFF if the signal ends with one.
+    gap = int(remote.get('gap', [str(TRAILING_GAP)])[0])
+    if 'CONST_LENGTH' in '|'.join(remote.get('flags', [])).upper():
+        gap -= sum(durations)  # the gap is the total signal length
+    if gap <= 0:
+        gap = TRAILING_GAP
+    if len(durations) % 2:
+        return durations + [gap]
+    return durations[:-1] + [durations[-1] + gap]
+
+
+def _merge_equal_levels(durations):
+    # Durations alternate ON/OFF; zeroes mean the level did not change.
+    ret = []
+    for idx, duration in enumerate(durations):
+        if duration == 0:
+            continue
+        if ret and len(ret) % 2 == (idx + 1) % 2:
+            ret[-1] += duration
+        else:
+            ret.append(duration)
+    return ret
+
+
+READERS = {
+    'lirc': iter_lirc,
+    'pronto': iter_pronto,
+    'broadlink': iter_broadlink,
+}
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_formats')
+        assert False, 'should not get here'
+    sys.exit(f'{sys.argv[0]}: library module; run with TEST=1 for its tests')
@@ -0,0 +1,162 @@
+"""
+Convert LIRC, Pronto hex and Broadlink files to Flipper signal.ir files
+
+Every signal is routed through the RC5/RC5marantz decoders, so signals
+that are recognised are stored in their compact form (parsed RC5, or
+canonical raw RC5marantz) instead of as bulky raw data. Files are
+converted in parallel, one file per worker task; files in zip archives
+are also read and decompressed by the workers. Inputs are read only as
+workers become available, so large tar archives are not held in memory.
+
+Usage:
+
+    ./ir_import.py -o flipper/ lircd.conf remotes/ codes.pronto.txt
+    ./ir_import.py -o flipper.zip lirc-remotes.tar.gz
+
+The format is taken from the extension (.conf: LIRC, .json: Broadlink,
+other: Pronto hex) unless -f is given. Directories and zip/tar archives
+are searched recursively. The output may be an archive too.
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from contextlib import ExitStack
+from io import StringIO
+from itertools import chain, islice
+
+from dolpyn.ir_archive import iter_sources, open_output
+from dolpyn.ir_formats import READERS, WRITERS
+from dolpyn.ir_signals import IrFile, compact_signal
+
+EXTENSIONS = {
+    '.conf': 'lirc',
+    '.json': 'broadlink',
+    '.txt': 'pronto',
+    '.pronto': 'pronto',
+}
+
+MAX_PENDING_PER_JOB = 4     # tasks submitted ahead, per worker process
+
+
+def detect_format(filename):
+    return EXTENSIONS.get(os.path.splitext(filename)[1].lower(), 'pronto')
+
+
+def output_name(relpath):
+    """
+    Return relpath with its (export) extension replaced by .ir
+    """
+    for writer_class in WRITERS.values():
+        if relpath.endswith(writer_class.extension):
+            return relpath[:-len(writer_class.extension)] + '.ir'
+    return os.path.splitext(relpath)[0] + '.ir'
+
+
+def iter_input_files(paths):
+    "Yield (relative_path, load) for all files to import"
+    suffixes = tuple(EXTENSIONS)
+    for path in paths:
+        for relpath, load in iter_sources(path, suffixes):
+            yield relpath or os.path.basename(path), load
+
+
+def import_file(relpath, load, format_=None):
+    """
+    Convert one file; return (relpath, signal_count, ir_text, error)
+
+    Errors are returned instead of raised, so one bad file does not stop
+    a whole batch (or the worker pool running it).
+    """
+    format_ = format_ or detect_format(relpath)
+    out = StringIO()
+    count = 0
+    try:
+        out.write(IrFile.HEADER)
+        for signal in READERS[format_](StringIO(load())):
+            out.write(f'{compact_signal(signal)}\n')
+            count += 1
+    except Exception as exc:
+        return relpath, count, None, f'{exc.__class__.__name__}: {exc}'
+    return relpath, count, out.getvalue(), None
+
+
+def bounded_map(executor, fn, tasks, max_pending):
+    """
+    Yield fn(*task) for all tasks, in order, computed by executor
+
+    Unlike executor.map(), this takes tasks from the iterator only as
+    results come out, so that at most max_pending tasks (and their
+    input, like the text of tar members) are held at a time.
+    """
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, *task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert LIRC/Pronto/Broadlink files to signal.ir.')
+    parser.add_argument(
+        '-f', '--format', choices=sorted(READERS),
+        help='input format (default: by extension)')
+    parser.add_argument(
+        '-o', '--output', metavar='DIR', required=True,
+        help='output directory or .zip/.tar(.gz) file')
+    parser.add_argument(
+        '-j', '--jobs', type=int, metavar='N',
+        help='convert N files in parallel (default: CPU count)')
+    parser.add_argument('paths', nargs='+', metavar='PATH')
+    args = parser.parse_args()
+
+    tasks = (
+        (relpath, load, args.format)
+        for relpath, load in iter_input_files(args.paths))
+    first = list(islice(tasks, 2))
+    tasks = chain(first, tasks)
+
+    failed = 0
+    seen = {}  # output path => relpath of its input
+    with ExitStack() as stack:
+        output = stack.enter_context(open_output(args.output))
+        if len(first) > 1 and args.jobs != 1:
+            from concurrent.futures import ProcessPoolExecutor
+            from dolpyn.ir_tables import attach, ensure_tables
+
+            # The workers share one memory-mapped decode table.
+            jobs = args.jobs or os.cpu_count() or 1
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=jobs, initializer=attach,
+                initargs=(ensure_tables(),)))
+            results = bounded_map(
+                executor, import_file, tasks, MAX_PENDING_PER_JOB * jobs)
+        else:
+            # One file or -j1: skip the worker start-up.
+            results = (import_file(*task) for task in tasks)
+
+        try:
+            for relpath, count, ir_text, error in results:
+                output_path = output_name(relpath)
+                if output_path in seen:
+                    error = f'same output {output_path} as {seen[output_path]}'
+                seen.setdefault(output_path, relpath)
+                if error:
+                    failed += 1
+                    print(f'{relpath}: {error}', file=sys.stderr)
+                    continue
+                with output.open(output_path) as fp:
+                    fp.write(ir_text)
+                print(f'{relpath}: {count} signals', file=sys.stderr)
+        except ValueError as exc:  # unsafe archive member
+            failed += 1
+            print(exc, file=sys.stderr)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
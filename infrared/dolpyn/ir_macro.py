@@ -0,0 +1,184 @@
+"""
+Compile a sequence of button presses and delays into raw signals
+
+Automations like "Power ON, wait, Smart Select 1, Direct volume 25%"
+would otherwise take one send (and one round-trip to the Flipper) per
+step. compile_macro() concatenates the steps into a single RawIrSignal
+that the Flipper transmits in one go:
+
+    compile_macro([
+        Rc5IrSignal('Power ON', 0x10, 0x0C),
+        Delay(500000),
+        Rc5MarantzIrSignal('Smart Select 1', 0x10, 0x1E, 0x1F),
+        Rc5MarantzIrSignal('Direct volume 25%', 0x10, 0x6F, 0x10),
+    ], name='movie')
+
+Every frame is followed by at least min_gap us of silence; a Delay adds
+its duration to the silence after the preceding frame. RC5 and RC5marantz
+frames fill up to REPEAT_DURATION as usual and alternate their toggle
+bit, so that a receiver sees separate presses and not a held button.
+
+The Flipper sends at most max_timings durations per raw signal, and
+only one carrier frequency. When a macro exceeds that, it is split
+between frames into several signals ('movie (1/2)', 'movie (2/2)'). The
+silence after the last frame of a part is kept, so that sending the
+parts back to back keeps the timing.
+
+Encoded frames are cached, so compiling a long macro costs little more
+than concatenating lists.
+
+Usage:
+
+    ./ir_macro.py -f remote.ir 'Power ON' 500ms 'Smart Select 1' \\
+        > out.ir
+    ./ir_macro.py -n movie -f main.ir -f extra.ir 'Power ON' 2s ...
+
+A STEP is a signal name from the FILEs or a delay (us, ms or s). Signal
+names take precedence.
+"""
+import argparse
+import sys
+from functools import lru_cache
+
+from dolpyn.ir_signals import IrFile, RawIrSignal, Rc5IrSignal
+
+MAX_TIMINGS = 1024          # durations per raw signal the Flipper accepts
+MIN_GAP = 20000             # us of silence after every frame
+
+DELAY_UNITS = {'us': 1, 'ms': 1000, 's': 1000000}
+
+
+class Delay:
+    """
+    A pause of duration microseconds between two steps of a macro
+    """
+    def __init__(self, duration):
+        assert duration >= 0, duration
+        self.duration = int(duration)
+
+    @classmethod
+    def parse(cls, text):
+        "Return a Delay for text like '500ms', or None"
+        import re
+
+        match = re.match(r'^(\d+(?:\.\d+)?)(us|ms|s)$', text.strip())
+        if not match:
+            return None
+        value, unit = match.groups()
+        return cls(round(float(value) * DELAY_UNITS[unit]))
+
+    def __repr__(self):
+        return f'Delay({self.duration})'
+
+
+def compile_macro(steps, name='macro', max_timings=MAX_TIMINGS,
+                  min_gap=MIN_GAP):
+    """
+    Return a list of RawIrSignals (usually one) that send all steps
+
+    The steps are RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal or Delay
+    objects. Delays before the first frame are dropped: a raw signal
+    starts with ON.
+    """
+    parts = []      # (carrier, data, labels)
+    carrier = data = labels = None
+    toggle = False
+
+    for step in steps:
+        if isinstance(step, Delay):
+            if data:
+                data[-1] += step.duration
+                labels.append(f'{step.duration / 1000:g}ms')
+            continue
+
+        if isinstance(step, Rc5IrSignal):
+            step_carrier = (36000, 0.25)
+            segment = _encode(
+                type(step), step.to_numeric(), toggle, min_gap)
+            toggle = not toggle
+        else:
+            step_carrier = (step.frequency, step.duty_cycle)
+            segment = _frame(step.data, min_gap)
+        if len(segment) > max_timings:
+            raise ValueError(
+                f'{step.name!r}: {len(segment)} durations, more than '
+                f'{max_timings}')
+
+        if (data is None or step_carrier != carrier or
+                len(data) + len(segment) > max_timings):
+            carrier, data, labels = step_carrier, [], []
+            parts.append((carrier, data, labels))
+        data.extend(segment)
+        labels.append(step.name)
+
+    signals = []
+    for index, ((frequency, duty_cycle), data, labels) in enumerate(
+            parts, 1):
+        part_name = (
+            f'{name} ({index}/{len(parts)})' if len(parts) > 1 else name)
+        signals.append(RawIrSignal(
+            part_name, frequency, duty_cycle, data,
+            comment=f'{part_name}: {", ".join(labels)}'))
+    return signals
+
+
+@lru_cache(maxsize=1024)
+def _encode(cls, numeric, toggle, min_gap):
+    signal = cls.from_numeric('', numeric)
+    return _frame(signal._make_durations(toggle), min_gap)
+
+
+def _frame(data, min_gap):
+    # Durations starting with ON and ending with at least min_gap OFF.
+    data = list(data)
+    if len(data) % 2:
+        data.append(min_gap)
+    elif data[-1] < min_gap:
+        data[-1] = min_gap
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compile button presses and delays into raw signals.')
+    parser.add_argument(
+        '-f', '--file', action='append', required=True, metavar='FILE',
+        help='signal.ir file to take the signals from (repeatable)')
+    parser.add_argument(
+        '-n', '--name', default='macro',
+        help='name of the resulting signal (default: macro)')
+    parser.add_argument(
+        '--max-timings', type=int, default=MAX_TIMINGS, metavar='N',
+        help=f'durations per raw signal (default: {MAX_TIMINGS})')
+    parser.add_argument('steps', nargs='+', metavar='STEP')
+    args = parser.parse_args()
+
+    by_name = {}
+    for filename in args.file:
+        with open(filename) as fp:
+            for signal, source_lines in IrFile.parse(fp):
+                if signal is None or isinstance(signal, Exception):
+                    continue
+                by_name.setdefault(signal.name, signal)
+                if signal.name.endswith(' (raw)'):
+                    by_name.setdefault(signal.name.rsplit(' ', 1)[0], signal)
+
+    steps = []
+    for text in args.steps:
+        step = by_name.get(text) or Delay.parse(text)
+        if step is None:
+            parser.error(f'no such signal or delay: {text!r}')
+        steps.append(step)
+
+    try:
+        signals = compile_macro(steps, args.name, args.max_timings)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    sys.stdout.write(IrFile.HEADER)
+    for signal in signals:
+        sys.stdout.write(f'{signal}\n')
+
+
+if __name__ == '__main__':
+    main()
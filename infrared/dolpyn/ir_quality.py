@@ -0,0 +1,199 @@
+"""
+dolpyn/infrared/ir_quality -- how close are captured signals to mis-decoding
+
+_durations_to_bitstream() rounds every duration to a whole number of
+half-bits of 889us. A capture that is 300us off still decodes, but one
+more bit of jitter and it decodes as something else (or not at all).
+This profiles the raw RC5/RC5marantz signals of a whole library, all
+durations at once with NumPy:
+
+- error: duration minus the nearest multiple of 889us (mean and max
+  absolute error per signal);
+- unit: the least-squares half-bit duration of the signal, which shows
+  capture devices that run fast or slow;
+- margin: how many us the worst duration is away from the rounding
+  boundary (444us error). Zero or less means it rounds the other way.
+
+The last duration of a signal (the OFF time up to the repeat) is not a
+timed edge and is left out. Raw signals that decode_signal() does not
+decode as RC5 or RC5marantz are counted as 'other' and not profiled;
+parsed signals have no timing to profile.
+Files with a signal whose margin is below min_margin are flagged. Needs
+NumPy.
+
+Usage:
+
+    ./dolpyn_ir_quality.py library/
+    ./dolpyn_ir_quality.py --min-margin 250 --signals irdb.zip
+
+The exit code is 1 if any file was flagged.
+"""
+import os
+import sys
+from io import StringIO
+from itertools import chain
+
+import numpy as np
+
+from dolpyn.ir_archive import iter_sources
+from dolpyn.ir_signals import (
+    IrFile, RawIrSignal, Rc5IrSignal, decode_signal)
+
+HALF_BIT_DURATION = Rc5IrSignal.HALF_BIT_DURATION
+MAX_ERROR = HALF_BIT_DURATION // 2  # rounds to the nearest half-bit
+DEFAULT_MIN_MARGIN = 200            # us; flag files below this
+
+
+def profile_signals(datas):
+    """
+    Return a dict of per-signal arrays for the raw durations in datas
+
+    Keys: 'mean_error', 'max_error', 'unit', 'margin' (all in us). Every
+    data must have at least two durations.
+    """
+    lengths = np.fromiter(
+        (len(data) for data in datas), dtype=np.int64, count=len(datas))
+    assert (lengths > 1).all(), 'need at least two durations'
+    durations = np.fromiter(
+        chain.from_iterable(datas), dtype=np.int64, count=int(lengths.sum()))
+    starts = np.zeros(len(datas), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    ids = np.repeat(np.arange(len(datas)), lengths)
+    counts = (durations + MAX_ERROR) // HALF_BIT_DURATION
+
+    # Leave out the last duration of every signal. A count of zero fails
+    # to decode; count it as one, so that the margin is negative.
+    timed = np.ones(len(durations), dtype=bool)
+    timed[starts + lengths - 1] = False
+    durations, ids = durations[timed], ids[timed]
+    counts = np.maximum(counts[timed], 1)
+    lengths = lengths - 1
+    starts = starts - np.arange(len(datas))
+    abs_errors = np.abs(durations - counts * HALF_BIT_DURATION)
+    max_errors = np.maximum.reduceat(abs_errors, starts)
+
+    return {
+        'mean_error': np.bincount(ids, abs_errors) / lengths,
+        'max_error': max_errors,
+        'unit': (
+            np.bincount(ids, durations * counts) /
+            np.bincount(ids, counts * counts)),
+        'margin': MAX_ERROR - max_errors,
+    }
+
+
+def profile_library(path, min_margin=DEFAULT_MIN_MARGIN):
+    """
+    Return (files, signals): a list of per-file dicts and per-signal arrays
+
+    The file dicts have 'relpath', 'signals', 'raw', 'other', 'profiled'
+    and, if anything was profiled, 'mean_error', 'max_error', 'unit',
+    'margin' and 'flagged'. The per-signal arrays are those of
+    profile_signals() for the profiled signals, plus 'file' (index into
+    files) and 'name'.
+    """
+    files, names, file_ids, datas = [], [], [], []
+    for relpath, load in iter_sources(path):
+        file_ = {'relpath': relpath, 'signals': 0, 'raw': 0}
+        for signal, source_lines in IrFile.parse(StringIO(load())):
+            if signal is None or isinstance(signal, Exception):
+                continue
+            file_['signals'] += 1
+            if not isinstance(signal, RawIrSignal):
+                continue
+            file_['raw'] += 1
+            if (len(signal.data) > 1 and
+                    isinstance(decode_signal(signal), Rc5IrSignal)):
+                names.append(signal.name)
+                file_ids.append(len(files))
+                datas.append(signal.data)
+        files.append(file_)
+
+    if datas:
+        signals = profile_signals(datas)
+    else:
+        signals = {key: np.empty(0) for key in (
+            'mean_error', 'max_error', 'unit', 'margin')}
+    signals['file'] = file_ids = np.array(file_ids, dtype=np.int64)
+    signals['name'] = names
+
+    # Per file: signals are in file order, so every file is one slice.
+    counts = np.bincount(file_ids, minlength=len(files))
+    ends = np.cumsum(counts)
+    for index, file_ in enumerate(files):
+        file_['profiled'] = count = int(counts[index])
+        file_['other'] = file_['raw'] - count
+        if not count:
+            continue
+        part = slice(ends[index] - count, ends[index])
+        file_['mean_error'] = float(signals['mean_error'][part].mean())
+        file_['max_error'] = int(signals['max_error'][part].max())
+        file_['unit'] = float(signals['unit'][part].mean())
+        file_['margin'] = int(signals['margin'][part].min())
+        file_['flagged'] = file_['margin'] < min_margin
+    return files, signals
+
+
+def format_file(file_):
+    where = file_['relpath'] or '-'
+    counts = (
+        f"{file_['signals']} signals, {file_['profiled']} profiled, "
+        f"{file_['other']} other raw")
+    if not file_['profiled']:
+        return f'  {where}: {counts}'
+    return (
+        f"{'!' if file_['flagged'] else ' '} {where}: {counts}; "
+        f"error {file_['mean_error']:.0f}/{file_['max_error']}us, "
+        f"unit {file_['unit']:.1f}us, margin {file_['margin']}us")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Profile the timing quality of captured RC5 signals.')
+    parser.add_argument('path', metavar='PATH')
+    parser.add_argument(
+        '--min-margin', type=int, default=DEFAULT_MIN_MARGIN, metavar='US',
+        help=f'flag files with less margin (default: {DEFAULT_MIN_MARGIN})')
+    parser.add_argument(
+        '--signals', action='store_true',
+        help='also list the signals below the margin')
+    parser.add_argument(
+        '--flagged', action='store_true', help='only list flagged files')
+    args = parser.parse_args()
+
+    files, signals = profile_library(args.path, args.min_margin)
+    below = {}
+    if args.signals:
+        for i in np.flatnonzero(signals['margin'] < args.min_margin):
+            below.setdefault(int(signals['file'][i]), []).append(i)
+
+    for index, file_ in enumerate(files):
+        if args.flagged and not file_.get('flagged'):
+            continue
+        print(format_file(file_))
+        for i in below.get(index, ()):
+            print(
+                f"    {signals['name'][i]}: error "
+                f"{signals['mean_error'][i]:.0f}/"
+                f"{signals['max_error'][i]}us, unit "
+                f"{signals['unit'][i]:.1f}us, margin "
+                f"{signals['margin'][i]}us")
+
+    flagged = sum(1 for file_ in files if file_.get('flagged'))
+    margins = signals['margin']
+    print(
+        f'{len(files)} files, {len(margins)} signals profiled, '
+        f'{int((margins < args.min_margin).sum())} below '
+        f'{args.min_margin}us margin, {flagged} files flagged',
+        file=sys.stderr)
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == '__main__':
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_quality')
+        assert False, 'should not get here'
+    main()
@@ -0,0 +1,355 @@
+"""
+Long-running conversion service on a Unix socket
+
+Starting Python and warming the decoder caches costs more than decoding
+a typical file. This service does that once: requests are read by an
+asyncio server, collected into batches and decoded in a pool of worker
+processes, which keep their caches between requests. The workers share
+one memory-mapped decode table (see dolpyn.ir_tables).
+
+The protocol is one JSON object per line, both ways. Requests carry an
+optional "id" that is copied to the response; responses on a connection
+may come back in a different order than the requests were sent.
+
+    {"id": 1, "op": "decode", "frequency": 36000, "data": [889, ...]}
+    {"id": 1, "ok": true, "result": {"protocol": "RC5marantz", ...}}
+
+    {"id": 2, "op": "raw2parsed", "ir": "Filetype: IR signals file..."}
+    {"id": 2, "ok": true, "result": "Filetype: IR signals file..."}
+
+    {"id": 3, "op": "bogus"}
+    {"id": 3, "ok": false, "error": "ValueError: unknown op 'bogus'"}
+
+The ops are "decode" (raw durations; optional "name", "duty_cycle"),
+"raw2parsed" and "compact" (both take .ir file contents in "ir").
+
+When the workers cannot keep up, at most max_pending requests are
+queued; after that the server stops reading from the connections, so
+that clients are slowed down instead of the server running out of memory.
+
+Usage:
+
+    ./ir_service.py serve [-j WORKERS] [--socket PATH]
+    ./ir_service.py bench [-c CONNECTIONS] [-n REQUESTS] [--ir FILE]
+"""
+import argparse
+import asyncio
+import errno
+import json
+import os
+import stat
+import sys
+import time
+from functools import lru_cache
+from io import StringIO
+
+from dolpyn.ir_signals import (
+    IrFile, RawIrSignal, Rc5MarantzIrSignal, compact_signal, decode_signal,
+    signal_key)
+
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get('XDG_RUNTIME_DIR', '/tmp'),
+    f'dolpyn-ir-{os.getuid()}.sock')
+MAX_BATCH = 64              # requests per worker task
+BATCH_DELAY = 0.001         # seconds to wait for a batch to fill up
+MAX_PENDING = 1024          # queued requests before reading is paused
+MAX_REQUEST = 16 << 20      # bytes per request line
+
+
+def handle_request(request):
+    """
+    Return the result for one request; runs in a worker process
+    """
+    op = request.get('op')
+    if op == 'decode':
+        return _decode(
+            request.get('name', 'signal'),
+            int(request.get('frequency', 36000)),
+            float(request.get('duty_cycle', 0.33)),
+            tuple(int(duration) for duration in request['data']))
+    elif op == 'raw2parsed':
+        from dolpyn.rc5marantz_raw2parsed import raw2parsed
+
+        # Records that were in the previous request are not decoded again.
+        return ''.join(raw2parsed(
+            StringIO(request['ir']), 'request', cache=_record_cache))
+    elif op == 'compact':
+        from dolpyn.ir_compact import compact_ir_file
+
+        return ''.join(compact_ir_file(StringIO(request['ir'])))
+    raise ValueError(f'unknown op {op!r}')
+
+
+def handle_batch(requests):
+    """
+    Return a response dict for every request; runs in a worker process
+    """
+    responses = []
+    for request in requests:
+        try:
+            responses.append({'ok': True, 'result': handle_request(request)})
+        except Exception as exc:
+            responses.append({
+                'ok': False, 'error': f'{exc.__class__.__name__}: {exc}'})
+    return responses
+
+
+_record_cache = {}  # raw2parsed() cache, per worker process
+
+
+@lru_cache(maxsize=4096)
+def _decode(name, frequency, duty_cycle, data):
+    decoded = decode_signal(
+        RawIrSignal(name, frequency, duty_cycle, list(data)))
+    protocol, address, command, extension = signal_key(decoded)
+    if protocol == 'raw':
+        address = None  # signal_key() has the frequency there
+    return {
+        'protocol': protocol, 'address': address, 'command': command,
+        'extension': extension, 'ir': str(compact_signal(decoded))}
+
+
+def warm_up(table_path=None):
+    "Worker initializer: import and exercise the decoders once"
+    if table_path:
+        from dolpyn.ir_tables import attach
+
+        attach(table_path)
+
+    signal = Rc5MarantzIrSignal('warm up', 16, 12, 1).as_raw()
+    text = f'{IrFile.HEADER}{signal}\n'
+    handle_batch([
+        {'op': 'decode', 'data': signal.data},
+        {'op': 'raw2parsed', 'ir': text},
+        {'op': 'compact', 'ir': text}])
+
+
+class Service:
+    """
+    Read requests from connections and feed them in batches to executor
+    """
+    def __init__(self, executor, workers, max_batch=MAX_BATCH,
+                 batch_delay=BATCH_DELAY, max_pending=MAX_PENDING):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        # Two batches per worker: one running, one ready to go.
+        self._slots = asyncio.Semaphore(2 * workers)
+
+    async def serve(self, path):
+        await self._remove_stale_socket(path)
+        server = await asyncio.start_unix_server(
+            self.handle_connection, path, limit=MAX_REQUEST)
+        dispatcher = asyncio.ensure_future(self.dispatch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            dispatcher.cancel()
+            os.unlink(path)
+
+    @staticmethod
+    async def _remove_stale_socket(path):
+        # Only a socket that refuses connections is left over from a
+        # service that is gone; anything else is not ours to remove.
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(errno.EEXIST, 'not a socket', path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+        writer.close()
+        raise FileExistsError(
+            errno.EADDRINUSE, 'another service is listening', path)
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        responses = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # line longer than MAX_REQUEST
+                    self._write(writer, None, {
+                        'ok': False, 'error': 'request too large'})
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    request_id = request.get('id')
+                except (AttributeError, ValueError) as exc:
+                    self._write(writer, None, {
+                        'ok': False, 'error': f'bad request: {exc}'})
+                    continue
+
+                future = loop.create_future()
+                await self._queue.put((request, future))  # backpressure
+                task = asyncio.ensure_future(
+                    self._respond(writer, request_id, future))
+                responses.add(task)
+                task.add_done_callback(responses.discard)
+
+            if responses:
+                await asyncio.gather(*responses)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, request_id, future):
+        self._write(writer, request_id, await future)
+        await writer.drain()
+
+    def _write(self, writer, request_id, response):
+        response['id'] = request_id
+        writer.write(json.dumps(response).encode() + b'\n')
+
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            self._fill(batch)
+            if len(batch) < self.max_batch and self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+                self._fill(batch)
+
+            await self._slots.acquire()
+            requests = [request for request, future in batch]
+            task = loop.run_in_executor(self.executor, handle_batch, requests)
+            task.add_done_callback(
+                lambda task, batch=batch: self._batch_done(batch, task))
+
+    def _fill(self, batch):
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+
+    def _batch_done(self, batch, task):
+        self._slots.release()
+        try:
+            responses = task.result()
+        except Exception as exc:  # e.g. a worker died
+            responses = [
+                {'ok': False, 'error': f'{exc.__class__.__name__}: {exc}'}
+            ] * len(batch)
+        for (request, future), response in zip(batch, responses):
+            if not future.cancelled():
+                future.set_result(dict(response))
+
+
+async def bench(path, connections, requests, request):
+    """
+    Send requests over connections in parallel; return (latencies, seconds)
+    """
+    line = json.dumps(request).encode() + b'\n'
+    latencies = []
+
+    async def client(count):
+        reader, writer = await asyncio.open_unix_connection(
+            path, limit=MAX_REQUEST)
+        try:
+            for i in range(count):
+                start = time.perf_counter()
+                writer.write(line)
+                await writer.drain()
+                response = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - start)
+                if not response['ok']:
+                    raise RuntimeError(response['error'])
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(requests // connections + (i < requests % connections))
+        for i in range(connections)])
+    return latencies, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(
+        len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Conversion service on a Unix socket.')
+    parser.add_argument(
+        '--socket', default=DEFAULT_SOCKET, metavar='PATH',
+        help=f'socket path (default: {DEFAULT_SOCKET})')
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+
+    serve_parser = subparsers.add_parser('serve', help='run the service')
+    serve_parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count(), metavar='N',
+        help='worker processes (default: CPU count)')
+    serve_parser.add_argument(
+        '--max-batch', type=int, default=MAX_BATCH, metavar='N',
+        help=f'requests per worker task (default: {MAX_BATCH})')
+    serve_parser.add_argument(
+        '--max-pending', type=int, default=MAX_PENDING, metavar='N',
+        help=f'queued requests before reading pauses (default: '
+             f'{MAX_PENDING})')
+
+    bench_parser = subparsers.add_parser('bench', help='load-test a service')
+    bench_parser.add_argument(
+        '-c', '--connections', type=int, default=16, metavar='N',
+        help='parallel connections (default: 16)')
+    bench_parser.add_argument(
+        '-n', '--requests', type=int, default=10000, metavar='N',
+        help='total requests (default: 10000)')
+    bench_parser.add_argument(
+        '--ir', metavar='FILE',
+        help='send FILE for raw2parsed instead of decoding one signal')
+    args = parser.parse_args()
+
+    if args.action == 'serve':
+        from concurrent.futures import ProcessPoolExecutor
+        from dolpyn.ir_tables import ensure_tables
+
+        # Built once (and cached on disk); the workers share it read-only.
+        table_path = ensure_tables()
+        with ProcessPoolExecutor(
+                max_workers=args.jobs, initializer=warm_up,
+                initargs=(table_path,)) as executor:
+            service = Service(
+                executor, args.jobs, max_batch=args.max_batch,
+                max_pending=args.max_pending)
+            print(f'listening on {args.socket}', file=sys.stderr)
+            try:
+                asyncio.run(service.serve(args.socket))
+            except FileExistsError as exc:
+                sys.exit(str(exc))
+            except KeyboardInterrupt:
+                pass
+        return
+
+    if args.ir:
+        with open(args.ir) as fp:
+            request = {'op': 'raw2parsed', 'ir': fp.read()}
+    else:
+        data = Rc5MarantzIrSignal('bench', 16, 37, 45).as_raw().data
+        request = {'op': 'decode', 'data': [i - 3 for i in data]}
+
+    latencies, seconds = asyncio.run(bench(
+        args.socket, args.connections, args.requests, request))
+    latencies.sort()
+    print(
+        f'{len(latencies)} requests in {seconds:.2f}s: '
+        f'{len(latencies) / seconds:.0f} req/s, '
+        f'p50 {percentile(latencies, 0.50) * 1000:.2f}ms, '
+        f'p99 {percentile(latencies, 0.99) * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
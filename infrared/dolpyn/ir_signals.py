@@ -0,0 +1,831 @@
+"""
+dolpyn/infrared/ir_signals -- process Flipper Zero infrared files
+
+Author: Walter Doekes, 2022
+Useful info here: https://blog.flipperzero.one/infrared/
+"""
+from functools import partial
+
+
+class RawIrSignal:
+    """
+    Create a RAW infrared signal with a name, freq, duty_cycle and durations
+
+    The data (durations) denote the signal and gap duration:
+    [889, 1778] means 889us on and then 1778us OFF.
+
+    The ON signal itself is a wave with the specified frequency and
+    duty_cycle ON time.
+
+    ___   ___   ___   ___
+    | |   | |   | |   | |
+    | |   | |   | |   | |
+    | |___| |___| |___| |___________________________
+    0     1     2     3     4     5     6     7
+
+    For example, these three peaks shown could be a 33% duty_cycle over the
+    course of 4 time units.
+
+    A receiver will pick up these signals and record 4 time units as ON
+    and 4 time units as OFF. From there on, it will be processed into bits.
+
+    The flipper signal file might look like this:
+
+        name: Power
+        type: raw
+        frequency: 36000
+        duty_cycle: 0.25
+        data: 889 889 1778 1778 1778 889 889 889 ... 889 889 90664
+
+    This particular example uses manchester encoding:
+    - where OFF-ON means 1 and ON-OFF means 0;
+    - all semi-bits have the same duration (889us in this case);
+    - this first 889 means ON, so it will be read as the *second* half
+      bit of OFF-ON;
+    - so, for the first 4 numbers, we get:
+      OFF-(889)ON (889)OFF-(1778)ON ON-(1778)-OFF OFF-..;
+    - that translates to: 1 1 0.
+    """
+    def __init__(self, name, frequency, duty_cycle, data, comment=''):
+        assert 10000 <= frequency <= 56000, frequency
+        assert 0.0 <= duty_cycle <= 1.0, duty_cycle
+        self.name = name
+        self.frequency = frequency
+        self.duty_cycle = duty_cycle
+        self.data = data
+        self.comment = comment
+
+    def __str__(self):
+        data = ' '.join(str(i) for i in self.data)
+        return '\n'.join([
+            f'# {self.comment}'.rstrip(),
+            f'name: {self.name}',
+            'type: raw',
+            f'frequency: {self.frequency}',
+            f'duty_cycle: {self.duty_cycle:.2f}',
+            f'data: {data}',
+        ])
+
+
+class Rc5IrSignal:
+    """
+    Create an RC-5 infrared signal with a name, an address and a command
+
+    The flipper signal file might look like this:
+
+        name: Power
+        type: parsed
+        protocol: RC5
+        address: 10 00 00 00
+        command: 0C 00 00 00
+
+    Where for the RC5 protocol, the address must be in 0x00..0x3F and
+    command must be in 0x00..0x7F.
+
+    Description here: https://en.wikipedia.org/wiki/RC-5
+    """
+    REPEAT_DURATION = 113778    # 4096*36kHz: 113777.8us
+    HALF_BIT_DURATION = 889     # 32*36kHz: 888.9us
+    TOGGLE_BIT = 0x800          # "first press", flips on every press
+    FRAME_BITS = 14             # SCFAAAAACCCCCC
+    GAP_AFTER_BIT = None        # RC5marantz: OFF gap after this many bits
+    GAP_HALF_BITS = 0
+
+    protocol = 'RC5'
+
+    @classmethod
+    def from_raw(cls, raw_ir_signal):
+        name = (
+            raw_ir_signal.name.rsplit(' ', 1)[0]
+            if raw_ir_signal.name.endswith(' (raw)')
+            else raw_ir_signal.name)
+
+        bitstream = cls._durations_to_bitstream(
+            raw_ir_signal.data, cls.HALF_BIT_DURATION)
+
+        half_bits_28, rest = bitstream[0:28], bitstream[28:]
+        assert sum(rest) == 0 and len(rest) in (100, 101), (len(rest), rest)
+
+        numeric = cls._manchester_decode(half_bits_28)
+        return cls.from_numeric(name, numeric)
+
+    @classmethod
+    def from_numeric(cls, name, numeric):
+        assert numeric & 0x2000, bin(numeric)
+        first_press = numeric & 0x800
+        del first_press  # unused
+        address = (numeric & 0x7C0) >> 6
+        command = (((numeric & 0x1000) >> 6) ^ 0x40) | numeric & 0x3F
+        return cls(
+            name, address, command,
+            comment=f'{name} {cls._numeric_to_comment(numeric)}')
+
+    def __init__(self, name, address, command, comment=''):
+        assert 0x00 <= address < 0x20, address
+        assert 0x00 <= command < 0x80, command
+        self.name = name        # Power
+        self.address = address  # 0x10
+        self.command = command  # 0x0C
+        self.comment = comment
+
+    def as_comment(self):
+        numeric = self.to_numeric()
+        assert numeric < 0x4000, hex(numeric)
+        b = bin(numeric)[2:]
+        return (
+            f'{self.name} [{self.address} {self.command}] '
+            f'{{{b[0:3]}-{b[3:8]}-{b[8:]}}}')
+
+    def as_raw(self):
+        return RawIrSignal(
+            self.name + ' (raw)',
+            36000,  # 36kHz
+            0.25,   # 25% on, when on: ^___^___^___^___
+            self._make_durations(),
+            comment=self.as_comment(),
+        )
+
+    def to_numeric(self):
+        assert self.protocol == 'RC5', self.protocol
+        numeric = (
+            # SCFAAAAACCCCCC
+            # edcba987654321 (14-numeric)
+            0b10000000000000 |  # start
+            (0b1000000000000 if self.command < 0x40 else 0) |
+            (0b0100000000000 if False else 0) |  # first press
+            self.address << 6 |
+            self.command & 0x3F)
+        return numeric
+
+    def _make_durations(self, toggle=False):
+        numeric = self.to_numeric()
+        if toggle:
+            numeric |= self.TOGGLE_BIT
+
+        ret = [
+            count * self.HALF_BIT_DURATION
+            for count in self._half_bit_runs(numeric)]
+
+        # Add OFF time to fill up the repeat duration
+        assert len(ret) % 2 == 1, (len(ret), ret)
+        ret.append(self.REPEAT_DURATION - sum(ret))
+
+        return ret
+
+    @classmethod
+    def _half_bit_runs(cls, numeric):
+        """
+        Return the ON/OFF run lengths, in half-bits, of the frame of numeric
+
+        The runs start and end with ON. This (with _frame_runs()) is the
+        one place that knows the frame layout; the raw data of as_raw(),
+        the decode tables and the brute force templates all come from it.
+        """
+        head_bits = cls.GAP_AFTER_BIT or cls.FRAME_BITS
+        tail_bits = cls.FRAME_BITS - head_bits
+        return cls._frame_runs(
+            cls._manchester_runs(numeric >> tail_bits, head_bits),
+            cls._manchester_runs(numeric & ((1 << tail_bits) - 1), tail_bits))
+
+    @classmethod
+    def _frame_runs(cls, head, tail, unit=1):
+        """
+        Return the runs of a frame, joined from its Manchester encoded parts
+
+        The head and tail are (first_level, runs) from _manchester_runs();
+        for RC5marantz the gap goes in between. Runs of the same level are
+        merged. The leading OFF half-bit (of the start bit) and trailing
+        OFF are left out. With a unit, the runs may be durations too.
+        """
+        parts = [head, tail]
+        if cls.GAP_HALF_BITS:
+            parts.insert(1, (0, (cls.GAP_HALF_BITS * unit,)))
+        assert head[0] == 0, head  # the start bit is a 1: OFF, ON
+
+        ret = []
+        level = None
+        for first_level, runs in parts:
+            if not runs:
+                continue
+            if first_level == level:
+                ret[-1] += runs[0]
+                ret.extend(runs[1:])
+            else:
+                ret.extend(runs)
+            level = first_level ^ (len(runs) + 1) % 2
+        del ret[0]
+        if level == 0:
+            ret.pop()  # data must end with ON signal
+        return ret
+
+    @staticmethod
+    def _manchester_runs(value, bits):
+        """
+        Return (first_level, runs) for value Manchester encoded in bits
+
+        A 1 is OFF-ON, a 0 is ON-OFF. The runs are the half-bit counts of
+        alternating levels, starting with first_level.
+        """
+        if not bits:
+            return 0, []
+        runs = [1, 1]
+        previous = value >> (bits - 1) & 1
+        for shift in range(bits - 2, -1, -1):
+            bit = value >> shift & 1
+            if bit == previous:
+                runs.append(1)
+            else:
+                runs[-1] += 1
+            runs.append(1)
+            previous = bit
+        return 1 - (value >> (bits - 1) & 1), runs
+
+    @staticmethod
+    def _numeric_to_comment(numeric):
+        # Represent 0x1234 into {10010001-10100}
+        b = bin(numeric)[2:]
+        comment = '[raw] {{{}}}'.format(
+            '-'.join(b[i:i+8] for i in range(0, len(b), 8)))
+        return comment
+
+    @staticmethod
+    def _durations_to_bitstream(durations, half_bit_duration):
+        half_half_bit_duration = half_bit_duration // 2
+        bitstream = [0]  # assume [0, 1] start when manchester encoded
+        cur = 1
+        for idx, duration in enumerate(durations):
+            count = (duration + half_half_bit_duration) // half_bit_duration
+            assert count != 0, (count, duration, durations)
+            bitstream.extend([cur] * count)
+            cur ^= 1
+        return bitstream
+
+    @staticmethod
+    def _manchester_decode(bitstream):
+        numeric = 0
+        for code in zip(bitstream[0::2], bitstream[1::2]):
+            numeric <<= 1
+            assert code in ((0, 1), (1, 0)), (code, bitstream)
+            if code == (0, 1):
+                numeric |= 1
+        return numeric
+
+    def __str__(self):
+        assert self.protocol == 'RC5', self.protocol
+        return '\n'.join([
+            f'# {self.comment}'.rstrip(),
+            f'name: {self.name}',
+            'type: parsed',
+            f'protocol: {self.protocol}',
+            f'address: {self.address:02X} 00 00 00',
+            f'command: {self.command:02X} 00 00 00',
+        ])
+
+
+class Rc5MarantzIrSignal(Rc5IrSignal):
+    """
+    Create an RC-5 infrared signal with a name, an address and a command
+
+    The flipper signal file might look like this:
+
+        # BEWARE: As of 2022-09, this is NOT recognised by the Flipper Zero
+        name: Power
+        type: parsed
+        protocol: RC5marantz
+        address: 10 00 00 00
+        command: 0C 00 00 00
+
+    Where for the RC5 protocol, the address must be in 0x00..0x3F and
+    command must be in 0x00..0x7F. For the Marantz extension the
+    extension code must be in 0x00..0x3F.
+
+    The Marantz extension to RC5 consists of:
+    - instead of 14 consecutive bits;
+    - after the first 8 bits, there is a 2 bit duration gap (which would
+      be invalid manchester encoding);
+    - after that, there are the (last) 6 command bits;
+    - and then 6 extension bits.
+
+    Because the Flipper Zero does not grok this format, one can convert
+    it to a RawIrSignal, which *can* be read.
+
+    Example:
+
+        Rc5MarantzIrSignal('Direct volume 50%', 0x10, 0x6F, 0x20).as_raw()
+    """
+    TOGGLE_BIT = 0x20000
+    FRAME_BITS = 20             # SCFAAAAA, gap, CCCCCCEEEEEE
+    GAP_AFTER_BIT = 8
+    GAP_HALF_BITS = 4
+    protocol = 'RC5marantz'
+
+    @classmethod
+    def from_raw(cls, raw_ir_signal):
+        "Allow both RC5marantz and RC5 signals to be picked up here"
+        name = (
+            raw_ir_signal.name.rsplit(' ', 1)[0]
+            if raw_ir_signal.name.endswith(' (raw)')
+            else raw_ir_signal.name)
+
+        bitstream = cls._durations_to_bitstream(
+            raw_ir_signal.data, cls.HALF_BIT_DURATION)
+
+        if bitstream[16:20] == [0, 0, 0, 0]:
+            half_bits_16, half_bits_24, rest = (
+                bitstream[0:16], bitstream[20:44], bitstream[44:])
+            assert sum(rest) == 0 and len(rest) == 85, (len(rest), rest)
+            numeric = (
+                cls._manchester_decode(half_bits_16) << 12 |
+                cls._manchester_decode(half_bits_24))
+            return cls.from_numeric(name, numeric)
+        else:
+            half_bits_28, rest = bitstream[0:28], bitstream[28:]
+            assert sum(rest) == 0 and len(rest) in (100, 101), (len(rest), rest)
+            numeric = cls._manchester_decode(half_bits_28)
+            return Rc5IrSignal.from_numeric(name, numeric)
+
+    @classmethod
+    def from_numeric(cls, name, numeric):
+        assert numeric & 0x80000, bin(numeric)
+        first_press = numeric & 0x20000
+        del first_press  # unused
+        address = (numeric & 0x1F000) >> 12
+        command = (
+            (((numeric & 0x40000) >> 6) ^ 0x1000) | numeric & 0xFC0) >> 6
+        extension = numeric & 0x3F
+        return cls(
+            name, address, command, extension,
+            comment=f'{name} {cls._numeric_to_comment(numeric)}')
+
+    def __init__(self, name, address, command, extension, comment=''):
+        super().__init__(name, address, command, comment)
+        assert 0x00 <= extension < 0x40, extension
+        self.extension = extension
+
+    def as_comment(self):
+        numeric = self.to_numeric()
+        assert numeric < 0x100000, hex(numeric)
+        b = bin(numeric)[2:]
+        return (
+            f'{self.name} [{self.address} {self.command} {self.extension}] '
+            f'{{{b[0:3]}-{b[3:8]}--{b[8:14]}-{b[14:]}}}')
+
+    def to_numeric(self):
+        assert self.protocol == 'RC5marantz', self.protocol
+        numeric = (
+            # SCFAAAAACCCCCCEEEEEE (with two wait bits after bit 8)
+            # 43210fedcba987654321 (20-bits)
+            0b10000000000000000000 |  # start
+            (0b1000000000000000000 if self.command < 0x40 else 0) |
+            (0b0100000000000000000 if False else 0) |  # first press
+            self.address << 12 |
+            (self.command & 0x3F) << 6 |
+            self.extension)
+        return numeric
+
+    def __str__(self):
+        assert self.protocol == 'RC5marantz', self.protocol
+        return '\n'.join([
+            f'# {self.comment}'.rstrip(),
+            f'name: {self.name}',
+            'type: parsed',
+            f'protocol: {self.protocol}',
+            f'address: {self.address:02X} 00 00 00',
+            f'command: {self.command:02X} {self.extension:02X} 00 00',
+        ])
+
+
+DECODE_TABLE = None  # see dolpyn.ir_tables.attach()
+
+
+def decode_signal(signal):
+    """
+    Return the signal decoded as Rc5IrSignal/Rc5MarantzIrSignal if possible
+
+    Raw signals that do not decode as RC5 or RC5marantz are returned
+    unaltered, as are signals that are parsed already.
+    """
+    if isinstance(signal, RawIrSignal):
+        if DECODE_TABLE is not None:
+            decoded = DECODE_TABLE.decode(signal)
+            if decoded is not None:
+                return decoded
+        try:
+            return Rc5MarantzIrSignal.from_raw(signal)
+        except AssertionError:
+            pass
+    return signal
+
+
+def compact_signal(signal):
+    """
+    Return the smallest representation of signal that the Flipper loads
+
+    RC5 is kept (or becomes) parsed. RC5marantz is not recognised by the
+    Flipper, and its RC5 protocol only takes 6-bit commands, so those and
+    RC5 commands of 0x40 and up (RC5X) become canonical raw data (889us
+    multiples). Other raw signals are kept as is. Comments are dropped in
+    all cases.
+    """
+    decoded = decode_signal(signal)
+    if isinstance(decoded, Rc5IrSignal) and (
+            isinstance(decoded, Rc5MarantzIrSignal) or
+            decoded.command >= 0x40):
+        raw = decoded.as_raw()
+        raw.name = decoded.name
+        raw.comment = ''
+        return raw
+    elif isinstance(decoded, Rc5IrSignal):
+        return Rc5IrSignal(decoded.name, decoded.address, decoded.command)
+    return RawIrSignal(
+        decoded.name, decoded.frequency, decoded.duty_cycle, decoded.data)
+
+
+def signal_key(signal):
+    """
+    Return a hashable (protocol, address, command, extension) tuple
+
+    For raw signals, the protocol is 'raw' and the frequency takes the
+    place of the address. Command and extension are None.
+    """
+    if isinstance(signal, RawIrSignal):
+        return ('raw', signal.frequency, None, None)
+    return (
+        signal.protocol, signal.address, signal.command,
+        getattr(signal, 'extension', None))
+
+
+class IrParseError(ValueError):
+    """
+    A record (or line) of a signal file that could not be parsed
+    """
+    def __init__(self, message, filename='-', lineno=0):
+        super().__init__(message)
+        self.filename = filename
+        self.lineno = lineno
+
+    def __str__(self):
+        return f'{self.filename}:{self.lineno}: {self.args[0]}'
+
+
+class IrFile:
+    """
+    Read Flipper signal files
+
+    Files are read line by line, in a single pass. A record is a "name:"
+    line with the lines up to the next "#" or "name:" line, plus the "#"
+    (comment) line right before it, if any. Lines longer than MAX_LINE
+    and records longer than MAX_RECORD characters are skipped (without
+    reading them into memory) and reported as IrParseError, as are
+    records that do not make a valid signal. Parsing continues with the
+    next record, so one bad record never costs more than itself.
+    """
+    HEADER = 'Filetype: IR signals file\nVersion: 1\n'
+    MAX_LINE = 64 << 10         # characters, newline included
+    MAX_RECORD = 256 << 10      # characters, comment line included
+
+    @classmethod
+    def parse(cls, fp, filename='-', max_line=None, max_record=None):
+        """
+        Yield (signal, source) for every record and every other line
+
+        The signal is None for lines outside records and an IrParseError
+        for records that failed. Joined, the sources are the input,
+        except for the lines and records that were over the limits.
+        """
+        for lineno, record, source in cls.scan(
+                fp, filename, max_line, max_record):
+            if isinstance(record, list):
+                try:
+                    record = cls._record_to_signal(record, filename, lineno)
+                except IrParseError as exc:
+                    record = exc
+            yield record, source
+
+    @classmethod
+    def scan(cls, fp, filename='-', max_line=None, max_record=None):
+        """
+        Yield (lineno, record, source) without parsing the records
+
+        The record is None for lines outside records, the list of lines
+        of a record, or an IrParseError for a line or record over the
+        limits (the source is empty then). lineno is that of the first
+        line, or of the line that was too long.
+        """
+        max_line = max_line or cls.MAX_LINE
+        max_record = max_record or cls.MAX_RECORD
+        record = error = comment = None
+        start = size = 0
+
+        for lineno, line in cls._read_lines(fp, max_line):
+            if line is not None and line.startswith(('name:', '#')):
+                # The end of the record, if any.
+                if error is not None:
+                    yield start, error, ''
+                elif record is not None:
+                    yield start, record, ''.join(record)
+                record = error = None
+
+                if line[0] == '#':
+                    if comment is not None:
+                        yield comment[0], None, comment[1]
+                    comment = (lineno, line)
+                    continue
+                if comment is not None:
+                    (start, first), comment = comment, None
+                    record, size = [first], len(first)
+                else:
+                    start, record, size = lineno, [], 0
+            elif comment is not None:
+                yield comment[0], None, comment[1]
+                comment = None
+
+            if line is None:
+                exc = IrParseError(
+                    f'line longer than {max_line} characters', filename,
+                    lineno)
+                if record is None and error is None:
+                    yield lineno, exc, ''
+                elif error is None:
+                    record, error = None, exc
+            elif record is not None:
+                record.append(line)
+                size += len(line)
+                if size > max_record:
+                    record, error = None, IrParseError(
+                        f'record longer than {max_record} characters',
+                        filename, start)
+            elif error is None:
+                yield lineno, None, line
+
+        if error is not None:
+            yield start, error, ''
+        elif record is not None:
+            yield start, record, ''.join(record)
+        if comment is not None:
+            yield comment[0], None, comment[1]
+
+    @staticmethod
+    def _read_lines(fp, max_line):
+        # Yield (lineno, line); line is None if it is longer than
+        # max_line. Those are skipped in pieces of max_line characters.
+        readline = getattr(fp, 'readline', None)
+        if readline is None:  # an iterable of lines
+            for lineno, line in enumerate(fp, 1):
+                yield lineno, (line if len(line) <= max_line else None)
+            return
+
+        lineno = 0
+        while True:
+            line = readline(max_line + 1)
+            if not line:
+                return
+            lineno += 1
+            if len(line) > max_line:
+                while line and not line.endswith('\n'):
+                    line = readline(max_line + 1)
+                line = None
+            yield lineno, line
+
+    @classmethod
+    def _record_to_signal(cls, record, filename='-', lineno=0):
+        comment, kvs = cls._record_to_kvs(record, filename, lineno)
+        try:
+            signal = cls._kvs_to_signal(kvs, comment)
+        except KeyError as exc:
+            raise IrParseError(f'missing {exc}', filename, lineno)
+        except NotImplementedError:
+            raise IrParseError(
+                f"unsupported type {kvs['type']!r} (protocol "
+                f"{kvs.get('protocol')!r})", filename, lineno)
+        except (AssertionError, IndexError, ValueError) as exc:
+            raise IrParseError(
+                f'bad {kvs.get("type")} signal: {exc}', filename, lineno)
+        if isinstance(signal, RawIrSignal) and (
+                not signal.data or min(signal.data) <= 0):
+            raise IrParseError(
+                'data must be positive durations', filename, lineno)
+        return signal
+
+    @classmethod
+    def _record_to_kvs(cls, record, filename='-', lineno=0):
+        # Return (comment, {key: value}) for the lines of a record.
+        if record[0].startswith('#'):
+            comment = record[0][1:].strip()
+            skip = 1
+        else:
+            comment = ''
+            skip = 0
+        kvs = {}
+        for offset, line in enumerate(record[skip:], lineno + skip):
+            key, sep, value = line.partition(':')
+            if not sep:
+                if not line.strip():
+                    continue
+                raise IrParseError(
+                    f'expected "key: value", got {line[:40]!r}', filename,
+                    offset)
+            key = key.strip()
+            if key in kvs:
+                raise IrParseError(f'duplicate {key!r}', filename, offset)
+            kvs[key] = value.strip()
+        return comment, kvs
+
+    @classmethod
+    def _kvs_to_signal(cls, kvs, comment):
+        if kvs['type'] == 'raw':
+            return RawIrSignal(
+                name=kvs['name'], frequency=int(kvs['frequency']),
+                duty_cycle=float(kvs['duty_cycle']),
+                data=[int(i) for i in kvs['data'].split()],
+                comment=comment)
+        elif kvs['type'] == 'parsed' and kvs['protocol'] == 'RC5':
+            assert len(kvs) == 5, kvs
+            address = int(kvs['address'].split(' ', 1)[0], 16)
+            command = int(kvs['command'].split(' ', 1)[0], 16)
+            return Rc5IrSignal(
+                name=kvs['name'], address=address, command=command,
+                comment=comment)
+        elif kvs['type'] == 'parsed' and kvs['protocol'] == 'RC5marantz':
+            assert len(kvs) == 5, kvs
+            address = int(kvs['address'].split(' ', 1)[0], 16)
+            command = int(kvs['command'].split(' ', 1)[0], 16)
+            extension = int(kvs['command'].split(' ', 2)[1], 16)
+            return Rc5MarantzIrSignal(
+                name=kvs['name'], address=address, command=command,
+                extension=extension, comment=comment)
+        else:
+            raise NotImplementedError(kvs)
+
+
+class IrFileWriter:
+    """
+    Write signals to signal.ir files that are small enough for the Flipper
+
+    Signals are written as they come in (nothing is kept in memory). They
+    are put in a separate set of files per group_by(signal) result, and
+    every group is split into pages holding at most max_entries signals
+    and/or max_bytes bytes. The files are called:
+
+        <prefix>-<group>-<page>.ir  (or <prefix>-<page>.ir without groups)
+
+    Groups are made filename safe; groups that end up with the same name
+    (like 'Network(DMP):' and 'Network(DMP)') get a _2, _3 suffix.
+
+    Example:
+
+        with IrFileWriter('out/main_zone', max_entries=20,
+                          group_by=group_by_address) as writer:
+            for signal in signals:
+                writer.write(signal)
+    """
+    def __init__(self, prefix, max_entries=None, max_bytes=None,
+                 group_by=None, comments=()):
+        assert max_entries is None or max_entries > 0, max_entries
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.group_by = group_by
+        self.header = IrFile.HEADER + ''.join(f'{i}\n' for i in comments)
+        self.filenames = []
+        self._pages = {}  # group => [fp, page, entries, bytes]
+        self._slugs = {}  # group => filename part
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, signal):
+        group = self.group_by(signal) if self.group_by else None
+        record = f'{signal}\n'.encode()
+
+        page = self._pages.get(group)
+        if page is None or self._is_full(page, len(record)):
+            page = self._next_page(group, page)
+        page[0].write(record)
+        page[2] += 1
+        page[3] += len(record)
+
+    def close(self):
+        for fp, page, entries, bytes_ in self._pages.values():
+            fp.close()
+        self._pages.clear()
+
+    def _is_full(self, page, record_size):
+        fp, page, entries, bytes_ = page
+        if not entries:
+            return False  # always allow one, even if it is too large
+        if self.max_entries is not None and entries >= self.max_entries:
+            return True
+        if (self.max_bytes is not None and
+                bytes_ + record_size > self.max_bytes):
+            return True
+        return False
+
+    def _next_page(self, group, page):
+        if page is None:
+            page_number = 1
+        else:
+            page[0].close()
+            page_number = page[1] + 1
+
+        parts = [self.prefix]
+        if group is not None:
+            parts.append(self._slug(group))
+        parts.append(f'{page_number:02d}')
+        filename = '-'.join(parts) + '.ir'
+
+        header = self.header.encode()
+        fp = open(filename, 'wb')
+        fp.write(header)
+        self.filenames.append(filename)
+        page = self._pages[group] = [fp, page_number, 0, len(header)]
+        return page
+
+    def _slug(self, group):
+        slug = self._slugs.get(group)
+        if slug is None:
+            import re  # not needed by most users of this module
+
+            base = slug = re.sub(r'[^0-9A-Za-z]+', '_', group).strip('_')
+            taken = set(self._slugs.values())
+            count = 1
+            while slug in taken:
+                count += 1
+                slug = f'{base}_{count}'
+            self._slugs[group] = slug
+        return slug
+
+
+def group_by_address(signal):
+    "Group signals by RC5 address, for use with IrFileWriter"
+    signal = decode_signal(signal)
+    if isinstance(signal, RawIrSignal):
+        return 'raw'
+    return f'address_{signal.address:02d}'
+
+
+def group_by_name_prefix(prefixes, default='other'):
+    """
+    Return a group_by function that groups by (case insensitive) name prefix
+
+    Example:
+
+        group_by_name_prefix(['Network(DMP)', 'Internet Radio'])
+    """
+    prefixes = tuple((prefix.lower(), prefix) for prefix in prefixes)
+    # A partial (unlike a closure) can be passed to worker processes.
+    return partial(_group_by_name_prefix, prefixes, default)
+
+
+def _group_by_name_prefix(prefixes, default, signal):
+    name = signal.name.lower()
+    for lower_prefix, prefix in prefixes:
+        if name.startswith(lower_prefix):
+            return prefix
+    return default
+
+
+if __name__ == '__main__':
+    import os
+
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_signals')
+        assert False, 'should not get here'
+
+    print('Filetype: IR signals file\nVersion: 1')
+
+    # Example:
+    # - take this raw RC5marantz signal
+    auto1raw = RawIrSignal('AUTO/1', 36000, 0.25, [
+        888, 888, 1803, 1803, 1803, 888, 888, 888, 888, 888, 888, 5354,
+        1803, 888, 888, 1803, 1803, 1803, 888, 888, 1803, 1803, 888,
+        888, 1803, 1803, 888, 75573])
+    # name: AUTO/1
+    # type: raw
+    # frequency: 36000
+    # duty_cycle: 0.25
+    # data: 888 888 1803 1803 1803 888 888 888 888 888 888 5354 1803 ...
+    print(auto1raw)
+
+    # - decode it
+    auto1decoded = Rc5MarantzIrSignal.from_raw(auto1raw)
+    # name: AUTO/1
+    # type: parsed
+    # protocol: RC5marantz
+    # address: 10 00 00 00
+    # command: 25 2D 00 00
+    print(auto1decoded)
+
+    # - turn it back into a raw signal, because the Flipper does not do
+    #   protocol RC5marantz
+    auto1clean = auto1decoded.as_raw()
+    # name: AUTO/1-raw
+    # type: raw
+    # frequency: 36000
+    # duty_cycle: 0.25
+    # data: 889 889 1778 1778 1778 889 889 889 889 889 889 5334 1778 ...
+    print(auto1clean)
@@ -0,0 +1,210 @@
+"""
+dolpyn/infrared/ir_tables -- shared RC5/RC5marantz decode tables
+
+Rc5MarantzIrSignal.from_raw() rebuilds the half-bit stream of every
+signal it decodes. This module precomputes the half-bit run lengths of
+every RC5 and RC5marantz frame (toggle bit included) once, in a table
+file. Worker processes memory-map that file read-only: the pages
+are shared through the page cache, so memory use stays flat however many
+workers attach, and attaching costs next to nothing.
+
+A raw signal is decoded by rounding its durations to half-bit counts and
+looking those up in the table (a hash table with linear probing). A hit
+means the half-bit stream is the one from_raw() would decode, so the
+result is the same; anything else is left to from_raw().
+
+Example:
+
+    path = ensure_tables()          # build once, in the parent
+    with ProcessPoolExecutor(initializer=attach, initargs=(path,)) as ex:
+        ...                         # decode_signal() now uses the table
+
+File layout: MAGIC, count, key width and slot count (uint32), then at
+KEYS_OFFSET count keys of width bytes (run lengths, zero padded), count
+uint32 values (numeric, with MARANTZ_FLAG for RC5marantz) and the uint32
+slots (1 + key index, or 0 if empty; crc32 of the key picks the first).
+Native byte order; the magic tells which.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from zlib import crc32
+
+from dolpyn import ir_signals
+from dolpyn.ir_signals import Rc5IrSignal, Rc5MarantzIrSignal
+
+MAGIC = b'DOLPYNT' + (b'L' if sys.byteorder == 'little' else b'B')
+HEADER = struct.Struct('=8sIII')
+KEYS_OFFSET = 64
+MARANTZ_FLAG = 1 << 31
+VERSION = 2
+
+HALF_BIT_DURATION = Rc5IrSignal.HALF_BIT_DURATION
+RC5MARANTZ_HALF_BITS = 129      # from_raw(): 44 + 85
+RC5_HALF_BITS = (128, 129)      # from_raw(): 28 + 100 or 101
+
+
+def default_path():
+    cache_dir = (
+        os.environ.get('XDG_CACHE_HOME') or
+        os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'dolpyn', f'rc5-tables-{VERSION}.bin')
+
+
+def ensure_tables(path=None):
+    """
+    Return the path of the table file, building it if it does not exist
+    """
+    path = path or default_path()
+    if not os.path.exists(path):
+        build_tables(path)
+    return path
+
+
+def build_tables(path):
+    """
+    Write the table file to path (atomically, through a temp file)
+    """
+    entries = []
+
+    # RC5: 14 bits, start bit set. The ON/OFF runs end at the last ON.
+    for numeric in range(0x2000, 0x4000):
+        entries.append((bytes(Rc5IrSignal._half_bit_runs(numeric)), numeric))
+
+    # RC5marantz: 8 bits, a 4 half-bit OFF gap, 12 bits. The 128 heads
+    # and 4096 tails are combined, like _half_bit_runs() does.
+    head_bits = Rc5MarantzIrSignal.GAP_AFTER_BIT
+    tail_bits = Rc5MarantzIrSignal.FRAME_BITS - head_bits
+    tails = [
+        Rc5MarantzIrSignal._manchester_runs(tail, tail_bits)
+        for tail in range(1 << tail_bits)]
+    for head in range(1 << head_bits - 1, 1 << head_bits):
+        head_runs = Rc5MarantzIrSignal._manchester_runs(head, head_bits)
+        for tail, tail_runs in enumerate(tails):
+            runs = Rc5MarantzIrSignal._frame_runs(head_runs, tail_runs)
+            entries.append(
+                (bytes(runs), (head << tail_bits | tail) | MARANTZ_FLAG))
+
+    width = max(len(key) for key, value in entries)
+    keys = [key.ljust(width, b'\0') for key, value in entries]
+    mask = (1 << (2 * len(keys) - 1).bit_length()) - 1  # load <= 0.5
+    slots = array('I', bytes(4 * (mask + 1)))
+    for index, key in enumerate(keys):
+        slot = crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = index + 1
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp = f'{path}.tmp{os.getpid()}'
+    with open(temp, 'wb') as fp:
+        fp.write(HEADER.pack(MAGIC, len(keys), width, mask + 1).ljust(
+            KEYS_OFFSET, b'\0'))
+        fp.write(b''.join(keys))
+        fp.write(b'\0' * (-fp.tell() % 4))
+        array('I', [value for key, value in entries]).tofile(fp)
+        slots.tofile(fp)
+    os.replace(temp, path)
+    return path
+
+
+class DecodeTable:
+    """
+    A table file, memory-mapped read-only
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.width, slot_count = HEADER.unpack_from(
+            self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{path}: not a (native) table file')
+
+        view = memoryview(self._mmap)
+        keys_end = KEYS_OFFSET + self.count * self.width
+        values_offset = keys_end + (-keys_end % 4)
+        slots_offset = values_offset + 4 * self.count
+        self._keys = view[KEYS_OFFSET:keys_end]
+        self._values = view[values_offset:slots_offset].cast('I')
+        self._slots = view[
+            slots_offset:slots_offset + 4 * slot_count].cast('I')
+        self._mask = slot_count - 1
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        # The memoryviews must go before the mmap can be closed.
+        self._keys = self._values = self._slots = None
+        self._mmap.close()
+
+    def lookup(self, key):
+        "Return the value for the (padded) key, or None"
+        keys, width = self._keys, self.width
+        slot = crc32(key) & self._mask
+        while True:
+            index = self._slots[slot]
+            if not index:
+                return None
+            start = (index - 1) * width
+            if keys[start:start + width] == key:
+                return self._values[index - 1]
+            slot = (slot + 1) & self._mask
+
+    def decode(self, signal):
+        """
+        Return the decoded RC5/RC5marantz signal, or None if not found
+        """
+        half_half_bit = HALF_BIT_DURATION // 2
+        counts = [
+            (duration + half_half_bit) // HALF_BIT_DURATION
+            for duration in signal.data]
+        if len(counts) - 1 > self.width or not all(counts):
+            return None
+        try:
+            key = bytes(counts[:-1]).ljust(self.width, b'\0')
+        except ValueError:  # a count above 255
+            return None
+        value = self.lookup(key)
+        if value is None:
+            return None
+
+        half_bits = 1 + sum(counts)
+        name = (
+            signal.name.rsplit(' ', 1)[0]
+            if signal.name.endswith(' (raw)') else signal.name)
+        if value & MARANTZ_FLAG:
+            if half_bits != RC5MARANTZ_HALF_BITS:
+                return None
+            return Rc5MarantzIrSignal.from_numeric(
+                name, value & ~MARANTZ_FLAG)
+        if half_bits not in RC5_HALF_BITS:
+            return None
+        return Rc5IrSignal.from_numeric(name, value)
+
+
+def attach(path=None):
+    """
+    Use the table in this process: decode_signal() will look signals up
+
+    Meant as a worker initializer. Returns the DecodeTable.
+    """
+    table = DecodeTable(path or default_path())
+    ir_signals.DECODE_TABLE = table
+    return table
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else default_path()
+    build_tables(path)
+    table = DecodeTable(path)
+    print(
+        f'{path}: {len(table)} frames, {os.path.getsize(path)} bytes',
+        file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
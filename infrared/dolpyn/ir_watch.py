@@ -0,0 +1,329 @@
+"""
+Watch a tree of signal.ir files and reconvert them when they change
+
+Every .ir file below SOURCE_DIR is converted like
+rc5marantz_raw2parsed.py does, into the same relative path below
+OUTPUT_DIR. After that, changed files are reconverted as soon as they
+are saved; deleted files are deleted from OUTPUT_DIR as well.
+
+Changes are picked up with inotify on Linux (through ctypes, no extra
+dependencies) or by polling the modification times elsewhere. Bursts of
+events (editors writing a file in steps, captures being appended) are
+debounced into one conversion. The converted records are kept in memory,
+so only the records that changed are parsed and decoded again.
+
+Usage:
+
+    ./ir_watch.py -o parsed/ captures/
+    ./ir_watch.py --poll 0.2 -o parsed/ captures/
+"""
+import argparse
+import os
+import sys
+import time
+
+from dolpyn.rc5marantz_raw2parsed import raw2parsed
+
+DEFAULT_DEBOUNCE = 0.02     # seconds without events before converting
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+class _Watcher:
+    """
+    Base for the watchers: yields sets of changed relative paths
+    """
+    def __init__(self, root, suffix='.ir', ignore=None):
+        self.root = root
+        self.suffix = suffix
+        self.ignore = ignore  # directory to skip, e.g. the output
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def changes(self, debounce=DEFAULT_DEBOUNCE):
+        """
+        Yield sets of changed paths, after debounce seconds of quiet
+        """
+        while True:
+            changed = self.wait(None)
+            while True:
+                more = self.wait(debounce)
+                if not more:
+                    break
+                changed.update(more)
+            if changed:
+                yield changed
+
+    def wait(self, timeout):
+        "Return the set of paths that changed, waiting at most timeout"
+        raise NotImplementedError()
+
+    def scan(self):
+        "Return {relative_path: (mtime_ns, size)} for all watched files"
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if self.ignore:
+                dirnames[:] = [
+                    dirname for dirname in dirnames
+                    if not self._ignored(os.path.join(dirpath, dirname))]
+            for filename in filenames:
+                if filename.endswith(self.suffix):
+                    full_path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(full_path)
+                    except FileNotFoundError:
+                        continue
+                    files[os.path.relpath(full_path, self.root)] = (
+                        st.st_mtime_ns, st.st_size)
+        return files
+
+    def _ignored(self, path):
+        return (
+            self.ignore is not None and
+            os.path.realpath(path) == os.path.realpath(self.ignore))
+
+
+class PollingWatcher(_Watcher):
+    """
+    Find changes by comparing modification times and sizes
+    """
+    def __init__(self, root, suffix='.ir', ignore=None,
+                 interval=DEFAULT_POLL_INTERVAL):
+        super().__init__(root, suffix, ignore)
+        self.interval = interval
+        self._files = self.scan()
+
+    def wait(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            files = self.scan()
+            changed = {
+                relpath for relpath in set(files) | set(self._files)
+                if files.get(relpath) != self._files.get(relpath)}
+            self._files = files
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+
+class InotifyWatcher(_Watcher):
+    """
+    Find changes with Linux inotify; every directory gets its own watch
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (
+        IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+        IN_DELETE | IN_DELETE_SELF)
+
+    def __init__(self, root, suffix='.ir', ignore=None):
+        import ctypes
+        import ctypes.util
+
+        super().__init__(root, suffix, ignore)
+        self._libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self._fd = self._libc.inotify_init1(
+            self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}  # watch descriptor: directory
+        self._known = set()  # relative paths of the watched files
+        self._add_tree(root)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def wait(self, timeout):
+        import select
+        import struct
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        try:
+            buf = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(buf):
+            wd, mask, cookie, length = struct.unpack_from('iIII', buf, offset)
+            name = buf[offset + 16:offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost: report everything.
+                changed.update(self.scan())
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            dirpath = self._dirs.get(wd)
+            if dirpath is None or not name:
+                continue
+
+            path = os.path.join(dirpath, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Files may have been written before the watch was
+                    # added; report all of them.
+                    changed.update(self._add_tree(path))
+                elif mask & self.IN_MOVED_FROM:
+                    changed.update(self._remove_tree(path))
+            elif path.endswith(self.suffix) and not (mask & self.IN_CREATE):
+                # IN_CREATE is followed by IN_CLOSE_WRITE.
+                relpath = os.path.relpath(path, self.root)
+                if mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+                    self._known.discard(relpath)
+                else:
+                    self._known.add(relpath)
+                changed.add(relpath)
+        return changed
+
+    def _add_tree(self, top):
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(top):
+            if self._ignored(dirpath):
+                dirnames[:] = []
+                continue
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = dirpath
+            found.update(
+                os.path.relpath(os.path.join(dirpath, filename), self.root)
+                for filename in filenames if filename.endswith(self.suffix))
+        self._known.update(found)
+        return found
+
+    def _remove_tree(self, top):
+        # A directory was moved away: stop watching it, its files are gone.
+        prefix = top + os.sep
+        for wd, dirpath in list(self._dirs.items()):
+            if dirpath == top or dirpath.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+        prefix = os.path.relpath(top, self.root) + os.sep
+        gone = {
+            relpath for relpath in self._known if relpath.startswith(prefix)}
+        self._known -= gone
+        return gone
+
+
+def open_watcher(root, ignore=None, poll=None):
+    """
+    Return an InotifyWatcher, or a PollingWatcher if poll is set or
+    inotify is unavailable
+    """
+    if poll is None:
+        try:
+            return InotifyWatcher(root, ignore=ignore)
+        except (AttributeError, OSError):
+            poll = DEFAULT_POLL_INTERVAL
+    return PollingWatcher(root, ignore=ignore, interval=poll)
+
+
+class Converter:
+    """
+    Convert files from source_dir to output_dir, keeping records warm
+    """
+    def __init__(self, source_dir, output_dir):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self._caches = {}  # relative path: raw2parsed() record cache
+
+    def convert(self, relpath):
+        """
+        (Re)convert one file; return True if the output changed
+        """
+        source = os.path.join(self.source_dir, relpath)
+        target = os.path.join(self.output_dir, relpath)
+        try:
+            with open(source) as fp:
+                output = ''.join(raw2parsed(
+                    fp, source, cache=self._caches.setdefault(relpath, {})))
+        except FileNotFoundError:
+            self._caches.pop(relpath, None)
+            try:
+                os.unlink(target)
+            except FileNotFoundError:
+                return False
+            return True
+
+        try:
+            with open(target) as fp:
+                if fp.read() == output:
+                    return False
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+
+        # Replace atomically, so readers never see half a file.
+        temp = f'{target}.tmp{os.getpid()}'
+        with open(temp, 'w') as fp:
+            fp.write(output)
+        os.replace(temp, target)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Reconvert signal.ir files as they change.')
+    parser.add_argument(
+        '-o', '--output', metavar='DIR', required=True,
+        help='output directory')
+    parser.add_argument(
+        '--poll', type=float, metavar='SECONDS',
+        help='poll for changes instead of using inotify')
+    parser.add_argument(
+        '--debounce', type=float, metavar='SECONDS',
+        default=DEFAULT_DEBOUNCE,
+        help=f'wait for quiet before converting (default: {DEFAULT_DEBOUNCE})')
+    parser.add_argument('source', metavar='SOURCE_DIR')
+    args = parser.parse_args()
+
+    converter = Converter(args.source, args.output)
+    with open_watcher(args.source, args.output, args.poll) as watcher:
+        print(
+            f'watching {args.source} ({watcher.__class__.__name__})',
+            file=sys.stderr)
+        for relpath in sorted(watcher.scan()):
+            converter.convert(relpath)
+
+        try:
+            for changed in watcher.changes(args.debounce):
+                start = time.perf_counter()
+                for relpath in sorted(changed):
+                    if converter.convert(relpath):
+                        elapsed = (time.perf_counter() - start) * 1000
+                        print(f'{relpath}: {elapsed:.1f}ms', file=sys.stderr)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+dolpyn/infrared/ir_wave -- render infrared signals as sampled waveforms
+
+A RawIrSignal describes the ON/OFF envelope. When ON, the LED is driven
+by a carrier wave with the signal frequency and duty_cycle. This module
+renders that carrier-modulated signal as audio samples, for audio-jack IR
+blasters or for feeding receivers in a simulation.
+
+Rendering is done in chunks of at most chunk_size samples, so a long
+sequence of signals never needs to be in memory at once. Needs NumPy.
+
+Usage:
+
+    ./dolpyn_ir_wave.py remote_control.ir output.wav [NAME...]
+    ./dolpyn_ir_wave.py --rate 384000 --raw float32 remote.ir output.pcm
+
+Without NAMEs, all signals in the file are rendered, one after another.
+"""
+import os
+import wave
+
+import numpy as np
+
+from dolpyn.ir_signals import IrFile, RawIrSignal
+
+DEFAULT_SAMPLE_RATE = 192000
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def render(signals, sample_rate=DEFAULT_SAMPLE_RATE, dtype=np.int16,
+           chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield sample arrays of at most chunk_size samples for all signals
+
+    Parsed signals are converted with as_raw() first. Integer dtypes use
+    the full positive range when ON, floats use 1.0. The time of every
+    edge is rounded to the nearest sample, without accumulating rounding
+    errors over long sequences.
+    """
+    dtype = np.dtype(dtype)
+    on_value = np.iinfo(dtype).max if dtype.kind in 'iu' else 1.0
+    start_us = 0
+
+    for signal in signals:
+        if not isinstance(signal, RawIrSignal):
+            signal = signal.as_raw()
+
+        # Sample number of every edge; even segments are ON.
+        bounds_us = np.empty(len(signal.data) + 1, dtype=np.int64)
+        bounds_us[0] = start_us
+        np.cumsum(signal.data, out=bounds_us[1:])
+        bounds_us[1:] += start_us
+        edges = (bounds_us * sample_rate + 500000) // 1000000
+        start_us = int(bounds_us[-1])
+
+        period = sample_rate / signal.frequency
+        for first in range(int(edges[0]), int(edges[-1]), chunk_size):
+            index = np.arange(
+                first, min(first + chunk_size, int(edges[-1])),
+                dtype=np.int64)
+            segment = np.searchsorted(edges, index, side='right') - 1
+            since_edge = index - edges[segment]
+            carrier = (since_edge % period) < (signal.duty_cycle * period)
+            samples = np.zeros(len(index), dtype=dtype)
+            samples[(segment % 2 == 0) & carrier] = on_value
+            yield samples
+
+
+def write_raw(fp, chunks):
+    "Write sample chunks to a binary file object without copying them"
+    for chunk in chunks:
+        fp.write(memoryview(chunk).cast('B'))
+
+
+def write_wav(filename, signals, sample_rate=DEFAULT_SAMPLE_RATE,
+              chunk_size=DEFAULT_CHUNK_SIZE):
+    "Render the signals into a mono 16-bit PCM WAV file"
+    with wave.open(filename, 'wb') as fp:
+        fp.setnchannels(1)
+        fp.setsampwidth(2)
+        fp.setframerate(sample_rate)
+        for chunk in render(
+                signals, sample_rate, np.dtype('<i2'), chunk_size):
+            fp.writeframesraw(memoryview(chunk).cast('B'))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Render infrared signals as a sampled waveform.')
+    parser.add_argument('input', metavar='INPUT.ir')
+    parser.add_argument('output', metavar='OUTPUT')
+    parser.add_argument('names', nargs='*', metavar='NAME')
+    parser.add_argument(
+        '--rate', type=int, default=DEFAULT_SAMPLE_RATE,
+        help=f'sample rate (default: {DEFAULT_SAMPLE_RATE})')
+    parser.add_argument(
+        '--raw', choices=('int16', 'float32'),
+        help='write headerless PCM samples instead of a WAV file')
+    args = parser.parse_args()
+
+    def signals():
+        with open(args.input) as fp:
+            for signal, source_lines in IrFile.parse(fp):
+                if signal is None or isinstance(signal, Exception):
+                    continue
+                if not args.names or signal.name in args.names:
+                    yield signal
+
+    if args.raw:
+        with open(args.output, 'wb') as fp:
+            write_raw(fp, render(signals(), args.rate, np.dtype(args.raw)))
+    else:
+        write_wav(args.output, signals(), args.rate)
+
+
+if __name__ == '__main__':
+    if os.environ.get('TEST', '0') == '1':
+        import unittest
+        unittest.main(module='test_dolpyn_ir_wave')
+        assert False, 'should not get here'
+    main()
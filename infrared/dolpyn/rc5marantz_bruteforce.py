@@ -0,0 +1,149 @@
+"""
+Generate every RC5/RC5marantz code in a range, to find undocumented ones
+
+Without --extension, parsed RC5 signals are generated for all addresses
+and commands. With --extension, RC5marantz signals are generated as raw
+signals (because the Flipper does not parse RC5marantz).
+
+The signals are generated lazily and written in device-sized chunks, so
+the full 262,144 code RC5marantz space (32 addresses, 128 commands, 64
+extensions) takes constant memory.
+
+Usage:
+
+    ./rc5marantz_bruteforce.py -o out/addr16 --address 16 \\
+        --command 0-127
+    ./rc5marantz_bruteforce.py -o out/addr16_cmd15 --address 16 \\
+        --command 15 --extension 0-63 --max-entries 20
+
+The signals are named after the "address;command;extension" columns of
+the Marantz IR sheet, e.g. "16 15 08".
+"""
+import argparse
+import sys
+
+from dolpyn.ir_signals import (
+    IrFileWriter, RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal)
+
+
+class Rc5MarantzFrameTemplates:
+    """
+    Cached duration fragments to quickly assemble RC5marantz raw data
+
+    A frame consists of the head (start, command-high, first-press and
+    5 address bits), a 4 half-bit gap and the tail (6 command and 6
+    extension bits). The head has 64 variants and the tail has 4096. Both
+    are cached as Manchester encoded durations, which
+    Rc5MarantzIrSignal._frame_runs() joins like it does for every frame.
+
+    The result is the same as Rc5MarantzIrSignal(...)._make_durations().
+    """
+    HALF_BIT_DURATION = Rc5MarantzIrSignal.HALF_BIT_DURATION
+    REPEAT_DURATION = Rc5MarantzIrSignal.REPEAT_DURATION
+    HEAD_BITS = Rc5MarantzIrSignal.GAP_AFTER_BIT
+    TAIL_BITS = Rc5MarantzIrSignal.FRAME_BITS - HEAD_BITS
+
+    def __init__(self):
+        self._heads = {}
+        self._tails = {}
+
+    def durations(self, address, command, extension):
+        head_key = (address, command < 0x40)
+        head = self._heads.get(head_key)
+        if head is None:
+            head = self._heads[head_key] = self._make_part(
+                0b10000000 |  # start
+                (0b1000000 if command < 0x40 else 0) |
+                address, self.HEAD_BITS)
+        tail_key = (command & 0x3F) << 6 | extension
+        tail = self._tails.get(tail_key)
+        if tail is None:
+            tail = self._tails[tail_key] = self._make_part(
+                tail_key, self.TAIL_BITS)
+
+        ret = Rc5MarantzIrSignal._frame_runs(
+            head, tail, self.HALF_BIT_DURATION)
+        ret.append(self.REPEAT_DURATION - sum(ret))
+        return ret
+
+    def _make_part(self, value, bits):
+        level, runs = Rc5MarantzIrSignal._manchester_runs(value, bits)
+        return level, [count * self.HALF_BIT_DURATION for count in runs]
+
+
+def rc5_signals(addresses, commands):
+    "Lazily yield parsed Rc5IrSignal objects for all addresses/commands"
+    for address in addresses:
+        for command in commands:
+            yield Rc5IrSignal(f'{address:02d} {command:02d}', address, command)
+
+
+def rc5marantz_signals(addresses, commands, extensions, templates=None):
+    "Lazily yield raw RC5marantz signals for all address/command/extensions"
+    templates = templates or Rc5MarantzFrameTemplates()
+    for address in addresses:
+        assert 0x00 <= address < 0x20, address
+        for command in commands:
+            assert 0x00 <= command < 0x80, command
+            for extension in extensions:
+                assert 0x00 <= extension < 0x40, extension
+                yield RawIrSignal(
+                    f'{address:02d} {command:02d} {extension:02d}',
+                    36000, 0.25,
+                    templates.durations(address, command, extension))
+
+
+def parse_range(value):
+    """
+    Parse "0-63" or "1,3,5-7" into a list of ints
+    """
+    ret = []
+    for part in value.split(','):
+        if '-' in part:
+            first, last = part.split('-', 1)
+            ret.extend(range(int(first), int(last) + 1))
+        else:
+            ret.append(int(part))
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate every RC5/RC5marantz code in a range.')
+    parser.add_argument(
+        '-o', '--output', metavar='PREFIX', required=True,
+        help='write PREFIX-NN.ir files')
+    parser.add_argument(
+        '--address', type=parse_range, default=parse_range('0-31'),
+        help='addresses to generate, e.g. 16 or 16-17 (default: 0-31)')
+    parser.add_argument(
+        '--command', type=parse_range, default=parse_range('0-127'),
+        help='commands to generate (default: 0-127)')
+    parser.add_argument(
+        '--extension', type=parse_range,
+        help='RC5marantz extensions to generate, e.g. 0-63')
+    parser.add_argument(
+        '--max-entries', type=int, default=20, metavar='N',
+        help='at most N signals per output file (default: 20)')
+    parser.add_argument(
+        '--max-bytes', type=int, metavar='N',
+        help='at most N bytes per output file')
+    args = parser.parse_args()
+
+    if args.extension is None:
+        signals = rc5_signals(args.address, args.command)
+    else:
+        signals = rc5marantz_signals(
+            args.address, args.command, args.extension)
+
+    with IrFileWriter(
+            args.output, max_entries=args.max_entries,
+            max_bytes=args.max_bytes) as writer:
+        for signal in signals:
+            writer.write(signal)
+
+    print(f'wrote {len(writer.filenames)} files', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
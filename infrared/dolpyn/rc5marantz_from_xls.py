@@ -0,0 +1,843 @@
+"""
+Create signal.ir file for the Flipper Zero from "csv" data
+
+By default, the values are hardcoded below. They are taken from the
+"MAIN ZONE" from the marantz-2014-ir excel sheet [1].
+
+Alternatively, pass CSV exports (one zone per file) or the .xls/.xlsx
+sheets themselves (needs xlrd/openpyxl). Every zone is then converted in
+parallel, in its own set of files. Rows are "name;address;command;
+extension", where an extension of "---" means plain RC5. The CSV
+delimiter (";", "," or tab) is detected from the first lines, unless
+--delimiter is given. Zones without any signals are reported; if no
+zone has any, the exit code is 1.
+
+[1] https://www.marantz.com/-/media/files/documentmaster/marantzna/\
+us/marantz-2014-ir-command-sheet.xls and turn it into:
+
+Usage:
+
+    ./rc5marantz_from_xls.py > main_zone.ir
+    ./rc5marantz_from_xls.py -o main_zone --max-entries 20 \\
+        --group-by 'prefix:network(dmp),internet radio'
+    ./rc5marantz_from_xls.py -o out/ --max-entries 20 \\
+        marantz-2014-ir-command-sheet.xls marantz-2016-*.csv
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+from collections import Counter
+from itertools import islice
+from warnings import warn
+
+from dolpyn.ir_signals import (
+    IrFileWriter, Rc5IrSignal, Rc5MarantzIrSignal, group_by_address,
+    group_by_name_prefix)
+
+MAIN_ZONE = '''\
+POWER ON/OFF;16;12;---
+POWER ON;16;12;01
+POWER OFF;16;12;02
+SYSTEM POWER OFF;16;12;13
+VOL +;16;16;---
+VOL -;16;17;---
+Direct VOLUME 25%;16;111;16
+Direct VOLUME 50%;16;111;32
+Direct VOLUME 75%;16;111;48
+Audio MUTE ON;16;13;00
+Audio MUTE OFF;16;13;01
+Audio MUTE (Toggle);16;13;---
+SPEAKER Sel.;16;29;---
+SPEAKER-A ON/OFF;16;35;---
+SPEAKER-A ON;16;35;00
+SPEAKER-A OFF;16;35;01
+SPEAKER-B ON/OFF;16;39;---
+SPEAKER-B ON;16;39;00
+SPEAKER-B OFF;16;39;01
+OSD Menu On;16;82;---
+MENU;16;82;60
+OPTION;16;82;11
+Source Select Menu;16;82;20
+EXIT MENU;16;83;---
+ENTER (OK);16;87;---
+Return;16;87;04
+CURSOR Up;16;80;---
+CURSOR Down;16;81;---
+CURSOR Left;16;85;---
+CURSOR Right;16;86;---
+Shift;16;32;00
+Soft keyboard/Search;16;82;61
+Insert;16;77;01
+Delete;16;78;01
+Dimmer(Display);16;15;00
+Dimmer;16;71;---
+Info.;16;15;08
+OSD Info.;16;15;---
+Status;16;15;07
+InstaPreview ON/OFF;16;15;20
+InstaPreview ON;16;15;21
+InstaPreview OFF;16;15;22
+Video Select;16;15;50
+VIDEO OFF (V.OFF);16;13;02
+INPUT NEXT;16;00;13
+INPUT BACK;16;00;14
+TUNER (TUNER,FM);17;63;---
+Blu-ray(BD)(Code1);07;63;00
+Blu-ray(BD)(Code2);28;63;00
+Blu-ray/DVD;16;02;04
+CD;20;63;---
+TV AUDIO(TV);00;63;---
+DVD;16;00;10
+MEDIAPLAYER(VCR1);05;63;---
+CBL/SAT(SAT,VCR2);06;63;---
+AUX1(AUX);16;00;06
+AUX2;16;00;07
+AUX3(Additional Source);16;00;08
+AUX4(Additional Source);16;02;00
+AUX5(Additional Source);16;02;01
+AUX6(Additional Source);16;02;02
+AUX7(Additional Source);16;02;03
+Bluetooth;16;02;16
+GAME;16;00;62
+GAME2;16;00;08
+PHONO;21;63;---
+USB(iPod/USB);24;63;01
+USB(iPod/USB)2;24;63;11
+Online Music(NETWORK);24;63;10
+Internet Radio Select;27;63;20
+Spotify (*6);27;63;28
+SIRIUSXM (*4);27;63;29
+Rhapsody Select (*4);27;63;21
+Napstar Select (*6);27;63;22
+Flickr Select;27;63;23
+Media Server Select;27;63;24
+Pandora Select (*4);27;63;26
+Last.fm Select (*5);27;63;27
+Online Music(NETWORK);27;63;10
+Online Music(NET);27;63;11
+M-XPort;29;63;01
+BALANCED;16;00;20
+7.1 (6.1) CH. Input ON/OFF;16;01;03
+7.1 (6.1) CH. Input ON;16;01;12
+7.1 (6.1) CH. Input OFF;16;01;13
+Smart Select1;16;02;21
+Smart Select2;16;02;22
+Smart Select3;16;02;23
+Smart Select4;16;02;24
+Smart Select5;16;02;25
+Input Mode Select;16;01;01
+INPUT MODE:AUTO;16;01;15
+INPUT MODE:HDMI;16;01;16
+INPUT MODE:DIGITAL;16;01;17
+INPUT MODE:ANALOG;16;01;18
+Bilingual (Audio Channel);16;01;14
+LIP SYNC.(Audio Delay);16;10;01
+Resolution(Analog);16;15;10
+Resolution(HDMI);16;15;11
+Vertical Stretch ON;16;15;12
+Vertical Stretch OFF;16;15;13
+HDMI Audio Output Select (Toggle);16;84;00
+HDMI Audio Output: Enable (Decode by AVR);16;84;01
+HDMI Audio Output: Through (Decode by TV);16;84;02
+HDMI AUTO LIP SYNC.: ENABLE;16;84;11
+HDMI AUTO LIP SYNC.: DISABLE;16;84;12
+I/P CONVERT: ENABLE;16;84;21
+I/P CONVERT: DISABLE;16;84;22
+COMPONENT-2 for MAIN;16;84;31
+COMPONENT-2 for MULTI-A;16;84;32
+Video Mode (Toggle);16;84;50
+Video Mode: Auto;16;84;51
+Video Mode: Movie;16;84;52
+Video Mode: Game;16;84;53
+HDMI In-1;16;84;41
+HDMI In-2;16;84;42
+HDMI In-3;16;84;43
+HDMI In-4;16;84;44
+HDMI Output Select (Toggle);16;120;00
+HDMI Out-1;16;120;01
+HDMI Out-2;16;120;02
+HDMI Out-Auto(Dual);16;120;03
+SURROUND MODE (Toggle/NEXT);16;37;---
+SURROUND MODE (Back);16;64;15
+MOVIE SURROUND;16;37;29
+MUSIC SURROUND;16;37;53
+GAME SURROUND;16;64;18
+AUTO;16;37;45
+STEREO;16;37;30
+MONO;16;37;37
+MULTI-CH Stereo/ Select;16;37;57
+MULTI-CH MOVIE;16;64;20
+MULTI-CH MUSIC (Stereo);16;64;21
+THX;16;64;13
+THX CINEMA;16;37;36
+THX SURRUND EX;16;37;58
+THX ULTRA 2;16;64;07
+THX 5.1 MUSIC;16;64;04
+THX GAMES;16;64;14
+NEURAL;16;64;16
+DOLBY;16;37;41
+PRO LOGIC;16;37;00
+PL IIx(z) Movie / PL II Movie;16;64;00
+PL IIx(z) Music / PL II Music;16;64;01
+PL IIx Game;16;64;12
+PL IIz;16;64;17
+Dolby Atomos ON/OFF;16;64;25
+DOLBY HEADPHONE;16;37;60
+EX/ES;16;37;61
+DTS Mode;16;64;08
+DTS;16;37;46
+DTS ES;16;64;03
+DTS Neo6 Cinema;16;64;05
+DTS Neo6 Music;16;64;06
+DTS NEO:X ON/OFF;16;64;22
+CS-II (SRS) (Toggle);16;64;09
+CS-II (SRS) Mono;16;64;10
+CS-II Cinema (CS 5.1 Cinema);16;64;02
+CS-II Music (CS 5.1 Music);16;37;62
+HALL;16;37;01
+STADIUM;16;37;02
+MATRIX;16;37;09
+MOVIE;16;37;29
+VIRTUAL;16;37;51
+Decoder Mode;16;01;20
+DSP MODE;16;37;63
+SOURCE(Pure) DIRECT (Toggle);16;34;---
+PURE DIRECT (Toggle);16;34;01
+Direct Mode;16;34;02
+Pure Direct;16;34;03
+All Zone Stereo ON/OFF;16;100;00
+All Zone Stereo ON;16;100;01
+All Zone Stereo OFF;16;100;02
+NIGHT (Toggle);16;37;42
+Re-EQ (Toggle);16;37;44
+Cinema EQ (HT-EQ)(Toggle);16;64;11
+Loudness Management ON/OFF(Toggle);16;64;19
+M-DAX;16;22;04
+M-DAX OFF;16;22;06
+M-DAX HIGH;16;22;07
+M-DAX LOW;16;22;08
+M-DAX MID;16;22;09
+Bass Sync UP;16;22;12
+Bass Sync DOWN;16;22;22
+TONE CONTROL ON/OFF (Toggle);16;22;01
+TONE CONTROL OFF;16;22;10
+TONE CONTROL ON;16;22;11
+BASS +;16;22;---
+BASS -;16;23;---
+TREBLE +;16;24;---
+TREBLE -;16;25;---
+TEST TONE;16;37;21
+Volume Reset;16;37;31
+CH. SELECT;16;37;33
+CH. LEVEL +;16;37;34
+CH. LEVEL -;16;37;35
+BALANCE RIGHT;16;26;---
+BALANCE LEFT;16;27;---
+Front L (A-TRIM) + (Up);16;26;01
+Front L (A-TRIM) - (Down);16;26;02
+Front R (B-TRIM) + (Up);16;26;03
+Front R (B-TRIM) - (Down);16;26;04
+Surround L + (Up);16;26;05
+Surround L - (Down);16;26;06
+Surround R + (Up);16;26;07
+Surround R - (Down);16;26;08
+Surround Back L + (Up);16;26;09
+Surround Back L - (Down);16;26;10
+Surround Back R + (Up);16;26;11
+Surround Back R - (Down);16;26;12
+Front Wide L + (Up);16;26;13
+Front Wide L - (Down);16;26;14
+Front Wide R + (Up);16;26;15
+Front Wide R - (Down);16;26;16
+Front Height L + (Up);16;26;17
+Front Height L - (Down);16;26;18
+Front Height R + (Up);16;26;19
+Front Height R - (Down);16;26;20
+Center + (Up);16;37;11
+Center - (Down);16;37;12
+Subwoofer + (Up);16;37;49
+Subwoofer - (Down);16;37;50
+Subwoofer 2 + (Up);16;64;23
+Subwoofer 2 - (Down);16;64;24
+Top Front L + (Up);16;26;21
+Top Front L - (Down);16;26;22
+Top Front R + (Up);16;26;23
+Top Front R - (Down);16;26;24
+Top Middle L + (Up);16;26;25
+Top Middle L - (Down);16;26;26
+Top Middle R + (Up);16;26;27
+Top Middle R - (Down);16;26;28
+Top Rear L + (Up);16;26;29
+Top Rear L - (Down);16;26;30
+Top Rear R + (Up);16;26;31
+Top Rear R - (Down);16;26;32
+Rear Height L + (Up);16;26;33
+Rear Height L - (Down);16;26;34
+Rear Height R + (Up);16;26;35
+Rear Height R - (Down);16;26;36
+Front Dolby L + (Up);16;26;37
+Front Dolby L - (Down);16;26;38
+Front Dolby R + (Up);16;26;39
+Front Dolby R - (Down);16;26;40
+Surround Dolby L + (Up);16;26;41
+Surround Dolby L - (Down);16;26;42
+Surround Dolby R + (Up);16;26;43
+Surround Dolby R - (Down);16;26;44
+Back Dolby L + (Up);16;26;45
+Back Dolby L - (Down);16;26;46
+Back Dolby R + (Up);16;26;47
+Back Dolby R - (Down);16;26;48
+Audyssey MultEQ: OFF;16;28;00
+Audyssey MultEQ MODE (Toggle);16;28;02
+Audyssey MultEQ MODE: UP;16;28;03
+Audyssey MultEQ MODE: DOWN;16;28;04
+Audyssey MultEQ: MODE-1;16;28;05
+Audyssey MultEQ: MODE-3;16;28;07
+Audyssey MultEQ: MODE-4;16;28;08
+Audyssey MultEQ: MODE-5;16;28;09
+Audyssey Dynamic EQ/VOL;16;28;40
+Audyssey Dynamic EQ Mode;16;28;20
+Audyssey Dynamic EQ Mode Off;16;28;21
+Audyssey Dynamic EQ Mode On;16;28;22
+Audyssey Dynamic Volume Mode;16;28;30
+Audyssey Dynamic Volume Mode Off;16;28;31
+Audyssey Dynamic Volume Mode L;16;28;32
+Audyssey Dynamic Volume Mode M;16;28;33
+Audyssey Dynamic Volume Mode H;16;28;34
+Audyssey Dynamic EQ Offset;16;28;50
+Audyssey Dynamic EQ Offset Off;16;28;51
+Audyssey Dynamic EQ Offset -5dB;16;28;52
+Audyssey Dynamic EQ Offset -10dB;16;28;53
+Audyssey Dynamic EQ Offset -15dB;16;28;54
+Audyssey LFC ON/OFF;16;64;40
+Audyssey LFC ON;16;64;41
+Audyssey LFC OFF;16;64;42
+Audyssey DSX ON/OFF;16;64;50
+Audyssey DSX OFF;16;64;51
+Audyssey DSX ON(Height);16;64;52
+Audyssey DSX ON(Wide);16;64;53
+Audyssey DSX ON(Wide/Height);16;64;54
+Graphic EQ ON/OFF;16;28;10
+Graphic EQ ON;16;28;12
+Graphic EQ OFF;16;28;11
+ECO Mode;16;58;10
+ECO Mode ON;16;58;12
+ECO Mode OFF;16;58;11
+ECO Mode AUTO;16;58;13
+SLEEP;16;38;---
+SLEEP OFF;16;38;00
+DC Trgger-1 ON;16;125;01
+DC Trgger-1 OFF;16;125;02
+DC-Trgger-2 ON;16;125;03
+DC-Trgger-2 OFF;16;125;04
+DC Trgger-3 ON;16;125;05
+DC Trgger-3 OFF;16;125;06
+DC-Trgger-4 ON;16;125;07
+DC-Trgger-4 OFF;16;125;08
+BAND;17;63;---
+;17;47;01
+FM;17;45;---
+AM;17;46;---
+DISPLAY MODE;17;15;---
+T-MODE;17;37;---
+MEMO (MEMORY);17;41;---
+CLEAR;17;58;---
+FREQ. Direct;17;11;---
+FREQ.(tuning) Up +;17;30;---
+FREQ.(tuning) Down -;17;31;---
+PRESET Up +;17;32;---
+PRESET Down -;17;33;---
+PRESET SCAN;17;43;---
+PRESET INFO;17;82;---
+PRESET Direct 1;17;64;01
+PRESET Direct 2;17;64;02
+PRESET Direct 5;17;64;05
+PRESET Direct 25;17;64;25
+0 (PRESET 0);17;00;---
+1 (PRESET 1);17;01;---
+2 (PRESET 2);17;02;---
+3 (PRESET 3);17;03;---
+4 (PRESET 4);17;04;---
+5 (PRESET 5);17;05;---
+6 (PRESET 6);17;06;---
+7 (PRESET 7);17;07;---
+8 (PRESET 8);17;08;---
+9 (PRESET 9);17;09;---
+PRESET SHIFT;17;32;00
+SHIFT A;17;32;30
+SHIFT B;17;32;31
+SHIFT C;17;32;32
+SHIFT D;17;32;33
+SHIFT E;17;32;34
+SHIFT F;17;32;35
+SHIFT G;17;32;36
+Cursor Up;17;80;01
+Cursor Down;17;81;01
+Cursor Left;17;85;01
+Cursor Right;17;86;01
+Cursor Enter;17;87;01
+RETURN;17;83;01
+HD-RADIO SEEK UP;17;30;10
+HD-RADIO SEEK DOWN;17;31;10
+PTY　(For Europe Model);17;120;---
+RT　(For Europe Model);17;120;40
+RDS/SEARCH;17;120;60
+iPod Mode Select (Toggle);16;82;07
+Cursor Up;24;80;01
+Cursor Down;24;81;01
+Back;24;83;01
+Cursor Left;24;85;01
+Cursor Right;24;86;01
+Enter;24;87;01
+Return;24;87;21
+Page Search/Character Search;24;80;04
+Page Previous;24;32;20
+Page Next;24;33;20
+Top;24;82;02
+Info.;24;82;05
+Play/Pause;24;53;00
+Play;24;53;01
+iPod Play;24;53;31
+Pause;24;48;01
+Stop;24;54;01
+Next;24;32;01
+Previous;24;33;01
+REW (Toggle);24;50;01
+REW 1 (x2 speed);24;50;05
+REW 2 (x4 speed);24;50;06
+REW 3 (x8 speed);24;50;07
+FF (Toggle);24;52;01
+FF 1 (x2 speed);24;52;05
+FF 2 (x4 speed);24;52;06
+FF 3 (x8 speed);24;52;07
+Random(Toggle);24;28;01
+Random Off;24;28;02
+Random On(Songs);24;28;03
+Random (Album);24;28;04
+Repeat(Toggle);24;29;01
+Repeat Off;24;29;02
+Repeat One;24;29;03
+Repeat All;24;29;04
+Repeat Folder;24;29;05
+Screen Saver On/Off (Toggle);24;110;01
+SHIFT;24;32;00
+MEMORY;24;41;50
+PRESET CH UP;24;32;20
+PRESET CH DOWN;24;33;20
+PRESET 1;24;01;01
+PRESET 2;24;02;01
+PRESET 3;24;03;01
+PRESET 4;24;04;01
+PRESET 5;24;05;01
+PRESET 6;24;06;01
+PRESET 7;24;07;01
+PRESET 8;24;08;01
+[Network(Digital Media Player)] 0;27;00;01
+[Network(Digital Media Player)] 1;27;01;01
+[Network(Digital Media Player)] 2;27;02;01
+[Network(Digital Media Player)] 3;27;03;01
+[Network(Digital Media Player)] 4;27;04;01
+[Network(Digital Media Player)] 5;27;05;01
+[Network(Digital Media Player)] 6;27;06;01
+[Network(Digital Media Player)] 7;27;07;01
+[Network(Digital Media Player)] 8;27;08;01
+[Network(Digital Media Player)] 9;27;09;01
+SHIFT A;27;01;60
+SHIFT B;27;02;60
+SHIFT C;27;03;60
+SHIFT D;27;04;60
+SHIFT E;27;05;60
+SHIFT F;27;06;60
+SHIFT G;27;07;60
+Network(DMP): Information;27;15;01
+Network(DMP): Random (toggle);27;28;01
+Network(DMP): Random Off;27;28;02
+Network(DMP): Random On;27;28;03
+Network(DMP): Repeat (toggle);27;29;01
+Network(DMP): Repeat Off;27;29;02
+Network(DMP): Repeat 1;27;29;03
+Network(DMP): Repeat All;27;29;04
+USB: Repeat Folder;27;29;05
+SHIFT;27;32;00
+PRESET CH UP;27;32;20
+PRESET CH DOWN;27;33;20
+Internet Radio Preset 1/FAVORITE STATION 1;27;34;11
+Internet Radio Preset 2/FAVORITE STATION 2;27;34;12
+Internet Radio Preset 3/FAVORITE STATION 3;27;34;13
+Internet Radio Preset 4/FAVORITE STATION 4;27;34;14
+Network(DMP)/USB: Next;27;32;01
+Network(DMP)/USB: Previous;27;33;01
+Network(DMP)/USB: Pause;27;48;01
+Network(DMP)/USB: REW;27;50;01
+Network(DMP)/USB: FF;27;52;01
+Network(DMP): Play(/Pause);27;53;01
+One Touch Play;27;53;04
+iPod Play;27;53;31
+Party mode (Toggle);27;53;41
+Internet Radio - Recent Played Station;27;53;50
+Favorite Direct Play;27;53;61
+Network(DMP): Stop;27;54;01
+JPEG Skip + (NEXT);27;32;10
+JPEG Skip - (PREVIOUS);27;33;10
+MEMORY;27;41;50
+Network(DMP): Cursor Up;27;80;01
+Network(DMP): Cursor Down;27;81;01
+Network(DMP): Cursor Left;27;85;01
+Network(DMP): Cursor Right;27;86;01
+Network(DMP): Enter;27;87;01
+Network(DMP): Page Next;27;80;04
+Network(DMP): Page Previous;27;81;04
+Network(DMP): Back;27;83;01
+Network(DMP): Return;27;87;21
+Network(DMP):HOME;27;82;02
+'''
+
+HEADER_COMMENTS = (
+    '#',
+    '# Marantz 2014 IR Command Sheet / MAIN ZONE',
+    '# converted by dolpyn_ir_signals.py / wdoekes',
+)
+DEFAULT_COLUMNS = (0, 1, 2, 3)  # name, address, command, extension
+CSV_DELIMITERS = ';,\t'
+CSV_SAMPLE_LINES = 50           # lines to detect the delimiter from
+
+
+def row_to_signal(name, address, command, extension):
+    """
+    Return the signal for a (validated) sheet row
+
+    Rows without extension become parsed RC5 signals. Rows with an
+    extension become raw RC5marantz signals, because the Flipper does not
+    parse those.
+    """
+    if extension is None:
+        signal = Rc5IrSignal(
+            name, address, command,
+            comment=f'{name} [{address} {command}]')
+    else:
+        signal = Rc5MarantzIrSignal(name, address, command, extension)
+        signal = signal.as_raw()
+        assert signal.name.endswith(' (raw)')
+        signal.name = signal.name[:-6]
+    signal.name = signal.name.lower()
+    return signal
+
+
+def main_zone_signals():
+    for line in MAIN_ZONE.strip().split('\n'):
+        try:
+            name, address, command, extension = line.rsplit(';', 3)
+            address, command = int(address), int(command)
+            extension = None if extension == '---' else int(extension)
+            signal = row_to_signal(name, address, command, extension)
+        except Exception as exc:
+            raise ValueError(line) from exc
+        yield signal
+
+
+def parse_row(cells, position, columns=DEFAULT_COLUMNS):
+    """
+    Validate a sheet row and return its signal, or None for non-data rows
+
+    Rows where neither the address nor the command is a number are
+    headings (or empty) and are skipped. All other rows must be valid; a
+    ValueError with the position (file:line) is raised if they are not.
+    """
+    name, address, command, extension = (
+        _cell_text(cells[column]) if column < len(cells) else ''
+        for column in columns)
+    if not address.isdigit() and not command.isdigit():
+        return None
+
+    address = _parse_int(address, 'address', 0x20, position)
+    command = _parse_int(command, 'command', 0x80, position)
+    if extension.strip('-') == '':
+        extension = None
+    else:
+        extension = _parse_int(extension, 'extension', 0x40, position)
+    if not name:
+        name = ' '.join(
+            f'{i:02d}' for i in (address, command, extension)
+            if i is not None)
+        warn(f'{position}: empty name, using {name!r}')
+    return row_to_signal(name, address, command, extension)
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # spreadsheets store 16 as 16.0
+    return str(value).strip()
+
+
+def _parse_int(value, what, limit, position):
+    if not value.isdigit():
+        raise ValueError(f'{position}: {what} {value!r} is not a number')
+    value = int(value)
+    if value >= limit:
+        raise ValueError(
+            f'{position}: {what} {value} is out of range 0..{limit - 1}')
+    return value
+
+
+def list_zones(path):
+    """
+    Return the zones in a sheet file: the sheets of .xls/.xlsx files, or
+    the file name for CSV exports (one file per zone)
+    """
+    if path.endswith('.xls'):
+        import xlrd
+        return xlrd.open_workbook(path, on_demand=True).sheet_names()
+    elif path.endswith('.xlsx'):
+        import openpyxl
+        return openpyxl.load_workbook(path, read_only=True).sheetnames
+    return [os.path.splitext(os.path.basename(path))[0]]
+
+
+def sniff_delimiter(lines, min_cells=3):
+    """
+    Return the CSV delimiter of lines, one of CSV_DELIMITERS
+
+    That is the delimiter that splits the most lines into at least
+    min_cells cells (';' if there is a tie). The lines should be a sample
+    of the file: a title row like "MAIN ZONE" has no delimiters at all.
+    """
+    lines = list(lines)
+
+    def data_rows(delimiter):
+        return sum(
+            len(cells) >= min_cells
+            for cells in csv.reader(lines, delimiter=delimiter))
+
+    return max(CSV_DELIMITERS, key=data_rows)
+
+
+def iter_zone_rows(path, zone, delimiter=None):
+    """
+    Yield (position, cells) for all rows of a zone, one at a time
+
+    The delimiter is for CSV files; by default it is detected.
+    """
+    basename = os.path.basename(path)
+    if path.endswith('.xls'):
+        import xlrd
+        book = xlrd.open_workbook(path, on_demand=True)
+        sheet = book.sheet_by_name(zone)
+        for idx in range(sheet.nrows):
+            yield f'{basename}[{zone}]:{idx + 1}', sheet.row_values(idx)
+        book.release_resources()
+    elif path.endswith('.xlsx'):
+        import openpyxl
+        book = openpyxl.load_workbook(path, read_only=True)
+        for idx, cells in enumerate(
+                book[zone].iter_rows(values_only=True), 1):
+            yield f'{basename}[{zone}]:{idx}', cells
+        book.close()
+    else:
+        with open(path, newline='') as fp:
+            if delimiter is None:
+                delimiter = sniff_delimiter(islice(fp, CSV_SAMPLE_LINES))
+                fp.seek(0)
+            reader = csv.reader(fp, delimiter=delimiter)
+            for cells in reader:
+                yield f'{basename}:{reader.line_num}', cells
+
+
+def generate_zone(path, zone, prefix, columns=DEFAULT_COLUMNS,
+                  delimiter=None, **kwargs):
+    """
+    Write the signals of a zone to <prefix>-<page>.ir files
+
+    Returns (signal_count, filenames). The kwargs are passed to the
+    IrFileWriter. If the zone fails, the files written so far are
+    removed again.
+    """
+    comments = (
+        '#',
+        f'# Marantz IR Command Sheet / {zone}',
+        f'# source: {os.path.basename(path)}',
+        '# converted by dolpyn_ir_signals.py / wdoekes',
+    )
+    count = 0
+    writer = IrFileWriter(prefix, comments=comments, **kwargs)
+    try:
+        with writer:
+            for position, cells in iter_zone_rows(path, zone, delimiter):
+                signal = parse_row(cells, position, columns)
+                if signal is not None:
+                    writer.write(signal)
+                    count += 1
+    except BaseException:
+        for filename in writer.filenames:
+            os.unlink(filename)
+        raise
+    return count, writer.filenames
+
+
+def generate_all(paths, output_dir, columns=DEFAULT_COLUMNS, jobs=None,
+                 delimiter=None, **kwargs):
+    """
+    Generate the signal files for all zones of all sheets in parallel
+
+    Yields (path, zone, signal_count, filenames) as the zones finish.
+    Zones are written to <output_dir>/<file>[-<zone>]-<page>.ir; see
+    zone_names() for zones that would end up with the same name.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    zones = zone_names(paths)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for path, zone, name in zones:
+            future = executor.submit(
+                generate_zone, path, zone, os.path.join(output_dir, name),
+                columns, delimiter, **kwargs)
+            futures[future] = (path, zone)
+
+        for future in as_completed(futures):
+            path, zone = futures[future]
+            count, filenames = future.result()
+            yield path, zone, count, filenames
+
+
+def zone_names(paths):
+    """
+    Return (path, zone, name) for all zones of all sheets
+
+    The name is the file name, plus the zone if that is different. If
+    sheets in different directories (like 2014/main_zone.csv and
+    2016/main_zone.csv) end up with the same name, their directory name
+    is prepended. Names that are still the same raise a ValueError.
+    """
+    zones = []
+    for path in paths:
+        stem = _slug(os.path.splitext(os.path.basename(path))[0])
+        for zone in list_zones(path):
+            name = stem if _slug(zone) == stem else f'{stem}-{_slug(zone)}'
+            zones.append((path, zone, name))
+
+    counts = Counter(name for path, zone, name in zones)
+    ret, seen = [], {}
+    for path, zone, name in zones:
+        if counts[name] > 1:
+            directory = os.path.dirname(os.path.abspath(path))
+            name = f'{_slug(os.path.basename(directory))}-{name}'
+        if name in seen:
+            raise ValueError(
+                f'{path} [{zone}] and {seen[name]} would both be written '
+                f'to {name}-*.ir')
+        seen[name] = f'{path} [{zone}]'
+        ret.append((path, zone, name))
+    return ret
+
+
+def _slug(value):
+    return re.sub(r'[^0-9A-Za-z]+', '_', value).strip('_').lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create signal.ir files from the Marantz IR sheet.')
+    parser.add_argument(
+        'sheets', nargs='*', metavar='SHEET',
+        help=(
+            'CSV export (one zone per file) or .xls/.xlsx file (all '
+            'sheets); without these, the built-in MAIN ZONE is used'))
+    parser.add_argument(
+        '-o', '--output', metavar='PREFIX',
+        help=(
+            'write PREFIX-NN.ir files instead of writing everything '
+            'to stdout; with SHEET files, this is the output directory'))
+    parser.add_argument(
+        '--max-entries', type=int, metavar='N',
+        help='at most N signals per output file')
+    parser.add_argument(
+        '--max-bytes', type=int, metavar='N',
+        help='at most N bytes per output file')
+    parser.add_argument(
+        '--group-by', metavar='address|prefix:P1,P2,..',
+        help='write separate files per address or per name prefix')
+    parser.add_argument(
+        '--columns', default=','.join(str(i) for i in DEFAULT_COLUMNS),
+        metavar='N,A,C,E',
+        help=(
+            'zero-based sheet columns of name, address, command and '
+            'extension (default: 0,1,2,3)'))
+    parser.add_argument(
+        '--delimiter', choices=(';', ',', 'tab'),
+        help='CSV delimiter (default: detected)')
+    parser.add_argument(
+        '-j', '--jobs', type=int, metavar='N',
+        help='generate N zones in parallel (default: CPU count)')
+    args = parser.parse_args()
+
+    if args.output is None:
+        if args.max_entries or args.max_bytes or args.group_by:
+            parser.error('pagination options require --output')
+        if args.sheets:
+            parser.error('SHEET files require --output')
+        print('Filetype: IR signals file')
+        print('Version: 1')
+        for line in HEADER_COMMENTS:
+            print(line)
+        print('# NOTE: The flipper does NOT cope with this many entries!')
+        print('# As of writing this (sept 2022), the flipper will show')
+        print('# about 19 entries only.')
+        for signal in main_zone_signals():
+            print('#')
+            print(signal)
+        return
+
+    if args.group_by is None:
+        group_by = None
+    elif args.group_by == 'address':
+        group_by = group_by_address
+    elif args.group_by.startswith('prefix:'):
+        group_by = group_by_name_prefix(
+            args.group_by.split(':', 1)[1].split(','))
+    else:
+        parser.error(f'unknown --group-by {args.group_by!r}')
+
+    if args.sheets:
+        columns = tuple(int(i) for i in args.columns.split(','))
+        if len(columns) != 4:
+            parser.error('--columns needs 4 column numbers')
+        delimiter = '\t' if args.delimiter == 'tab' else args.delimiter
+        os.makedirs(args.output, exist_ok=True)
+        total = 0
+        try:
+            for path, zone, count, filenames in generate_all(
+                    args.sheets, args.output, columns, jobs=args.jobs,
+                    delimiter=delimiter, max_entries=args.max_entries,
+                    max_bytes=args.max_bytes, group_by=group_by):
+                print(
+                    f'{path} [{zone}]: {count} signals in '
+                    f'{len(filenames)} files', file=sys.stderr)
+                if not count:
+                    print(
+                        f'{parser.prog}: warning: no signals in {path} '
+                        f'[{zone}]; check --columns/--delimiter',
+                        file=sys.stderr)
+                total += count
+        except ValueError as exc:
+            parser.exit(1, f'{parser.prog}: {exc}\n')
+        if not total:
+            parser.exit(1, f'{parser.prog}: no signals found\n')
+        return
+
+    with IrFileWriter(
+            args.output, max_entries=args.max_entries,
+            max_bytes=args.max_bytes, group_by=group_by,
+            comments=HEADER_COMMENTS) as writer:
+        for signal in main_zone_signals():
+            writer.write(signal)
+
+    for filename in writer.filenames:
+        print(filename, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Convert signal.ir files from the Flipper Zero from "raw" data to "parsed/RC5"
+
+This script was tailored for use with Marantz raw data, but it could be used
+elsewhere as well.
+
+Usage:
+
+    ./rc5marantz_raw2parsed.py remote_control.ir
+    ./rc5marantz_raw2parsed.py Flipper-IRDB.zip parsed/
+
+Output:
+
+    <the same as input, but type: raw will be parsed>
+
+With an OUTPUT, all .ir files in the input directory or zip/tar archive
+are converted into the OUTPUT directory or archive instead.
+"""
+import os
+import sys
+from io import StringIO
+from warnings import warn
+
+from dolpyn.ir_signals import (
+    IrFile, IrParseError, RawIrSignal, Rc5MarantzIrSignal)
+
+
+def convert_signal(signal, filename='-'):
+    """
+    Return the signal parsed, if it is a raw RC5/RC5marantz signal
+
+    RC5marantz is returned as canonical raw data, because the Flipper
+    does not parse it. None means: copy the source record as is.
+    """
+    if not isinstance(signal, RawIrSignal):
+        return signal
+    try:
+        signal = Rc5MarantzIrSignal.from_raw(signal)
+    except AssertionError as exc:
+        # shrug.. lets skip this one
+        warn('skipping parse errors in {!r}'.format(filename))
+        return None
+
+    # If this is a now unsupported signal, we'll return it to raw.
+    if isinstance(signal, Rc5MarantzIrSignal):
+        signal = signal.as_raw()
+        # idempotent, from now on?
+        signal2 = Rc5MarantzIrSignal.from_raw(signal)
+        signal2 = signal2.as_raw()
+        assert signal.data == signal2.data
+    return signal
+
+
+def raw2parsed(fp, filename='-', cache=None):
+    """
+    Yield the contents of fp as strings, with the raw signals parsed
+
+    If a cache dict is passed, the converted records are kept in it, keyed
+    by their source text. Passing the same dict for the next version of
+    the file skips the records that did not change. Only the records of
+    the latest version are kept.
+    """
+    previous = {}
+    if cache is not None:
+        previous = dict(cache)
+        cache.clear()
+
+    just_wrote_comment = False
+    for lineno, record, source in IrFile.scan(fp, filename):
+        if isinstance(record, IrParseError):
+            warn(f'skipping {record}')
+            continue
+        try:
+            converted = previous[source]
+        except KeyError:
+            converted = None
+            if record is not None:
+                try:
+                    signal = IrFile._record_to_signal(
+                        record, filename, lineno)
+                except IrParseError:
+                    pass  # copied as is
+                else:
+                    signal = convert_signal(signal, filename)
+                    if signal is not None:
+                        converted = (bool(signal.comment), str(signal) + '\n')
+        if cache is not None:
+            cache[source] = converted
+
+        if converted is None:
+            yield source
+            just_wrote_comment = source[-1].startswith('#')
+        else:
+            has_comment, text = converted
+            if has_comment and not just_wrote_comment:
+                yield '#\n'
+            yield text
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit(f'Usage: {sys.argv[0]} FILE | PATH OUTPUT')
+    if len(sys.argv) == 2:
+        # Take SR-7000.ir from github.com/Lucaslhm/Flipper-IRDB:
+        with open(sys.argv[1]) as fp:
+            for output in raw2parsed(fp, sys.argv[1]):
+                sys.stdout.write(output)
+        return
+
+    from dolpyn.ir_archive import iter_sources, open_output
+
+    path, output_path = sys.argv[1:]
+    with open_output(output_path) as output:
+        for relpath, load in iter_sources(path):
+            relpath = relpath or os.path.basename(path)
+            with output.open(relpath) as fp:
+                fp.writelines(raw2parsed(StringIO(load()), relpath))
+
+
+if __name__ == '__main__':
+    main()
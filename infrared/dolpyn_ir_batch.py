@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""
+Runs dolpyn.ir_batch from a checkout, under its old script name
+"""
+import runpy
+
+runpy.run_module(
+    'dolpyn.ir_batch', run_name='__main__', alter_sys=True)
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""
+Runs dolpyn.ir_formats from a checkout, under its old script name
+"""
+import runpy
+
+runpy.run_module(
+    'dolpyn.ir_formats', run_name='__main__', alter_sys=True)
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Runs dolpyn.ir_quality from a checkout, under its old script name
+
+Installed, the same is "dolpyn-ir quality".
+"""
+import runpy
+
+runpy.run_module(
+    'dolpyn.ir_quality', run_name='__main__', alter_sys=True)
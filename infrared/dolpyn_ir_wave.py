@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Runs dolpyn.ir_wave from a checkout, under its old script name
+
+Installed, the same is "dolpyn-ir wave".
+"""
+import runpy
+
+runpy.run_module(
+    'dolpyn.ir_wave', run_name='__main__', alter_sys=True)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Fuzz and throughput harness for the signal file parser
+
+IrFile.scan() and IrFile.parse() read untrusted libraries, so they must
+never raise on bad input, never hold more than a record in memory and
+never take more than linear time. This checks that:
+
+- fuzz() mutates valid files (dropped, duplicated and swapped lines,
+  stray "#" and "name:" lines, garbage, blank lines, CRLF, huge lines,
+  truncation) and checks every result: only signals, None and
+  IrParseErrors come out, the sources are the input in order, minus only
+  what was reported as over the limits, and no source is over them;
+- throughput() times pathological inputs (one huge line, a huge record,
+  thousands of "#" or "name:" lines) at two sizes; four times the input
+  must take about four times as long.
+
+Usage:
+
+    ./ir_fuzz.py [-n ITERATIONS] [--seed SEED]
+    ./ir_fuzz.py --throughput [--size MB] [FILE...]
+"""
+import random
+import sys
+import time
+from io import StringIO
+
+from dolpyn.ir_signals import (
+    IrFile, IrParseError, RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal)
+
+MAX_LINE = 2000         # small limits, so the fuzzer hits them
+MAX_RECORD = 8000
+
+
+def sample_file(rnd, signals=20):
+    "Return the text of a valid signal file"
+    parts = [IrFile.HEADER]
+    for i in range(signals):
+        choice = rnd.randrange(3)
+        if choice == 0:
+            signal = Rc5IrSignal(f'rc5 {i}', 16, rnd.randrange(0x80))
+        elif choice == 1:
+            signal = Rc5MarantzIrSignal(
+                f'marantz {i}', 16, rnd.randrange(0x80), rnd.randrange(0x40))
+        else:
+            signal = Rc5IrSignal(f'raw {i}', 16, rnd.randrange(0x80))
+            signal = signal.as_raw()
+        parts.append(f'#\n{signal}\n')
+    return ''.join(parts)
+
+
+def mutate(text, rnd):
+    "Return text with a few random mutations"
+    lines = text.splitlines(True)
+    for i in range(rnd.randint(1, 5)):
+        at = rnd.randrange(len(lines) + 1)
+        choice = rnd.randrange(10)
+        if choice == 0 and lines:
+            del lines[min(at, len(lines) - 1)]
+        elif choice == 1 and lines:
+            lines.insert(at, rnd.choice(lines))
+        elif choice == 2:
+            lines.insert(at, rnd.choice(['#\n', '# x\n', 'name: x\n']))
+        elif choice == 3:
+            lines.insert(at, ''.join(
+                chr(rnd.randrange(1, 0x3000)) for i in range(40)) + '\n')
+        elif choice == 4:
+            lines.insert(at, rnd.choice(['\n', ' \n', ':\n', 'data:\n']))
+        elif choice == 5:
+            lines.insert(at, rnd.choice(['x', 'data: 9', '#']) * rnd.choice(
+                [MAX_LINE // 2, MAX_LINE, 3 * MAX_LINE]) + '\n')
+        elif choice == 6 and len(lines) > 1:
+            j = rnd.randrange(len(lines))
+            lines[at - 1], lines[j] = lines[j], lines[at - 1]
+        elif choice == 7:
+            lines = [line.replace('\n', '\r\n') for line in lines]
+        elif choice == 8:
+            lines.insert(at, f'name: big\n{"type: raw" * 100}\n' * 20)
+        elif choice == 9 and lines:
+            text = ''.join(lines)
+            lines = text[:rnd.randrange(len(text))].splitlines(True)
+    return ''.join(lines)
+
+
+def check(text, max_line=MAX_LINE, max_record=MAX_RECORD):
+    """
+    Parse text and assert that the result is sane; return the result
+    """
+    parsed = list(IrFile.parse(StringIO(text), 'fuzz', max_line, max_record))
+    position = 0
+    dropped = False
+    for signal, source in parsed:
+        assert signal is None or isinstance(
+            signal, (IrParseError, RawIrSignal, Rc5IrSignal)), signal
+        if not source:
+            assert isinstance(signal, IrParseError), signal
+            assert 'longer than' in str(signal), signal
+            dropped = True
+            continue
+        assert len(source) <= max(max_line, max_record), len(source)
+        found = text.find(source, position)
+        assert found == position or (dropped and found > position), (
+            position, found, source[:80])
+        position = found + len(source)
+    assert position == len(text) or dropped, (position, len(text))
+    return parsed
+
+
+def fuzz(iterations, seed=0):
+    "Check iterations mutated files; return the number of parse errors"
+    rnd = random.Random(seed)
+    errors = 0
+    for i in range(iterations):
+        text = mutate(sample_file(rnd, rnd.randint(0, 20)), rnd)
+        errors += sum(
+            isinstance(signal, IrParseError)
+            for signal, source in check(text))
+    return errors
+
+
+def pathological_inputs(size):
+    "Yield (description, text) of about size characters each"
+    record = str(Rc5IrSignal('power', 16, 12).as_raw()) + '\n'
+    yield 'valid records', IrFile.HEADER + (
+        f'#\n{record}' * (size // (len(record) + 2)))
+    yield 'one huge line', 'x' * size
+    yield 'huge data line', 'name: x\ntype: raw\ndata: ' + '9 ' * (size // 2)
+    yield 'huge record', 'name: x\n' + 'type: raw\n' * (size // 10)
+    yield 'only "#" lines', '#\n' * (size // 2)
+    yield 'only "name:" lines', 'name: x\n' * (size // 8)
+    yield 'no newlines', '#' * size
+
+
+def throughput(size, files=()):
+    """
+    Yield (description, megabytes, seconds, ratio) per input
+
+    The ratio is the time for four times the input divided by the time
+    for the input itself; linear time means about 4.
+    """
+    def timed(text):
+        start = time.perf_counter()
+        for item in IrFile.parse(StringIO(text)):
+            pass
+        return time.perf_counter() - start
+
+    inputs = list(pathological_inputs(size))
+    for filename in files:
+        with open(filename) as fp:
+            inputs.append((filename, fp.read()))
+    for description, text in inputs:
+        small = min(timed(text) for i in range(3))
+        large = min(timed(text * 4) for i in range(3))
+        yield description, len(text) / 1e6, small, large / max(small, 1e-9)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Fuzz and time the signal file parser.')
+    parser.add_argument(
+        '-n', '--iterations', type=int, default=10000, metavar='N',
+        help='mutated files to check (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--throughput', action='store_true',
+        help='time pathological inputs (and FILEs) instead')
+    parser.add_argument(
+        '--size', type=float, default=1.0, metavar='MB',
+        help='size of the pathological inputs (default: 1)')
+    parser.add_argument('files', nargs='*', metavar='FILE')
+    args = parser.parse_args()
+
+    if not args.throughput:
+        start = time.perf_counter()
+        errors = fuzz(args.iterations, args.seed)
+        print(
+            f'{args.iterations} files OK ({errors} parse errors reported) '
+            f'in {time.perf_counter() - start:.1f}s')
+        return
+
+    slow = False
+    for description, megabytes, seconds, ratio in throughput(
+            int(args.size * 1e6), args.files):
+        print(
+            f'{description}: {megabytes:.1f}MB in {seconds:.3f}s '
+            f'({megabytes / seconds:.1f}MB/s), x4 input: x{ratio:.1f} time')
+        slow = slow or ratio > 6
+    sys.exit(1 if slow else 0)
+
+
+if __name__ == '__main__':
+    main()
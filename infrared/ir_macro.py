@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Runs dolpyn.ir_macro from a checkout, under its old script name
+
+Installed, the same is "dolpyn-ir macro".
+"""
+import runpy
+
+runpy.run_module(
+    'dolpyn.ir_macro', run_name='__main__', alter_sys=True)
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Runs dolpyn.rc5marantz_bruteforce from a checkout, under its old script name
+
+Installed, the same is "dolpyn-ir bruteforce".
+"""
+import runpy
+
+runpy.run_module(
+    'dolpyn.rc5marantz_bruteforce', run_name='__main__', alter_sys=True)
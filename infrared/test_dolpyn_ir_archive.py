@@ -0,0 +1,68 @@
+"""
+Tests for dolpyn.ir_archive
+"""
+import os
+import unittest
+
+from dolpyn.ir_archive import iter_sources, open_output, safe_relpath
+
+
+class ArchiveTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        from tempfile import TemporaryDirectory
+
+        with TemporaryDirectory() as tempdir:
+            for suffix in ('.zip', '.tar', '.tar.gz'):
+                path = os.path.join(tempdir, f'library{suffix}')
+                with open_output(path) as output:
+                    with output.open('tv/b.ir') as fp1, \
+                            output.open('a.ir') as fp2:
+                        fp1.write('b\n')
+                        fp2.write('a\n')
+                    with output.open('README.txt') as fp:
+                        fp.write('skipped\n')
+
+                sources = [
+                    (relpath, load())
+                    for relpath, load in iter_sources(path)]
+                self.assertEqual(
+                    sorted(sources), [('a.ir', 'a\n'), ('tv/b.ir', 'b\n')])
+
+    def test_unsafe_paths(self):
+        import zipfile
+        from tempfile import TemporaryDirectory
+
+        self.assertEqual(safe_relpath('tv/./x/../a.ir'), 'tv/a.ir')
+        for relpath in ('../../escaped.ir', 'tv/../../escaped.ir', '/a.ir',
+                        '..\\escaped.ir', '.', ''):
+            with self.assertRaises(ValueError):
+                safe_relpath(relpath)
+
+        with TemporaryDirectory() as tempdir:
+            for name in ('../../escaped.ir', '/tmp/escaped.ir'):
+                path = os.path.join(tempdir, 'evil.zip')
+                with zipfile.ZipFile(path, 'w') as archive:
+                    archive.writestr('good.ir', 'good\n')
+                    archive.writestr(name, 'evil\n')
+                with self.assertRaises(ValueError):
+                    list(iter_sources(path))
+
+            os.makedirs(os.path.join(tempdir, 'a', 'b'))
+            for suffix in ('', '.zip', '.tar'):
+                path = os.path.join(tempdir, 'a', 'b', f'out{suffix}')
+                with open_output(path) as output:
+                    for name in ('../../escaped.ir', f'{tempdir}/escaped.ir'):
+                        with self.assertRaises(ValueError):
+                            output.open(name)
+            self.assertEqual(
+                [sorted(filenames) for dirpath, dirnames, filenames in os.walk(
+                    tempdir)],
+                [['evil.zip'], [], ['out.tar', 'out.zip']])
+
+    def test_plain_file(self):
+        self.assertEqual(
+            [relpath for relpath, load in iter_sources(__file__)], [''])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests for dolpyn.ir_batch
+"""
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    raise unittest.SkipTest('needs NumPy')
+
+from dolpyn.ir_batch import encode_rc5, encode_rc5marantz, to_flat
+from dolpyn.ir_signals import Rc5IrSignal, Rc5MarantzIrSignal
+
+
+class EncodeTestCase(unittest.TestCase):
+    def assertScalarEqual(self, durations, lengths, signals):
+        flat, offsets = to_flat(durations, lengths)
+        for idx, signal in enumerate(signals):
+            expected = signal._make_durations()
+            self.assertEqual(list(durations[idx, :lengths[idx]]), expected)
+            self.assertEqual(
+                list(flat[offsets[idx]:offsets[idx + 1]]), expected)
+            self.assertFalse(durations[idx, lengths[idx]:].any())
+
+    def test_encode_rc5(self):
+        addresses, commands = np.divmod(np.arange(0x20 * 0x80), 0x80)
+        durations, lengths = encode_rc5(addresses, commands)
+        self.assertScalarEqual(durations, lengths, [
+            Rc5IrSignal('x', int(address), int(command))
+            for address, command in zip(addresses, commands)])
+
+    def test_encode_rc5marantz(self):
+        codes = np.arange(0, 0x20 * 0x80 * 0x40, 7)
+        addresses, rest = np.divmod(codes, 0x80 * 0x40)
+        commands, extensions = np.divmod(rest, 0x40)
+        durations, lengths = encode_rc5marantz(
+            addresses, commands, extensions)
+        self.assertScalarEqual(durations, lengths, [
+            Rc5MarantzIrSignal('x', *[int(i) for i in code])
+            for code in zip(addresses, commands, extensions)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for dolpyn.ir_capture
+"""
+import os
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    raise unittest.SkipTest('needs NumPy')
+
+from dolpyn.ir_capture import DEFAULT_FREQUENCY, demodulate, open_wav
+from dolpyn.ir_signals import Rc5IrSignal
+
+
+class DemodulateTestCase(unittest.TestCase):
+    def setUp(self):
+        from dolpyn.ir_signals import Rc5MarantzIrSignal
+        self.signals = [
+            Rc5MarantzIrSignal('auto', 16, 37, 45),
+            Rc5IrSignal('power', 16, 12),
+            Rc5MarantzIrSignal('volume 50%', 16, 111, 32)]
+
+    def render(self, sample_rate, dtype=np.int16):
+        from dolpyn.ir_wave import render
+        return np.concatenate(list(
+            render(self.signals, sample_rate, dtype)))
+
+    def assertDecodes(self, captured):
+        from dolpyn.ir_signals import Rc5MarantzIrSignal
+        decoded = [Rc5MarantzIrSignal.from_raw(i) for i in captured]
+        self.assertEqual(
+            [str(i).split('\n')[2:] for i in decoded],
+            [str(i).split('\n')[2:] for i in self.signals])
+
+    def test_carrier_round_trip(self):
+        samples = self.render(192000)
+        captured = list(demodulate(samples, 192000, chunk_size=5000))
+        self.assertEqual(len(captured), 3)
+        for signal in captured:
+            self.assertAlmostEqual(signal.frequency, 36000, delta=400)
+            self.assertAlmostEqual(signal.duty_cycle, 0.25, delta=0.1)
+        self.assertDecodes(captured)
+
+    def test_demodulated_wav_round_trip(self):
+        import wave
+        from tempfile import NamedTemporaryFile
+
+        # A receiver output: active-low envelope without carrier.
+        data = [i for signal in self.signals for i in signal.as_raw().data]
+        lengths = np.round(np.array(data) * 50000 / 1e6).astype(int)
+        envelope = np.repeat(np.arange(len(data)) % 2 == 0, lengths)
+        samples = np.where(envelope, 0, 20000).astype('<i2')
+        with NamedTemporaryFile(suffix='.wav') as tmp:
+            with wave.open(tmp.name, 'wb') as fp:
+                fp.setnchannels(1)
+                fp.setsampwidth(2)
+                fp.setframerate(50000)
+                fp.writeframes(samples.tobytes())
+            mapped, sample_rate = open_wav(tmp.name)
+            self.assertEqual(sample_rate, 50000)
+            captured = list(demodulate(
+                mapped, sample_rate, invert=True, chunk_size=4096))
+        self.assertDecodes(captured)
+        self.assertEqual(captured[0].frequency, DEFAULT_FREQUENCY)
+
+
+class OpenWavTestCase(unittest.TestCase):
+    def write_wav(self, path, audio_format, bits, samples, extensible=False):
+        import struct
+
+        block_align = bits // 8
+        fmt = struct.pack(
+            '<HHIIHH', 0xFFFE if extensible else audio_format, 1, 48000,
+            48000 * block_align, block_align, bits)
+        if extensible:
+            fmt += struct.pack('<HHI', 22, bits, 0x4) + struct.pack(
+                '<H', audio_format) + bytes.fromhex(
+                    '000000001000800000aa00389b71')
+        data = samples.tobytes()
+        with open(path, 'wb') as fp:
+            fp.write(b'RIFF' + struct.pack(
+                '<I', 4 + 8 + len(fmt) + 8 + len(data)) + b'WAVE')
+            fp.write(b'fmt ' + struct.pack('<I', len(fmt)) + fmt)
+            fp.write(b'data' + struct.pack('<I', len(data)) + data)
+
+    def test_formats(self):
+        from tempfile import TemporaryDirectory
+
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'capture.wav')
+            for audio_format, bits, dtype in (
+                    (1, 16, '<i2'), (1, 32, '<i4'), (3, 32, '<f4')):
+                samples = np.array([0, 1, 0, 1], dtype=dtype)
+                for extensible in (False, True):
+                    self.write_wav(
+                        path, audio_format, bits, samples, extensible)
+                    mapped, sample_rate = open_wav(path)
+                    self.assertEqual(mapped.dtype, np.dtype(dtype))
+                    self.assertEqual(mapped.tolist(), samples.tolist())
+                    self.assertEqual(sample_rate, 48000)
+                    del mapped
+
+            self.write_wav(path, 1, 24, np.zeros(12, dtype='u1'), True)
+            with self.assertRaisesRegex(ValueError, '24-bit'):
+                open_wav(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
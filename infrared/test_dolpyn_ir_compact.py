@@ -0,0 +1,57 @@
+"""
+Tests for dolpyn.ir_compact
+"""
+import unittest
+from io import StringIO
+
+from dolpyn.ir_signals import (
+    IrFile, RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal, signal_key)
+from dolpyn.ir_compact import compact_ir_file
+
+NEC = RawIrSignal('nec', 38000, 0.33, [9000, 4500, 560, 1690, 560, 40000])
+
+BROKEN = '''\
+name: broken
+type: parsed
+protocol: NEC
+'''
+
+
+def compact(text):
+    return ''.join(compact_ir_file(StringIO(text)))
+
+
+class CompactTestCase(unittest.TestCase):
+    def test_compact(self):
+        power = Rc5IrSignal('power', 16, 12, comment='Power toggle')
+        marantz = Rc5MarantzIrSignal('auto', 16, 37, 45)
+        text = IrFile.HEADER + ''.join(f'#\n{signal}\n' for signal in (
+            power.as_raw(), power, marantz.as_raw(), NEC, NEC,
+            Rc5IrSignal('power', 16, 13)))
+
+        output = compact(text)
+        self.assertTrue(output.startswith(IrFile.HEADER))
+        self.assertNotIn('Power toggle', output)
+        self.assertLess(len(output), len(text))
+        signals = [
+            signal for signal, source_lines in IrFile.parse(StringIO(output))
+            if signal is not None]
+        self.assertEqual(
+            [(signal.name, signal_key(signal)) for signal in signals],
+            [('power', ('RC5', 16, 12, None)),
+             ('auto', ('raw', 36000, None, None)),
+             ('nec', ('raw', 38000, None, None)),
+             ('power', ('RC5', 16, 13, None))])
+        self.assertEqual(signals[1].data, marantz.as_raw().data)
+        self.assertEqual(signals[2].data, NEC.data)
+
+        self.assertEqual(compact(output), output)
+
+    def test_keeps_errors(self):
+        text = f'{IrFile.HEADER}#\n{NEC}\n#\n{BROKEN}#\n{NEC}\n'
+        self.assertEqual(
+            compact(text), f'{IrFile.HEADER}{NEC}\n#\n{BROKEN}')
+
+
+if __name__ == '__main__':
+    unittest.main()
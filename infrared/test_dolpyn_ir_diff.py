@@ -0,0 +1,106 @@
+"""
+Tests for dolpyn.ir_diff
+"""
+import unittest
+import warnings
+from io import StringIO
+
+from dolpyn.ir_signals import IrFile, RawIrSignal, Rc5IrSignal
+from dolpyn.ir_diff import (
+    diff_indexes, format_difference, index_ir_file, raw_data_matches)
+
+NEC = [9000, 4500, 560, 1690, 560, 40000]
+
+
+def index(*signals, relpath='tv.ir'):
+    text = IrFile.HEADER + ''.join(f'{signal}\n' for signal in signals)
+    return index_ir_file(StringIO(text), relpath, {})
+
+
+class RawDataMatchesTestCase(unittest.TestCase):
+    def test_tolerance(self):
+        old = RawIrSignal('x', 38000, 0.33, NEC)
+        self.assertTrue(raw_data_matches(old, old))
+        for data, frequency, expected in (
+                ([9900, 4500, 560, 1690, 560, 40000], 38000, True),
+                ([9000, 4500, 560, 1690, 620, 40000], 38000, True),
+                ([9000, 4500, 560, 1690, 630, 40000], 38000, False),
+                ([9000, 4500, 560, 1690, 560], 38000, False),
+                (NEC, 41000, True),
+                (NEC, 43000, False)):
+            with self.subTest(data=data, frequency=frequency):
+                new = RawIrSignal('x', frequency, 0.33, data)
+                self.assertEqual(raw_data_matches(old, new), expected)
+        new = RawIrSignal('x', 38000, 0.33, [i * 1.2 for i in NEC])
+        self.assertFalse(raw_data_matches(old, new))
+        self.assertTrue(raw_data_matches(old, new, tolerance=0.2))
+
+
+class DiffIndexesTestCase(unittest.TestCase):
+    def test_diff(self):
+        power = Rc5IrSignal('power', 16, 12)
+        jittered = power.as_raw()
+        jittered.data[0] += 50
+        old = index(
+            power, Rc5IrSignal('mute', 16, 13),
+            RawIrSignal('nec', 38000, 0.33, NEC),
+            RawIrSignal('nec', 38000, 0.33, NEC),
+            Rc5IrSignal('input', 16, 20))
+        new = index(
+            jittered, Rc5IrSignal('mute', 16, 14),
+            RawIrSignal('nec', 38000, 0.33, NEC),
+            RawIrSignal('nec', 38000, 0.33, [2 * i for i in NEC]),
+            Rc5IrSignal('tuner', 17, 63))
+
+        differences = list(diff_indexes(old, new))
+        self.assertEqual(
+            [(tag, key) for tag, key, old_entry, new_entry in differences],
+            [('=', ('tv.ir', 'power', 0)),
+             ('~', ('tv.ir', 'mute', 0)),
+             ('~', ('tv.ir', 'nec', 1)),
+             ('-', ('tv.ir', 'input', 0)),
+             ('+', ('tv.ir', 'tuner', 0))])
+        self.assertEqual(
+            [format_difference(*difference) for difference in differences],
+            ['= tv.ir: power [RC5 16 12] (parsed -> raw)',
+             '~ tv.ir: mute [RC5 16 13] -> [RC5 16 14]',
+             '~ tv.ir: nec (#2) [raw 38000Hz 6 durations] -> '
+             '[raw 38000Hz 6 durations]',
+             '- tv.ir: input [RC5 16 20]',
+             '+ tv.ir: tuner [RC5 17 63]'])
+
+    def test_same(self):
+        power = Rc5IrSignal('power', 16, 12, comment='other comment')
+        self.assertEqual(
+            list(diff_indexes(
+                index(Rc5IrSignal('power', 16, 12)), index(power))), [])
+
+    def test_other_protocols(self):
+        def nec(command, broken=''):
+            return index_ir_file(StringIO(
+                f'{IrFile.HEADER}#\nname: power\ntype: parsed\n'
+                f'protocol: NEC\naddress: 04 00 00 00\n'
+                f'command: {command}\n{broken}'), 'tv.ir', {})
+
+        self.assertEqual(
+            list(diff_indexes(nec('08 00 00 00'), nec('08  00 00 00'))), [])
+        differences = list(diff_indexes(
+            nec('08 00 00 00'), nec('09 00 00 00')))
+        self.assertEqual(
+            [format_difference(*difference) for difference in differences],
+            ['~ tv.ir: power [NEC address 04 00 00 00, command 08 00 00 00] '
+             '-> [NEC address 04 00 00 00, command 09 00 00 00]'])
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            index_ = nec(
+                '08 00 00 00', '#\nname: mute\ntype: raw\nfrequency: x\n')
+        self.assertEqual(list(index_), [('tv.ir', 'power', 0)])
+        self.assertEqual(
+            [str(warning.message) for warning in caught],
+            ["skipping tv.ir:9: bad raw signal: invalid literal for int() "
+             "with base 10: 'x'"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+Tests for dolpyn.ir_export
+"""
+import unittest
+import warnings
+from io import StringIO
+
+from dolpyn.ir_export import export_ir_file
+from dolpyn.ir_formats import ProntoWriter
+from dolpyn.ir_signals import IrFile, Rc5IrSignal
+
+NEC = '''\
+#
+name: Mute
+type: parsed
+protocol: NEC
+address: 04 00 00 00
+command: 09 00 00 00
+'''
+
+
+class ExportTestCase(unittest.TestCase):
+    def test_skipped_records(self):
+        text = IrFile.HEADER + NEC + f"#\n{Rc5IrSignal('Power', 16, 12)}\n"
+        out = StringIO()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            count = export_ir_file(
+                StringIO(text), [ProntoWriter(out, 'tv')], 'tv.ir')
+        self.assertEqual(count, 1)
+        self.assertTrue(out.getvalue().startswith('Power: '))
+        self.assertEqual(
+            [str(warning.message) for warning in caught],
+            ["skipping tv.ir:3: unsupported type 'parsed' "
+             "(protocol 'NEC')"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Tests for dolpyn.ir_formats
+"""
+import unittest
+
+from dolpyn.ir_formats import (
+    iter_lirc, LircWriter, pronto_to_signal, READERS, signal_timings,
+    TRAILING_GAP, WRITERS)
+from dolpyn.ir_signals import (
+    decode_signal, RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal, signal_key)
+
+
+class LircWriterTestCase(unittest.TestCase):
+    def test_gap(self):
+        from io import StringIO
+
+        out = StringIO()
+        writer = LircWriter(out, 'my remote')
+        for signal in (
+                Rc5IrSignal('Power', 16, 12),
+                Rc5MarantzIrSignal('Direct volume 50%', 16, 111, 32)):
+            writer.write(signal.name, signal_timings(signal))
+        writer.close()
+
+        text = out.getvalue()
+        self.assertIn('  name  my_remote\n', text)
+        self.assertIn('  flags RAW_CODES\n', text)
+        self.assertIn(f'  gap          {TRAILING_GAP}\n', text)
+        self.assertEqual(text.count('begin remote\n'), 1)
+        self.assertIn('\n    name Direct_volume_50%\n', text)
+        durations = text.split('name Power\n')[1].split('\n\n')[0].split()
+        expected = signal_timings(Rc5IrSignal('Power', 16, 12)).durations
+        self.assertEqual(
+            tuple(int(i) for i in durations),
+            expected[:-1] + (expected[-1] - TRAILING_GAP,))
+        self.assertTrue(text.endswith('  end raw_codes\nend remote\n'))
+
+    def test_new_remote(self):
+        from io import StringIO
+
+        out = StringIO()
+        writer = LircWriter(out, 'remote')
+        for signal in (
+                Rc5IrSignal('Power', 16, 12),
+                RawIrSignal('NEC power', 38000, 0.33, [9000, 4500, 560]),
+                Rc5IrSignal('Mute', 16, 13)):
+            writer.write(signal.name, signal_timings(signal))
+        writer.close()
+
+        text = out.getvalue()
+        self.assertEqual(text.count('begin remote\n'), 3)
+        self.assertEqual(text.count('end remote\n'), 3)
+        self.assertIn('  name  remote_2\n  flags', text)
+        self.assertIn('  name  remote_3\n  flags', text)
+        out.seek(0)
+        self.assertEqual(
+            [(signal.name, signal.frequency, round(signal.duty_cycle, 2))
+             for signal in iter_lirc(out)],
+            [('Power', 36000, 0.25), ('NEC_power', 38000, 0.33),
+             ('Mute', 36000, 0.25)])
+
+    def test_captures_of_one_remote(self):
+        from io import StringIO
+
+        out = StringIO()
+        writer = LircWriter(out, 'tv')
+        datas = [
+            [9000, 4500, 560, 1690, 560, 40000],
+            [9000, 4500, 560, 560, 560, 1690, 560, 39000],
+            [9000, 2250, 560, 96000]]
+        for data in datas:
+            writer.write('key', signal_timings(
+                RawIrSignal('key', 38000, 0.33, data)))
+        writer.close()
+
+        text = out.getvalue()
+        self.assertEqual(text.count('begin remote\n'), 1)
+        self.assertIn('  gap          40000\n', text)
+        out.seek(0)
+        self.assertEqual(
+            [signal.data for signal in iter_lirc(out)],
+            [datas[0], datas[1][:-1] + [40000], datas[2]])
+
+
+class RoundTripTestCase(unittest.TestCase):
+    def setUp(self):
+        self.signals = [
+            Rc5IrSignal('Power', 16, 12),
+            Rc5MarantzIrSignal('Direct volume 50%', 16, 111, 32),
+            RawIrSignal(
+                'NEC power', 38000, 0.33, [9000, 4500, 560, 1690, 560])]
+
+    def round_trip(self, format_, names=None):
+        from io import StringIO
+
+        out = StringIO()
+        writer = WRITERS[format_](out, 'remote')
+        for signal in self.signals:
+            writer.write(signal.name, signal_timings(signal))
+        writer.close()
+
+        out.seek(0)
+        signals = list(READERS[format_](out))
+        self.assertEqual(
+            [signal.name for signal in signals],
+            names or [signal.name for signal in self.signals])
+        return signals
+
+    def assertSameSignals(self, signals):
+        self.assertEqual(
+            [signal_key(decode_signal(i))[0:4:3] for i in signals[2:]],
+            [('raw', None)])
+        self.assertEqual(
+            [signal_key(decode_signal(i)) for i in signals[:2]],
+            [('RC5', 16, 12, None), ('RC5marantz', 16, 111, 32)])
+
+    def test_pronto(self):
+        signals = self.round_trip('pronto')
+        self.assertSameSignals(signals)
+        self.assertEqual(signals[2].frequency, 38029)
+
+    def test_broadlink(self):
+        self.assertSameSignals(self.round_trip('broadlink'))
+
+    def test_lirc(self):
+        signals = self.round_trip(
+            'lirc', ['Power', 'Direct_volume_50%', 'NEC_power'])
+        self.assertSameSignals(signals)
+        self.assertEqual(signals[2].data[:5], [9000, 4500, 560, 1690, 560])
+        self.assertEqual(signals[2].frequency, 38000)
+
+    def test_lirc_rc5_codes(self):
+        from io import StringIO
+
+        signals = list(iter_lirc(StringIO('''\
+begin remote
+  name  Marantz
+  bits           13
+  flags RC5|CONST_LENGTH
+  one           889   889
+  zero          889   889
+  plead         889
+  gap          113792
+  begin codes
+      KEY_POWER   0x140C   # address 16, command 12
+  end codes
+end remote
+''')))
+        self.assertEqual(
+            [(i.name, signal_key(i)) for i in signals],
+            [('KEY_POWER', ('RC5', 16, 12, None))])
+
+    def test_lirc_gap(self):
+        from io import StringIO
+
+        signals = list(iter_lirc(StringIO('''\
+begin remote
+  name  raw
+  flags RAW_CODES
+  gap   50000
+  begin raw_codes
+    name odd
+      9000 4500 560
+    name even
+      9000 4500 560 1690
+  end raw_codes
+end remote
+begin remote
+  name  nec
+  bits  2
+  flags SPACE_ENC|CONST_LENGTH
+  header 9000 4500
+  one    560 1690
+  zero   560 560
+  ptrail 560
+  gap    108000
+  begin codes
+      KEY_A   0x2
+  end codes
+end remote
+''')))
+        self.assertEqual(
+            [(i.name, i.data) for i in signals],
+            [('odd', [9000, 4500, 560, 50000]),
+             ('even', [9000, 4500, 560, 51690]),
+             ('KEY_A', [9000, 4500, 560, 1690, 560, 560, 560, 90570])])
+
+    def test_pronto_rc5(self):
+        signal = pronto_to_signal('Power', '5000 0073 0000 0001 0010 000C')
+        self.assertEqual(signal_key(signal), ('RC5', 16, 12, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
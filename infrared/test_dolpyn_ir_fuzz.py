@@ -0,0 +1,30 @@
+"""
+Tests for the signal file parser, through the ir_fuzz harness
+
+The timing test depends on the machine, so it only runs with
+PARSE_TIMING=1.
+"""
+import os
+import unittest
+
+from ir_fuzz import check, fuzz, throughput
+
+
+class FuzzTestCase(unittest.TestCase):
+    def test_fuzz(self):
+        self.assertGreater(fuzz(300, seed=1), 0)
+
+    def test_edge_cases(self):
+        for text in ('', '\n', '#', 'name:', 'name: x', ':' * 5000,
+                     '#\n' * 3, '\r\n\r\n', 'x' * 2001):
+            check(text)
+
+    @unittest.skipUnless(
+        os.environ.get('PARSE_TIMING') == '1', 'set PARSE_TIMING=1')
+    def test_linear_time(self):
+        for description, megabytes, seconds, ratio in throughput(200000):
+            self.assertLess(ratio, 8, description)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests for dolpyn.ir_import
+"""
+import json
+import os
+import subprocess
+import sys
+import unittest
+import zipfile
+from tempfile import TemporaryDirectory
+
+from dolpyn.ir_formats import signal_timings, to_broadlink, to_pronto
+from dolpyn.ir_signals import (
+    decode_signal, IrFile, RawIrSignal, Rc5MarantzIrSignal, signal_key)
+from dolpyn.ir_import import bounded_map
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+LIRC = '''\
+begin remote
+  name  Marantz
+  bits           13
+  flags RC5|CONST_LENGTH
+  one           889   889
+  zero          889   889
+  plead         889
+  gap          113792
+  begin codes
+      KEY_POWER   0x140C   # address 16, command 12
+      KEY_MUTE    0x140D
+  end codes
+end remote
+'''
+
+BAD_LIRC = LIRC.replace('KEY_MUTE    0x140D', 'KEY_MUTE')
+
+
+class ImportTestCase(unittest.TestCase):
+    def run_import(self, *args):
+        return subprocess.run(
+            [sys.executable, os.path.join(HERE, 'ir_import.py')] +
+            list(args), capture_output=True, text=True)
+
+    def read_signals(self, path):
+        with open(path) as fp:
+            return [
+                (signal.name, signal_key(decode_signal(signal)))
+                for signal, source_lines in IrFile.parse(fp)
+                if signal is not None]
+
+    def test_import(self):
+        nec = RawIrSignal('NEC power', 38000, 0.33, [9000, 4500, 560, 40000])
+        marantz = Rc5MarantzIrSignal('Direct volume 50%', 16, 111, 32)
+
+        with TemporaryDirectory() as tempdir:
+            source = os.path.join(tempdir, 'src')
+            os.makedirs(os.path.join(source, 'av'))
+            with open(os.path.join(source, 'lircd.conf'), 'w') as fp:
+                fp.write(LIRC)
+            with open(os.path.join(source, 'bad.conf'), 'w') as fp:
+                fp.write(BAD_LIRC)
+            with open(os.path.join(source, 'av', 'amp.txt'), 'w') as fp:
+                fp.write(f'{marantz.name}: '
+                         f'{to_pronto(signal_timings(marantz))}\n')
+            archive = os.path.join(tempdir, 'broadlink.zip')
+            with zipfile.ZipFile(archive, 'w') as zip_:
+                zip_.writestr('tv/nec.json', json.dumps({
+                    'tv': {'power': to_broadlink(signal_timings(nec)).hex()}}))
+
+            for jobs in ('1', '2'):
+                output = os.path.join(tempdir, f'out{jobs}')
+                result = self.run_import(
+                    '-j', jobs, '-o', output, source, archive)
+                self.assertEqual(result.returncode, 1, result.stderr)
+                self.assertIn(
+                    "bad.conf: ValueError: line 11: no code for 'KEY_MUTE'\n",
+                    result.stderr)
+                self.assertIn('lircd.conf: 2 signals\n', result.stderr)
+
+                self.assertEqual(
+                    sorted(
+                        os.path.relpath(os.path.join(dirpath, filename),
+                                        output)
+                        for dirpath, dirnames, filenames in os.walk(output)
+                        for filename in filenames),
+                    ['av/amp.ir', 'lircd.ir', 'tv/nec.ir'])
+                self.assertEqual(
+                    self.read_signals(os.path.join(output, 'lircd.ir')),
+                    [('KEY_POWER', ('RC5', 16, 12, None)),
+                     ('KEY_MUTE', ('RC5', 16, 13, None))])
+                self.assertEqual(
+                    self.read_signals(os.path.join(output, 'av', 'amp.ir')),
+                    [(marantz.name, ('RC5marantz', 16, 111, 32))])
+                self.assertEqual(
+                    [key[0] for name, key in self.read_signals(
+                        os.path.join(output, 'tv', 'nec.ir'))], ['raw'])
+
+    def test_duplicate_outputs(self):
+        with TemporaryDirectory() as tempdir:
+            for filename in ('remote.conf', 'remote.txt'):
+                with open(os.path.join(tempdir, filename), 'w') as fp:
+                    fp.write(LIRC)
+            result = self.run_import('-o', os.path.join(tempdir, 'out'),
+                                     tempdir)
+            self.assertEqual(result.returncode, 1)
+            self.assertIn(
+                'remote.txt: same output remote.ir as remote.conf\n',
+                result.stderr)
+
+
+class BoundedMapTestCase(unittest.TestCase):
+    def test_bounded_map(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        taken = []
+
+        def tasks():
+            for i in range(20):
+                taken.append(i)
+                yield i, 10
+
+        with ThreadPoolExecutor(2) as executor:
+            results = bounded_map(executor, pow, tasks(), 3)
+            self.assertEqual(next(results), 0)
+            self.assertEqual(len(taken), 4)
+            self.assertEqual(
+                list(results), [i ** 10 for i in range(1, 20)])
+
+
+if __name__ == '__main__':
+    unittest.main()
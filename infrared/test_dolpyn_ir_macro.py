@@ -0,0 +1,70 @@
+"""
+Tests for dolpyn.ir_macro
+"""
+import unittest
+
+from dolpyn.ir_signals import (
+    RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal, decode_signal)
+from dolpyn.ir_macro import MIN_GAP, Delay, compile_macro
+
+POWER = Rc5IrSignal('power', 16, 12)
+VOLUME = Rc5MarantzIrSignal('volume', 16, 0x6F, 0x10)
+NEC = RawIrSignal('nec', 38000, 0.33, [9000, 4500, 560, 1690, 560])
+
+
+def frames(data):
+    "Split data after every OFF of at least MIN_GAP"
+    frames, start = [], 0
+    for index in range(1, len(data), 2):
+        if data[index] >= MIN_GAP:
+            frames.append(data[start:index + 1])
+            start = index + 1
+    return frames
+
+
+class CompileMacroTestCase(unittest.TestCase):
+    def test_single_signal(self):
+        [signal] = compile_macro(
+            [Delay(1000), POWER, Delay(500000), VOLUME, POWER], name='m')
+        self.assertEqual(signal.name, 'm')
+        self.assertEqual(signal.comment, 'm: power, 500ms, volume, power')
+
+        power, volume, power_again = frames(signal.data)
+        self.assertEqual(power[:-1], POWER.as_raw().data[:-1])
+        self.assertEqual(
+            power[-1], POWER.as_raw().data[-1] + 500000)
+        self.assertEqual(volume, VOLUME._make_durations(toggle=True))
+        self.assertEqual(power_again, POWER.as_raw().data)
+
+        # Every frame decodes as what it was, toggle bit or not.
+        for frame, expected in zip(frames(signal.data), (
+                POWER, VOLUME, POWER)):
+            frame[-1] = Rc5IrSignal.REPEAT_DURATION - sum(frame[:-1])
+            decoded = decode_signal(RawIrSignal('x', 36000, 0.25, frame))
+            self.assertEqual(decoded.to_numeric(), expected.to_numeric())
+
+    def test_split(self):
+        signals = compile_macro(
+            [POWER, NEC, NEC, POWER, POWER], name='m', max_timings=50)
+        self.assertEqual(
+            [signal.name for signal in signals],
+            ['m (1/3)', 'm (2/3)', 'm (3/3)'])
+        self.assertEqual(
+            [signal.frequency for signal in signals], [36000, 38000, 36000])
+        self.assertEqual(
+            signals[1].data, NEC.data + [MIN_GAP] + NEC.data + [MIN_GAP])
+        self.assertEqual(len(frames(signals[2].data)), 2)
+        self.assertTrue(all(len(signal.data) <= 50 for signal in signals))
+
+        with self.assertRaises(ValueError):
+            compile_macro([VOLUME], max_timings=10)
+
+    def test_delay_parse(self):
+        self.assertEqual(Delay.parse('500ms').duration, 500000)
+        self.assertEqual(Delay.parse('1.5s').duration, 1500000)
+        self.assertEqual(Delay.parse('250us').duration, 250)
+        self.assertIsNone(Delay.parse('Power ON'))
+
+
+if __name__ == '__main__':
+    unittest.main()
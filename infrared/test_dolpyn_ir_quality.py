@@ -0,0 +1,73 @@
+"""
+Tests for dolpyn.ir_quality
+"""
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    raise unittest.SkipTest('needs NumPy')
+
+from dolpyn.ir_quality import MAX_ERROR, profile_library, profile_signals
+from dolpyn.ir_signals import (
+    IrFile, RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal)
+
+NEC = [9000, 4500, 560, 1690, 560, 40000]
+
+
+class ProfileSignalsTestCase(unittest.TestCase):
+    def test_stats(self):
+        exact = Rc5MarantzIrSignal('x', 16, 37, 45).as_raw().data
+        jittered = list(exact)
+        jittered[3] += 300
+        jittered[5] -= 100
+        too_short = list(exact)
+        too_short[0] = 300  # rounds to zero half-bits
+
+        profile = profile_signals([exact, jittered, NEC, too_short])
+        self.assertTrue(np.array_equal(profile['max_error'][:2], [0, 300]))
+        self.assertEqual(profile['margin'].tolist()[:2], [MAX_ERROR, 144])
+        self.assertAlmostEqual(
+            profile['mean_error'][1], 400 / (len(exact) - 1))
+        self.assertEqual(profile['unit'][0], 889)
+        self.assertLess(profile['margin'][3], 0)
+
+
+class ProfileLibraryTestCase(unittest.TestCase):
+    def test_library(self):
+        good = Rc5IrSignal('power', 16, 12).as_raw()
+        bad = Rc5MarantzIrSignal('auto', 16, 37, 45).as_raw()
+        bad.data[1] += 400
+        nec = RawIrSignal('nec', 38000, 0.33, NEC)
+        broken = Rc5IrSignal('broken', 16, 12).as_raw()
+        broken.data[0] = 300  # rounds to zero half-bits, does not decode
+        parsed = Rc5IrSignal('mute', 16, 13)
+
+        with TemporaryDirectory() as tempdir:
+            for filename, signals in (
+                    ('a.ir', [good, nec, broken, parsed]),
+                    ('b.ir', [good, bad]),
+                    ('c.ir', [parsed])):
+                with open(os.path.join(tempdir, filename), 'w') as fp:
+                    fp.write(IrFile.HEADER)
+                    fp.write(''.join(f'{signal}\n' for signal in signals))
+            files, signals = profile_library(tempdir, min_margin=100)
+
+        a, b, c = files
+        self.assertEqual(
+            (a['signals'], a['raw'], a['profiled'], a['other']),
+            (4, 3, 1, 2))
+        self.assertFalse(a['flagged'])
+        self.assertTrue(b['flagged'])
+        self.assertEqual(b['margin'], MAX_ERROR - 400)
+        self.assertEqual(c['profiled'], 0)
+        self.assertNotIn('flagged', c)
+        self.assertEqual(
+            signals['name'], ['power (raw)', 'power (raw)', 'auto (raw)'])
+        self.assertEqual(signals['file'].tolist(), [0, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
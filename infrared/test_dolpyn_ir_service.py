@@ -0,0 +1,132 @@
+"""
+Tests for dolpyn.ir_service
+"""
+import asyncio
+import json
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+
+from dolpyn.ir_signals import IrFile, Rc5MarantzIrSignal
+from dolpyn.ir_service import Service, bench, handle_batch
+
+
+class HandleBatchTestCase(unittest.TestCase):
+    def test_decode(self):
+        data = Rc5MarantzIrSignal('x', 16, 37, 45).as_raw().data
+        jittered = [duration - 5 for duration in data]
+        responses = handle_batch([
+            {'op': 'decode', 'data': jittered},
+            {'op': 'decode', 'data': [9000, 4500, 560]},
+            {'op': 'bogus'},
+            {'op': 'decode'}])
+        self.assertEqual(
+            [response['ok'] for response in responses],
+            [True, True, False, False])
+        self.assertEqual(
+            [responses[0]['result'][key] for key in (
+                'protocol', 'address', 'command', 'extension')],
+            ['RC5marantz', 16, 37, 45])
+        self.assertEqual(responses[1]['result']['protocol'], 'raw')
+        self.assertEqual(responses[1]['result']['address'], None)
+
+    def test_raw2parsed(self):
+        signal = Rc5MarantzIrSignal('auto', 16, 37, 45)
+        text = f'{IrFile.HEADER}{signal.as_raw()}\n'
+        for i in range(2):  # the second time from the record cache
+            [response] = handle_batch([{'op': 'raw2parsed', 'ir': text}])
+            self.assertTrue(response['ok'])
+            self.assertIn('name: auto (raw)\n', response['result'])
+
+
+class ServiceTestCase(unittest.TestCase):
+    def test_pipelined(self):
+        async def run(path):
+            with ThreadPoolExecutor(2) as executor:
+                service = Service(executor, 2, max_batch=8, max_pending=4)
+                server = asyncio.ensure_future(service.serve(path))
+                while not os.path.exists(path):
+                    await asyncio.sleep(0.01)
+
+                reader, writer = await asyncio.open_unix_connection(path)
+                data = Rc5MarantzIrSignal('x', 16, 12, 1).as_raw().data
+                for i in range(100):
+                    writer.write(json.dumps(
+                        {'id': i, 'op': 'decode', 'data': data}).encode())
+                    writer.write(b'\n')
+                writer.write(b'not json\n')
+                await writer.drain()
+
+                responses = [
+                    json.loads(await reader.readline()) for i in range(101)]
+                writer.close()
+
+                latencies, seconds = await bench(
+                    path, 3, 10, {'op': 'decode', 'data': data})
+                server.cancel()
+                return responses, latencies
+
+        with TemporaryDirectory() as tempdir:
+            responses, latencies = asyncio.run(
+                run(os.path.join(tempdir, 'service.sock')))
+
+        self.assertEqual(
+            sorted(response['id'] for response in responses
+                   if response['ok']),
+            list(range(100)))
+        self.assertEqual(
+            [response['id'] for response in responses
+             if not response['ok']], [None])
+        self.assertEqual(len(latencies), 10)
+
+    def test_existing_socket(self):
+        import socket
+
+        async def serve(path):
+            # Return once the service accepts connections, or raise what
+            # serve() raised.
+            with ThreadPoolExecutor(1) as executor:
+                server = asyncio.ensure_future(
+                    Service(executor, 1).serve(path))
+                while True:
+                    await asyncio.sleep(0.01)
+                    if server.done():
+                        return server.result()
+                    try:
+                        reader, writer = await asyncio.open_unix_connection(
+                            path)
+                    except (FileNotFoundError, ConnectionRefusedError):
+                        continue
+                    writer.close()
+                    server.cancel()
+                    return
+
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'service.sock')
+
+            # A socket that nobody listens on any more is replaced.
+            with socket.socket(socket.AF_UNIX) as stale:
+                stale.bind(path)
+            asyncio.run(serve(path))
+            self.assertFalse(os.path.exists(path))
+
+            # A socket that is listened on is left alone.
+            with socket.socket(socket.AF_UNIX) as listening:
+                listening.bind(path)
+                listening.listen()
+                with self.assertRaisesRegex(FileExistsError, 'listening'):
+                    asyncio.run(serve(path))
+                self.assertTrue(os.path.exists(path))
+            os.unlink(path)
+
+            # And so is anything that is not a socket.
+            with open(path, 'w'):
+                pass
+            with self.assertRaisesRegex(FileExistsError, 'not a socket'):
+                asyncio.run(serve(path))
+            self.assertTrue(os.path.isfile(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for dolpyn.ir_signals
+"""
+import unittest
+
+from dolpyn.ir_signals import (
+    compact_signal, decode_signal, group_by_name_prefix, IrFile,
+    IrFileWriter, IrParseError, RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal,
+    signal_key)
+
+
+class IrFileTestCase(unittest.TestCase):
+    def test_scan(self):
+        from io import StringIO
+
+        out = list(IrFile.scan(StringIO('''\
+Filetype: IR signals file
+Version: 1
+#
+name: TV_POWER
+type: parsed
+protocol: RC5
+address: 17 00 00 00
+command: 06 00 00 00
+#
+# POWER [raw] {11000101-001100}
+name: POWER
+type: parsed
+protocol: RC5
+address: 05 00 00 00
+command: 0C 00 00 00
+''')))
+        self.assertEqual(
+            [lineno for lineno, record, source in out], [1, 2, 3, 9, 10])
+        self.assertEqual([
+            record or source for lineno, record, source in out], [
+            'Filetype: IR signals file\n',
+            'Version: 1\n',
+            ['#\n',
+             'name: TV_POWER\n',
+             'type: parsed\n',
+             'protocol: RC5\n',
+             'address: 17 00 00 00\n',
+             'command: 06 00 00 00\n'],
+            '#\n',
+            ['# POWER [raw] {11000101-001100}\n',
+             'name: POWER\n',
+             'type: parsed\n',
+             'protocol: RC5\n',
+             'address: 05 00 00 00\n',
+             'command: 0C 00 00 00\n']])
+
+    def test_parse_errors(self):
+        from io import StringIO
+
+        good = str(Rc5IrSignal('power', 16, 12).as_raw()) + '\n'
+        text = ''.join([
+            IrFile.HEADER,
+            good,                                       # 3-8
+            '#\nname: nec\ntype: parsed\nprotocol: NEC\n',  # 9-12
+            '#\nname: blank\n\ntype: raw\nfrequency: 38000\n'
+            'duty_cycle: 0.33\ndata: 100 200 300\n',    # 13-19
+            '#\nname: huge\ndata: ' + '9 ' * 1000 + '\n',  # 20-22
+            '#\n' + 'x' * 3000 + '\n',                  # 23-24
+            'name: no type\ngarbage\n',                 # 25-26
+            'name: big\n' + 'a: b\n' * 200,             # 27-227
+            good.rstrip('\n')])                         # 228-233
+        parsed = list(IrFile.parse(
+            StringIO(text), 'x.ir', max_line=1000, max_record=1000))
+        self.assertEqual(
+            [str(signal) for signal, source in parsed
+             if isinstance(signal, IrParseError)], [
+                "x.ir:9: unsupported type 'parsed' (protocol 'NEC')",
+                'x.ir:22: line longer than 1000 characters',
+                'x.ir:24: line longer than 1000 characters',
+                'x.ir:26: expected "key: value", got \'garbage\\n\'',
+                'x.ir:27: record longer than 1000 characters'])
+
+        signals = [
+            signal for signal, source in parsed
+            if isinstance(signal, (RawIrSignal, Rc5IrSignal))]
+        self.assertEqual(
+            [signal.name for signal in signals],
+            ['power (raw)', 'blank', 'power (raw)'])
+        self.assertEqual(signals[1].data, [100, 200, 300])
+
+        # Everything but the lines and records over the limits is kept.
+        self.assertEqual(
+            ''.join(source for signal, source in parsed),
+            text.replace('#\nname: huge\ndata: ' + '9 ' * 1000 + '\n', '')
+            .replace('x' * 3000 + '\n', '')
+            .replace('name: big\n' + 'a: b\n' * 200, ''))
+
+
+class DecodeSignalTestCase(unittest.TestCase):
+    def test_decode_jittered_raw(self):
+        raw = Rc5MarantzIrSignal('Direct volume 50%', 16, 111, 32).as_raw()
+        raw.data = [i - 1 for i in raw.data]
+        decoded = decode_signal(raw)
+        self.assertEqual(decoded.name, 'Direct volume 50%')
+        self.assertEqual(
+            signal_key(decoded), ('RC5marantz', 16, 111, 32))
+
+        raw = Rc5IrSignal('Power', 16, 12).as_raw()
+        self.assertEqual(
+            signal_key(decode_signal(raw)), ('RC5', 16, 12, None))
+
+    def test_decode_unknown_raw(self):
+        raw = RawIrSignal('NEC', 38000, 0.33, [9000, 4500, 560, 560, 560])
+        self.assertIs(decode_signal(raw), raw)
+        self.assertEqual(signal_key(raw), ('raw', 38000, None, None))
+
+    def test_compact_signal(self):
+        raw = Rc5IrSignal('Power', 16, 12).as_raw()
+        compact = compact_signal(raw)
+        self.assertIsInstance(compact, Rc5IrSignal)
+        self.assertEqual(str(compact).split('\n')[:2], ['#', 'name: Power'])
+
+        parsed = Rc5MarantzIrSignal('Power on', 16, 12, 1, comment='on')
+        compact = compact_signal(parsed)
+        self.assertIsInstance(compact, RawIrSignal)
+        self.assertEqual(compact.name, 'Power on')
+        self.assertEqual(compact.comment, '')
+        self.assertEqual(compact.data, parsed.as_raw().data)
+
+        # RC5X: the Flipper's RC5 only takes commands up to 0x3F.
+        rc5x = Rc5IrSignal('Cursor up', 16, 80).as_raw()
+        compact = compact_signal(rc5x)
+        self.assertIsInstance(compact, RawIrSignal)
+        self.assertEqual(compact.name, 'Cursor up')
+        self.assertEqual(compact.data, rc5x.data)
+
+
+class IrFileWriterTestCase(unittest.TestCase):
+    def test_pages_and_groups(self):
+        import os
+        from tempfile import TemporaryDirectory
+
+        signals = [
+            Rc5IrSignal(f'{prefix} {command}', 16, command)
+            for prefix in ('Tuner', 'Network(DMP):') for command in range(5)]
+        group_by = group_by_name_prefix(['network(dmp)'])
+
+        with TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, 'zone')
+            with IrFileWriter(
+                    prefix, max_entries=2, group_by=group_by) as writer:
+                for signal in signals:
+                    writer.write(signal)
+
+            self.assertEqual(
+                [os.path.basename(i) for i in writer.filenames], [
+                    'zone-other-01.ir', 'zone-other-02.ir',
+                    'zone-other-03.ir', 'zone-network_dmp-01.ir',
+                    'zone-network_dmp-02.ir', 'zone-network_dmp-03.ir'])
+
+            with open(f'{prefix}-network_dmp-03.ir') as fp:
+                parsed = [
+                    signal for signal, source_lines in IrFile.parse(fp)
+                    if signal is not None]
+            self.assertEqual(
+                [signal.name for signal in parsed], ['Network(DMP): 4'])
+
+    def test_colliding_groups(self):
+        import os
+        from tempfile import TemporaryDirectory
+
+        signals = [
+            Rc5IrSignal('Network(DMP): Stop', 16, 1),
+            Rc5IrSignal('Network(DMP) Play', 16, 2),
+            Rc5IrSignal('Network(DMP): Pause', 16, 3)]
+        group_by = group_by_name_prefix(['Network(DMP):', 'Network(DMP)'])
+
+        with TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, 'z')
+            with IrFileWriter(prefix, group_by=group_by) as writer:
+                for signal in signals:
+                    writer.write(signal)
+
+            self.assertEqual(
+                [os.path.basename(i) for i in writer.filenames],
+                ['z-Network_DMP-01.ir', 'z-Network_DMP_2-01.ir'])
+            names = []
+            for filename in writer.filenames:
+                with open(filename) as fp:
+                    names.append([
+                        signal.name for signal, source_lines in
+                        IrFile.parse(fp) if signal is not None])
+            self.assertEqual(names, [
+                ['Network(DMP): Stop', 'Network(DMP): Pause'],
+                ['Network(DMP) Play']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for dolpyn.ir_tables
+"""
+import os
+import random
+import unittest
+from tempfile import TemporaryDirectory
+
+from dolpyn import ir_signals
+from dolpyn.ir_signals import (
+    RawIrSignal, Rc5IrSignal, Rc5MarantzIrSignal, decode_signal)
+from dolpyn.ir_tables import DecodeTable, attach, build_tables
+
+
+def from_raw(signal):
+    try:
+        return Rc5MarantzIrSignal.from_raw(signal)
+    except AssertionError:
+        return None
+
+
+class DecodeTableTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tempdir = TemporaryDirectory()
+        cls.path = build_tables(os.path.join(cls.tempdir.name, 'tables'))
+        cls.table = DecodeTable(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.table.close()
+        cls.tempdir.cleanup()
+
+    def assertSameDecode(self, signal):
+        expected = from_raw(signal)
+        decoded = self.table.decode(signal)
+        if decoded is None:
+            # A miss is fine, from_raw() gets to decide.
+            self.assertFalse(isinstance(expected, Rc5IrSignal), signal.data)
+        else:
+            self.assertEqual(type(decoded), type(expected))
+            self.assertEqual(str(decoded), str(expected))
+
+    def test_same_as_from_raw(self):
+        rnd = random.Random(1)
+        self.assertEqual(len(self.table), 2 * (0x1000 + 0x40000))
+        for i in range(2000):
+            signal = Rc5MarantzIrSignal(
+                'x', rnd.randrange(0x20), rnd.randrange(0x80),
+                rnd.randrange(0x40)).as_raw()
+            signal.data = [i + rnd.randint(-400, 400) for i in signal.data]
+            self.assertSameDecode(signal)
+            self.assertIsNotNone(self.table.decode(signal))
+
+            signal = Rc5IrSignal(
+                'y', rnd.randrange(0x20), rnd.randrange(0x80)).as_raw()
+            self.assertSameDecode(signal)
+            self.assertIsNotNone(self.table.decode(signal))
+
+    def test_toggle_bit(self):
+        for cls, numeric in (
+                (Rc5MarantzIrSignal, 0b10110000001100000001),
+                (Rc5IrSignal, 0b11110000001100)):
+            signal = cls.from_numeric('toggled', numeric)
+            data = signal._make_durations(toggle=True)
+            decoded = self.table.decode(
+                RawIrSignal('toggled', 36000, .25, data))
+            self.assertEqual(str(decoded), str(signal))
+
+    def test_misses(self):
+        for data in (
+                [9000, 4500, 560, 1690, 560, 40000],   # NEC
+                [889, 889, 1778, 100000],               # too short
+                [889, 300, 889, 889, 50000],            # rounds to zero
+                [889] * 27 + [200000]):                 # wrong gap
+            self.assertSameDecode(RawIrSignal('z', 36000, .25, data))
+
+    def test_attach(self):
+        signal = Rc5MarantzIrSignal('auto', 16, 37, 45).as_raw()
+        try:
+            table = attach(self.path)
+            self.assertIs(ir_signals.DECODE_TABLE, table)
+            self.assertEqual(str(decode_signal(signal)), str(from_raw(signal)))
+        finally:
+            ir_signals.DECODE_TABLE = None
+            table.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
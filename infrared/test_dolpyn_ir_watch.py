@@ -0,0 +1,102 @@
+"""
+Tests for dolpyn.ir_watch and the raw2parsed record cache
+"""
+import os
+import unittest
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from dolpyn.ir_signals import IrFile, Rc5IrSignal, Rc5MarantzIrSignal
+from dolpyn.ir_watch import Converter, InotifyWatcher, PollingWatcher
+from dolpyn.rc5marantz_raw2parsed import raw2parsed
+
+SIGNALS = [
+    Rc5IrSignal('power', 16, 12).as_raw(),
+    Rc5MarantzIrSignal('auto', 16, 37, 45).as_raw(),
+    Rc5IrSignal('mute', 16, 13, comment='parsed already')]
+
+
+def ir_text(signals):
+    return IrFile.HEADER + ''.join(f'{signal}\n' for signal in signals)
+
+
+class Raw2ParsedCacheTestCase(unittest.TestCase):
+    def test_cache(self):
+        text = ir_text(SIGNALS)
+        expected = ''.join(raw2parsed(StringIO(text)))
+        self.assertIn('protocol: RC5\n', expected)
+
+        cache = {}
+        self.assertEqual(''.join(raw2parsed(StringIO(text), cache=cache)),
+                         expected)
+        self.assertEqual(''.join(raw2parsed(StringIO(text), cache=cache)),
+                         expected)
+
+        # Only the records of the latest version are kept.
+        size = len(cache)
+        text = ir_text(SIGNALS[1:])
+        self.assertEqual(
+            ''.join(raw2parsed(StringIO(text), cache=cache)),
+            ''.join(raw2parsed(StringIO(text))))
+        self.assertEqual(len(cache), size - 1)
+
+
+class WatcherTestCase(unittest.TestCase):
+    def check_watcher(self, watcher_class, **kwargs):
+        with TemporaryDirectory() as tempdir:
+            source = os.path.join(tempdir, 'src')
+            os.makedirs(os.path.join(source, 'sub'))
+            with open(os.path.join(source, 'a.ir'), 'w') as fp:
+                fp.write(ir_text(SIGNALS))
+
+            with watcher_class(source, **kwargs) as watcher:
+                changes = watcher.changes(debounce=0.01)
+
+                with open(os.path.join(source, 'sub', 'b.ir'), 'w') as fp:
+                    fp.write(ir_text(SIGNALS))
+                with open(os.path.join(source, 'notes.txt'), 'w') as fp:
+                    fp.write('ignored\n')
+                self.assertEqual(next(changes), {os.path.join('sub', 'b.ir')})
+
+                os.unlink(os.path.join(source, 'a.ir'))
+                self.assertEqual(next(changes), {'a.ir'})
+
+                os.makedirs(os.path.join(source, 'new'))
+                with open(os.path.join(source, 'new', 'c.ir'), 'w') as fp:
+                    fp.write(ir_text(SIGNALS))
+                self.assertEqual(next(changes), {os.path.join('new', 'c.ir')})
+
+    def test_polling(self):
+        self.check_watcher(PollingWatcher, interval=0.01)
+
+    def test_inotify(self):
+        try:
+            InotifyWatcher('.').close()
+        except (AttributeError, OSError):
+            self.skipTest('no inotify')
+        self.check_watcher(InotifyWatcher)
+
+
+class ConverterTestCase(unittest.TestCase):
+    def test_convert(self):
+        with TemporaryDirectory() as tempdir:
+            source = os.path.join(tempdir, 'src')
+            output = os.path.join(tempdir, 'out')
+            os.makedirs(source)
+            with open(os.path.join(source, 'a.ir'), 'w') as fp:
+                fp.write(ir_text(SIGNALS))
+
+            converter = Converter(source, output)
+            self.assertTrue(converter.convert('a.ir'))
+            self.assertFalse(converter.convert('a.ir'))  # unchanged
+            with open(os.path.join(output, 'a.ir')) as fp:
+                self.assertEqual(
+                    fp.read(), ''.join(raw2parsed(StringIO(ir_text(SIGNALS)))))
+
+            os.unlink(os.path.join(source, 'a.ir'))
+            self.assertTrue(converter.convert('a.ir'))
+            self.assertEqual(os.listdir(output), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
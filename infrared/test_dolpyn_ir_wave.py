@@ -0,0 +1,43 @@
+"""
+Tests for dolpyn.ir_wave
+"""
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    raise unittest.SkipTest('needs NumPy')
+
+from dolpyn.ir_signals import RawIrSignal
+from dolpyn.ir_wave import render
+
+
+class RenderTestCase(unittest.TestCase):
+    def test_render_envelope_and_carrier(self):
+        signal = RawIrSignal('x', 36000, 0.25, [1000, 500, 1000, 2000])
+        chunks = list(render(
+            [signal, signal], sample_rate=360000, chunk_size=1000))
+        self.assertEqual([len(i) for i in chunks], [1000, 620, 1000, 620])
+        samples = np.concatenate(chunks)
+
+        # 10 samples per carrier period, 25% duty cycle.
+        self.assertEqual(
+            list(samples[0:10] > 0), [True] * 3 + [False] * 7)
+        # The first 1000us contain 36 carrier periods; then it's OFF.
+        self.assertEqual(np.count_nonzero(samples[0:360]), 36 * 3)
+        self.assertFalse(samples[360:540].any())
+        # The carrier restarts at the start of each mark.
+        self.assertTrue(samples[540])
+        self.assertFalse(samples[900:1620].any())
+        # The second signal is the same as the first.
+        self.assertEqual(list(samples[:1620]), list(samples[1620:]))
+
+    def test_render_float32(self):
+        signal = RawIrSignal('x', 36000, 0.5, [889, 889])
+        samples = np.concatenate(list(render([signal], dtype=np.float32)))
+        self.assertEqual(samples.dtype, np.float32)
+        self.assertEqual(set(samples.tolist()), {0.0, 1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
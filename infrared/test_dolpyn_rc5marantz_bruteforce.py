@@ -0,0 +1,74 @@
+"""
+Tests for dolpyn.rc5marantz_bruteforce
+"""
+import os
+import subprocess
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+
+from dolpyn.ir_signals import (
+    decode_signal, IrFile, Rc5MarantzIrSignal, signal_key)
+from dolpyn.rc5marantz_bruteforce import (
+    parse_range, Rc5MarantzFrameTemplates, rc5_signals, rc5marantz_signals)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class TemplatesTestCase(unittest.TestCase):
+    def test_all_codes(self):
+        templates = Rc5MarantzFrameTemplates()
+        for address in range(0x20):
+            for command in range(0x80):
+                for extension in range(0x40):
+                    signal = Rc5MarantzIrSignal(
+                        '', address, command, extension)
+                    durations = templates.durations(
+                        address, command, extension)
+                    if durations != signal._make_durations():
+                        self.fail(f'{address} {command} {extension}')
+
+    def test_signals(self):
+        signals = rc5marantz_signals([16], [15, 111], [8])
+        self.assertEqual(
+            [(signal.name, signal_key(decode_signal(signal)))
+             for signal in signals],
+            [('16 15 08', ('RC5marantz', 16, 15, 8)),
+             ('16 111 08', ('RC5marantz', 16, 111, 8))])
+        self.assertEqual(
+            [signal.name for signal in rc5_signals([0, 16], [5])],
+            ['00 05', '16 05'])
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('16'), [16])
+        self.assertEqual(parse_range('1,3,5-7'), [1, 3, 5, 6, 7])
+
+
+class MainTestCase(unittest.TestCase):
+    def test_chunks(self):
+        with TemporaryDirectory() as tempdir:
+            prefix = os.path.join(tempdir, 'addr16_cmd15')
+            subprocess.run(
+                [sys.executable,
+                 os.path.join(HERE, 'rc5marantz_bruteforce.py'),
+                 '-o', prefix, '--address', '16', '--command', '15',
+                 '--extension', '0-63', '--max-entries', '20'],
+                check=True, capture_output=True)
+
+            keys = []
+            for page in range(1, 5):
+                with open(f'{prefix}-{page:02d}.ir') as fp:
+                    signals = [
+                        signal for signal, source_lines in IrFile.parse(fp)
+                        if signal is not None]
+                self.assertEqual(len(signals), 20 if page < 4 else 4)
+                keys.extend(
+                    signal_key(decode_signal(signal)) for signal in signals)
+            self.assertEqual(len(os.listdir(tempdir)), 4)
+
+        self.assertEqual(
+            keys, [('RC5marantz', 16, 15, i) for i in range(64)])
+
+
+if __name__ == '__main__':
+    unittest.main()
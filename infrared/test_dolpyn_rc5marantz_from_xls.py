@@ -0,0 +1,198 @@
+"""
+Tests for dolpyn.rc5marantz_from_xls
+"""
+import os
+import subprocess
+import sys
+import unittest
+import warnings
+from tempfile import TemporaryDirectory
+
+from dolpyn.ir_signals import IrFile, signal_key
+from dolpyn.rc5marantz_from_xls import (
+    generate_all, generate_zone, iter_zone_rows, parse_row, sniff_delimiter,
+    zone_names)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ROWS = [
+    ['MAIN ZONE'],
+    ['Function', 'Address', 'Command', 'Extension'],
+    ['POWER ON/OFF', '16', '12', '---'],
+    ['TUNER (TUNER,FM)', '17', '63', '---'],
+    ['Direct VOLUME 50%', '16', '111', '32'],
+]
+
+
+def write_csv(path, rows, delimiter):
+    with open(path, 'w') as fp:
+        for row in rows:
+            fp.write(delimiter.join(
+                f'"{cell}"' if delimiter in cell else cell
+                for cell in row) + '\n')
+
+
+def read_keys(filenames):
+    keys = []
+    for filename in filenames:
+        with open(filename) as fp:
+            keys.extend(
+                (signal.name, signal_key(signal)[0])
+                for signal, source_lines in IrFile.parse(fp)
+                if signal is not None)
+    return keys
+
+
+EXPECTED = [
+    ('power on/off', 'RC5'), ('tuner (tuner,fm)', 'RC5'),
+    ('direct volume 50%', 'raw')]
+
+
+class ParseRowTestCase(unittest.TestCase):
+    def test_rows(self):
+        self.assertIsNone(parse_row(['MAIN ZONE'], 'x:1'))
+        self.assertIsNone(parse_row(['Function', 'Address', 'Command'], 'x'))
+        self.assertEqual(
+            signal_key(parse_row(['Mute', '16', '13', '---'], 'x:3')),
+            ('RC5', 16, 13, None))
+        self.assertEqual(
+            signal_key(parse_row(['Mute', 16.0, 13.0, None], 'x:3')),
+            ('RC5', 16, 13, None))
+
+    def test_errors(self):
+        for cells, message in (
+                (['Mute', '16', 'x13'], 'sheet.csv:7: command '),
+                (['Mute', '32', '13'], 'sheet.csv:7: address 32 is out'),
+                (['Mute', '16', '13', '64'], 'sheet.csv:7: extension 64 '),
+                (['Mute', '16', '13', 'x'], 'sheet.csv:7: extension ')):
+            with self.assertRaises(ValueError) as context:
+                parse_row(cells, 'sheet.csv:7')
+            self.assertTrue(
+                str(context.exception).startswith(message),
+                str(context.exception))
+
+    def test_empty_name(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            signal = parse_row(['', '16', '13', '01'], 'sheet.csv:7')
+        self.assertEqual(signal.name, '16 13 01')
+        self.assertIn('sheet.csv:7: empty name', str(caught[0].message))
+
+
+class SheetTestCase(unittest.TestCase):
+    def test_csv_delimiters(self):
+        with TemporaryDirectory() as tempdir:
+            for delimiter in (';', ',', '\t'):
+                path = os.path.join(tempdir, 'main zone.csv')
+                write_csv(path, ROWS, delimiter)
+                rows = list(iter_zone_rows(path, 'main zone'))
+                self.assertEqual(rows[3], (
+                    'main zone.csv:4',
+                    ['TUNER (TUNER,FM)', '17', '63', '---']))
+
+                count, filenames = generate_zone(
+                    path, 'main zone', os.path.join(tempdir, 'out'))
+                self.assertEqual(count, 3)
+                self.assertEqual(read_keys(filenames), EXPECTED)
+
+    def test_sniff_delimiter(self):
+        self.assertEqual(sniff_delimiter(['MAIN ZONE\n']), ';')
+        self.assertEqual(sniff_delimiter(['MAIN ZONE\n', 'A,1,2\n']), ',')
+        self.assertEqual(
+            sniff_delimiter(['Zone 2\n', 'A,B;1;2\n', 'C;3;4\n']), ';')
+
+    def test_csv_explicit_delimiter(self):
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'zone.csv')
+            write_csv(path, ROWS, ';')
+            self.assertEqual(
+                len(list(iter_zone_rows(path, 'zone', ';'))[2][1]), 4)
+            self.assertEqual(
+                len(list(iter_zone_rows(path, 'zone', ','))[2][1]), 1)
+
+    def test_xlsx(self):
+        try:
+            import openpyxl
+        except ImportError:  # optional dependency
+            self.skipTest('needs openpyxl')
+
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'sheet.xlsx')
+            book = openpyxl.Workbook()
+            book.active.title = 'MAIN ZONE'
+            for row in ROWS:
+                book.active.append(
+                    [int(cell) if cell.isdigit() else cell for cell in row])
+            book.save(path)
+
+            count, filenames = generate_zone(
+                path, 'MAIN ZONE', os.path.join(tempdir, 'out'))
+            self.assertEqual(count, 3)
+            self.assertEqual(read_keys(filenames), EXPECTED)
+
+    def test_generate_all(self):
+        with TemporaryDirectory() as tempdir:
+            paths = []
+            for name, delimiter in (('main', ';'), ('zone2', ',')):
+                paths.append(os.path.join(tempdir, f'{name}.csv'))
+                write_csv(paths[-1], ROWS, delimiter)
+            output = os.path.join(tempdir, 'out')
+            os.makedirs(output)
+
+            results = sorted(generate_all(
+                paths, output, jobs=1, max_entries=2))
+            self.assertEqual(
+                [(os.path.basename(path), zone, count)
+                 for path, zone, count, filenames in results],
+                [('main.csv', 'main', 3), ('zone2.csv', 'zone2', 3)])
+            self.assertEqual(
+                [os.path.basename(i) for i in results[1][3]],
+                ['zone2-01.ir', 'zone2-02.ir'])
+            self.assertEqual(read_keys(results[1][3]), EXPECTED)
+
+    def test_same_names(self):
+        with TemporaryDirectory() as tempdir:
+            paths = []
+            for year in ('2014', '2016'):
+                os.makedirs(os.path.join(tempdir, year))
+                paths.append(os.path.join(tempdir, year, 'main_zone.csv'))
+                write_csv(paths[-1], ROWS[year == '2016':], ';')
+            self.assertEqual(
+                [name for path, zone, name in zone_names(paths)],
+                ['2014-main_zone', '2016-main_zone'])
+
+            output = os.path.join(tempdir, 'out')
+            os.makedirs(output)
+            results = sorted(generate_all(paths, output, jobs=1))
+            self.assertEqual(
+                [os.path.basename(i) for i in results[0][3] + results[1][3]],
+                ['2014-main_zone-01.ir', '2016-main_zone-01.ir'])
+
+            with self.assertRaisesRegex(ValueError, 'would both be written'):
+                zone_names([paths[0], paths[0]])
+
+    def test_failed_zone(self):
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'zone2.csv')
+            write_csv(path, ROWS + [['BAD', '16', '300', '---']], ';')
+            prefix = os.path.join(tempdir, 'zone2')
+            with self.assertRaisesRegex(ValueError, 'zone2.csv:6: '):
+                generate_zone(path, 'zone2', prefix)
+            self.assertEqual(os.listdir(tempdir), ['zone2.csv'])
+
+    def test_no_signals(self):
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'main.csv')
+            write_csv(path, ROWS[:2], ';')
+            result = subprocess.run(
+                [sys.executable,
+                 os.path.join(HERE, 'rc5marantz_from_xls.py'),
+                 '-j', '1', '-o', os.path.join(tempdir, 'out'), path],
+                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('warning: no signals in', result.stderr)
+        self.assertIn('no signals found\n', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for dolpyn.rc5marantz_raw2parsed
+"""
+import os
+import subprocess
+import sys
+import unittest
+import zipfile
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from dolpyn.ir_signals import IrFile, Rc5IrSignal, Rc5MarantzIrSignal
+from dolpyn.rc5marantz_raw2parsed import raw2parsed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TEXT = IrFile.HEADER + ''.join(f'#\n{signal}\n' for signal in (
+    Rc5IrSignal('power', 16, 12).as_raw(),
+    Rc5MarantzIrSignal('auto', 16, 37, 45).as_raw()))
+
+
+class MainTestCase(unittest.TestCase):
+    def run_main(self, *args):
+        return subprocess.run(
+            [sys.executable,
+             os.path.join(HERE, 'rc5marantz_raw2parsed.py')] +
+            list(args), capture_output=True, text=True)
+
+    def test_file(self):
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'remote.ir')
+            with open(path, 'w') as fp:
+                fp.write(TEXT)
+            result = self.run_main(path)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, ''.join(raw2parsed(StringIO(TEXT))))
+        self.assertIn('protocol: RC5\n', result.stdout)
+
+    def test_archive(self):
+        expected = ''.join(raw2parsed(StringIO(TEXT)))
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'irdb.zip')
+            with zipfile.ZipFile(path, 'w') as archive:
+                archive.writestr('tv/a.ir', TEXT)
+                archive.writestr('b.ir', TEXT)
+                archive.writestr('README.md', 'skipped')
+
+            output = os.path.join(tempdir, 'out')
+            result = self.run_main(path, output)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            for relpath in ('tv/a.ir', 'b.ir'):
+                with open(os.path.join(output, relpath)) as fp:
+                    self.assertEqual(fp.read(), expected)
+            self.assertEqual(sorted(os.listdir(output)), ['b.ir', 'tv'])
+
+    def test_usage(self):
+        result = self.run_main()
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('Usage:', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Startup time budget for the dolpyn-ir subcommands
+
+The tools are run thousands of times from shell loops, so importing them
+must stay cheap. This imports every subcommand module in a fresh
+interpreter and checks that no heavy module slipped onto the hot path.
+
+The cumulative -X importtime of every module must stay within its budget
+times IMPORT_BUDGET_FACTOR. Wall-clock budgets depend on the machine, so
+the default factor of 5 only catches gross regressions; run with
+IMPORT_BUDGET_FACTOR=1 on a quiet machine for the real budgets.
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+# module: cumulative import time budget, in microseconds
+BUDGETS = {
+    'dolpyn.ir_cli': 5000,
+    'dolpyn.ir_signals': 10000,
+    'dolpyn.rc5marantz_raw2parsed': 15000,
+    'dolpyn.ir_compact': 40000,
+    'dolpyn.ir_diff': 40000,
+    'dolpyn.ir_export': 50000,
+    'dolpyn.ir_import': 50000,
+    'dolpyn.ir_macro': 40000,
+    'dolpyn.ir_watch': 40000,
+    'dolpyn.rc5marantz_bruteforce': 40000,
+    'dolpyn.rc5marantz_from_xls': 40000,
+}
+
+# Only imported when needed, never at startup.
+FORBIDDEN = (
+    'unittest', 'numpy', 'concurrent.futures', 'multiprocessing',
+    'tarfile', 'zipfile', 'xlrd', 'openpyxl')
+
+
+def imported_modules(module):
+    """
+    Return the names of all modules loaded by importing module
+    """
+    code = f'import sys, {module}; print(" ".join(sys.modules))'
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE, check=True,
+        universal_newlines=True).stdout.split()
+
+
+def import_times(module):
+    """
+    Return {imported_module: cumulative_us} for importing module
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # measure cached bytecode
+    args = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+    cwd = os.path.dirname(os.path.abspath(__file__))
+
+    best = {}
+    for attempt in range(3):  # the first run may compile; keep the best
+        stderr = subprocess.run(
+            args, cwd=cwd, env=env, stderr=subprocess.PIPE,
+            check=True, universal_newlines=True).stderr
+        times = {}
+        for line in stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                self_us, cumulative_us, name = line[12:].split('|')
+                if cumulative_us.strip().isdigit():
+                    times[name.strip()] = int(cumulative_us)
+        if not best or times[module] < best[module]:
+            best = times
+    return best
+
+
+class StartupTestCase(unittest.TestCase):
+    def test_forbidden(self):
+        for module in BUDGETS:
+            with self.subTest(module=module):
+                heavy = [
+                    name for name in imported_modules(module)
+                    if name.split('.')[0] in FORBIDDEN or name in FORBIDDEN]
+                self.assertEqual(heavy, [], f'{module} imports {heavy}')
+
+    def test_budgets(self):
+        factor = float(os.environ.get('IMPORT_BUDGET_FACTOR', '5'))
+        for module, budget in BUDGETS.items():
+            with self.subTest(module=module):
+                times = import_times(module)
+                self.assertLessEqual(
+                    times[module], budget * factor,
+                    f'{module} takes {times[module]}us to import')
+
+
+if __name__ == '__main__':
+    unittest.main()